@@ -1,16 +1,25 @@
 """Common base classes and utilities for benchmarks."""
 
+import array
+import hashlib
 import json
 import logging
+import mmap
+import os
 from abc import ABC, abstractmethod
-from dataclasses import dataclass, field
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
 from pathlib import Path
+from typing import final
 
-from datasets import load_dataset
+import settings
+from search_agent.index import replace
 
 logger = logging.getLogger(__name__)
 
+STORE_FORMAT = 1
+
 BRIGHT_SPLITS = [
     "biology",
     "earth_science",
@@ -37,6 +46,22 @@ class QueryResult:
     retrieved: list[str]
     recall: float
     error: str | None = None
+    latency: float = 0.0
+
+
+@dataclass
+class Performance:
+    """Latency, throughput and cost summary of a benchmark run."""
+
+    mean_latency_seconds: float = 0.0
+    p50_latency_seconds: float = 0.0
+    p90_latency_seconds: float = 0.0
+    p99_latency_seconds: float = 0.0
+    queries_per_minute: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_cost: float = 0.0
+    recall_per_dollar: float | None = None
 
 
 @dataclass
@@ -50,14 +75,193 @@ class BenchmarkResult:
     total: int
     timestamp: str = field(default_factory=lambda: datetime.now().isoformat())
     queries: list[dict] = field(default_factory=list)
+    performance: Performance = field(default_factory=Performance)
+    metrics: dict[str, float] = field(default_factory=dict)
+
+
+def percentile(values: list[float], rank: float) -> float:
+    """
+    Percentile of values with linear interpolation between ranks.
+
+    Args:
+        values: Sample values
+        rank: Percentile from 0 to 100
+
+    Returns:
+        Percentile value, zero for an empty sample
+
+    Example:
+        >>> percentile([1.0, 2.0, 3.0, 4.0], 50)
+        2.5
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * rank / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def performance(
+    latencies: list[float],
+    recalls: list[float],
+    elapsed: float,
+    costs: list[float] | None = None,
+    tokens: tuple[int, int] = (0, 0),
+) -> Performance:
+    """
+    Summarize per-query latency and cost of a run.
+
+    Recall per dollar is the summed recall of all queries divided
+    by the total cost, and is left out when the run cost nothing.
+
+    Args:
+        latencies: Wall time of every query in seconds
+        recalls: Recall of every query
+        elapsed: Wall time of the whole run in seconds
+        costs: Estimated cost of every query in dollars
+        tokens: Total prompt and completion tokens
+
+    Returns:
+        Performance summary
+
+    Example:
+        >>> summary = performance([1.0, 3.0], [0.5, 1.0], 60.0, [0.5, 0.5])
+        >>> summary.p50_latency_seconds, summary.queries_per_minute, summary.recall_per_dollar
+        (2.0, 2.0, 1.5)
+    """
+    total = sum(costs or [])
+    return Performance(
+        mean_latency_seconds=sum(latencies) / len(latencies) if latencies else 0.0,
+        p50_latency_seconds=percentile(latencies, 50),
+        p90_latency_seconds=percentile(latencies, 90),
+        p99_latency_seconds=percentile(latencies, 99),
+        queries_per_minute=len(latencies) * 60 / elapsed if elapsed > 0 else 0.0,
+        prompt_tokens=tokens[0],
+        completion_tokens=tokens[1],
+        total_cost=total,
+        recall_per_dollar=sum(recalls) / total if total > 0 else None,
+    )
+
+
+@final
+class DocumentStore(Mapping[str, str]):
+    """
+    Documents of a split kept on disk and read lazily from a memory map.
+
+    Texts are concatenated in one UTF-8 file with their start offsets
+    in a binary array, so opening the store reads only document IDs.
+    A digest of all IDs and texts is recorded on write, so consumers
+    can tell that the content is unchanged without reading it.
+
+    Example:
+        >>> import tempfile
+        >>> with tempfile.TemporaryDirectory() as folder:
+        ...     DocumentStore.write(Path(folder), [("a", "one"), ("b", "two")])
+        ...     store = DocumentStore(Path(folder))
+        ...     len(store), store["b"]
+        2
+        (2, 'two')
+    """
+
+    def __init__(self, folder: Path):
+        """
+        Open store written to folder.
+
+        Args:
+            folder: Folder holding documents.bin, offsets.bin and ids.json
+        """
+        self._folder = folder
+        self._ids: list[str] = json.loads((folder / "ids.json").read_text(encoding="utf-8"))
+        try:
+            self.fingerprint: str | None = (folder / "fingerprint").read_text(encoding="ascii")
+        except OSError:
+            self.fingerprint = None
+        self._offsets = array.array("Q")
+        self._offsets.frombytes((folder / "offsets.bin").read_bytes())
+        self._positions: dict[str, int] | None = None
+        self._file = open(folder / "documents.bin", "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+
+    @staticmethod
+    def write(folder: Path, documents: Iterable[tuple[str, str]]) -> int:
+        """
+        Stream documents into a new store.
+
+        Args:
+            folder: Target folder
+            documents: Pairs of document ID and text
+
+        Returns:
+            Number of stored documents
+        """
+        folder.mkdir(parents=True, exist_ok=True)
+        ids = []
+        offsets = array.array("Q", [0])
+        digest = hashlib.sha1()
+        temp = folder / "documents.bin.tmp"
+        with open(temp, "wb") as out:
+            for identifier, content in documents:
+                data = content.encode("utf-8")
+                out.write(data)
+                ids.append(identifier)
+                offsets.append(offsets[-1] + len(data))
+                digest.update(json.dumps([identifier, len(data)]).encode("utf-8"))
+                digest.update(data)
+        os.replace(temp, folder / "documents.bin")
+        replace(folder / "offsets.bin", offsets.tobytes())
+        replace(folder / "ids.json", json.dumps(ids, ensure_ascii=False).encode("utf-8"))
+        replace(folder / "fingerprint", digest.hexdigest().encode("ascii"))
+        return len(ids)
+
+    def __getitem__(self, identifier: str) -> str:
+        if self._positions is None:
+            self._positions = {name: idx for idx, name in enumerate(self._ids)}
+        idx = self._positions[identifier]
+        if self._map is None:
+            return ""
+        return self._map[self._offsets[idx] : self._offsets[idx + 1]].decode("utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        if self._positions is None:
+            return iter(dict.fromkeys(self._ids))
+        return iter(self._positions)
+
+    def __len__(self) -> int:
+        if self._positions is None:
+            return len(dict.fromkeys(self._ids))
+        return len(self._positions)
+
+    def stream(self) -> Iterator[tuple[str, str]]:
+        """
+        Iterate all documents in stored order without building an index.
+
+        Yields:
+            Pairs of document ID and text
+        """
+        for idx, identifier in enumerate(self._ids):
+            if self._map is None:
+                yield identifier, ""
+                continue
+            data = self._map[self._offsets[idx] : self._offsets[idx + 1]]
+            yield identifier, data.decode("utf-8")
+
+    def close(self) -> None:
+        """Release memory map and file handle."""
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
 
 
 class DataLoader:
     """
-    Loads BRIGHT dataset from HuggingFace.
+    Loads BRIGHT dataset, converted once from HuggingFace to a local store.
 
     Provides standardized access to queries and documents
-    for any BRIGHT dataset split.
+    for any BRIGHT dataset split. After the first conversion,
+    loading works offline and documents are read lazily.
 
     Example:
         >>> loader = DataLoader("biology")
@@ -66,26 +270,46 @@ class DataLoader:
         True
     """
 
-    def __init__(self, split: str):
+    def __init__(self, split: str, folder: Path | None = None):
         """
         Initialize loader for given split.
 
         Args:
             split: BRIGHT dataset split name
+            folder: Local store folder, defaults to CACHE_DIR/bright/{split}/dataset
         """
         if split not in BRIGHT_SPLITS:
             raise ValueError(f"Unknown split: {split}, available: {BRIGHT_SPLITS}")
         self._split = split
+        self._folder = folder or settings.CACHE_DIR / "bright" / split / "dataset"
 
-    def load(self) -> tuple[list[dict], dict[str, str]]:
+    def load(self) -> tuple[list[dict], DocumentStore]:
         """
-        Load queries and documents from BRIGHT dataset.
+        Load queries and documents of the split.
 
         Returns:
             Tuple of (queries, documents) where queries contain
-            id, query text, and gold document IDs
+            id, query text, and gold document IDs, and documents
+            map document IDs to text lazily
         """
-        logger.info(f"Loading BRIGHT dataset split: {self._split}")
+        meta = self._folder / "meta.json"
+        try:
+            fresh = json.loads(meta.read_text(encoding="utf-8")).get("format") == STORE_FORMAT
+        except (OSError, ValueError):
+            fresh = False
+        if not fresh:
+            self._convert()
+            replace(meta, json.dumps({"format": STORE_FORMAT}).encode("utf-8"))
+        queries = json.loads((self._folder / "queries.json").read_text(encoding="utf-8"))
+        documents = DocumentStore(self._folder)
+        logger.info(f"Loaded {len(queries)} queries and {len(documents)} documents")
+        return queries, documents
+
+    def _convert(self) -> None:
+        """Download the split from HuggingFace and write it to the local store."""
+        from datasets import load_dataset
+
+        logger.info(f"Converting BRIGHT dataset split: {self._split}")
         examples = load_dataset("xlangai/BRIGHT", "examples", split=self._split)
         documents = load_dataset("xlangai/BRIGHT", "long_documents", split=self._split)
         queries = []
@@ -101,13 +325,18 @@ class DataLoader:
                 "query": example["query"],
                 "gold_ids": gold,
             })
-        docs = {}
-        for doc in documents:
-            identifier = doc.get("id", doc.get("doc_id"))
-            content = doc.get("content", doc.get("text", ""))
-            docs[identifier] = content
-        logger.info(f"Loaded {len(queries)} queries and {len(docs)} documents")
-        return queries, docs
+        count = DocumentStore.write(
+            self._folder,
+            (
+                (doc.get("id", doc.get("doc_id")), doc.get("content", doc.get("text", "")))
+                for doc in documents
+            ),
+        )
+        replace(
+            self._folder / "queries.json",
+            json.dumps(queries, ensure_ascii=False).encode("utf-8"),
+        )
+        logger.info(f"Stored {len(queries)} queries and {count} documents in {self._folder}")
 
 
 class BaseBenchmark(ABC):
@@ -132,6 +361,27 @@ class BaseBenchmark(ABC):
         ...
 
 
+def describe(summary: Performance) -> str:
+    """
+    Human readable lines of a performance summary.
+
+    Args:
+        summary: Performance summary
+
+    Returns:
+        Multiline text for console output
+    """
+    ratio = summary.recall_per_dollar
+    return "\n".join([
+        f"Latency p50/p90/p99: {summary.p50_latency_seconds:.2f}/"
+        f"{summary.p90_latency_seconds:.2f}/{summary.p99_latency_seconds:.2f}s",
+        f"Throughput: {summary.queries_per_minute:.1f} queries/min",
+        f"Tokens: {summary.prompt_tokens:,} prompt, {summary.completion_tokens:,} completion",
+        f"Total cost: ${summary.total_cost:.4f}",
+        f"Recall per dollar: {ratio:.1f}" if ratio is not None else "Recall per dollar: n/a",
+    ])
+
+
 def save(result: BenchmarkResult, path: str) -> None:
     """
     Save benchmark results to JSON file.
@@ -149,6 +399,8 @@ def save(result: BenchmarkResult, path: str) -> None:
         "evaluated_queries": result.evaluated,
         "total_queries": result.total,
         "timestamp": result.timestamp,
+        "performance": asdict(result.performance),
+        "metrics": result.metrics,
         "queries": result.queries,
     }
     output.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
@@ -0,0 +1,198 @@
+"""Append-only JSON lines checkpoints of benchmark query results."""
+
+import json
+import logging
+import os
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import IO, final
+
+logger = logging.getLogger(__name__)
+
+KEY = ("split", "query_id")
+CHUNK_BYTES = 65536
+
+
+@final
+class Checkpoint:
+    """
+    Query records appended to a JSON lines file as they finish.
+
+    A record is identified by its split and query ID; when a query
+    was evaluated again, its latest record wins. Records with an
+    error do not count as completed, so a resumed run retries them.
+
+    Example:
+        >>> import tempfile
+        >>> with tempfile.TemporaryDirectory() as folder:
+        ...     checkpoint = Checkpoint(Path(folder) / "run.jsonl")
+        ...     checkpoint.append({"split": "s", "query_id": "1", "error": "boom"})
+        ...     checkpoint.append({"split": "s", "query_id": "1", "error": None})
+        ...     sorted(checkpoint.completed()), len(list(checkpoint.records()))
+        ([('s', '1')], 1)
+    """
+
+    def __init__(self, path: Path):
+        """
+        Initialize checkpoint.
+
+        Args:
+            path: JSON lines file, created on first append
+        """
+        self.path = path
+        self._repaired = False
+
+    def reset(self) -> None:
+        """Start an empty checkpoint."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text("", encoding="utf-8")
+        self._repaired = True
+
+    def append(self, record: dict) -> None:
+        """
+        Append one finished query and flush it to disk.
+
+        Args:
+            record: Query record with split and query_id
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if not self._repaired:
+            self._truncate()
+            self._repaired = True
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def _truncate(self) -> None:
+        """Cut a torn last line left by a crash, so appends start on a new line."""
+        if not self.path.exists():
+            return
+        with open(self.path, "rb+") as file:
+            end = file.seek(0, os.SEEK_END)
+            position = end
+            while position > 0:
+                start = max(0, position - CHUNK_BYTES)
+                file.seek(start)
+                chunk = file.read(position - start)
+                newline = chunk.rfind(b"\n")
+                if newline != -1:
+                    position = start + newline + 1
+                    break
+                position = start
+            if position != end:
+                logger.warning(f"Truncating torn checkpoint line at byte {position}")
+                file.truncate(position)
+
+    def completed(self) -> set[tuple[str, str]]:
+        """
+        Keys of queries whose latest record has no error.
+
+        Returns:
+            Set of (split, query_id) pairs
+        """
+        return {
+            (record["split"], record["query_id"])
+            for record in self.records()
+            if record.get("error") is None
+        }
+
+    def records(self) -> Iterator[dict]:
+        """
+        Latest record of every query, streamed in file order.
+
+        The first pass keeps only the offset of each query's latest
+        line; the second pass reads records one at a time.
+
+        Yields:
+            Query records
+        """
+        latest: dict[tuple[str, str], int] = {}
+        for offset, record in self._lines():
+            latest[(record["split"], record["query_id"])] = offset
+        wanted = set(latest.values())
+        for offset, record in self._lines():
+            if offset in wanted:
+                yield record
+
+    def _lines(self) -> Iterator[tuple[int, dict]]:
+        """Offsets and records of readable lines, skipping a torn last line."""
+        if not self.path.exists():
+            return
+        with open(self.path, "rb") as file:
+            offset = 0
+            for line in file:
+                start = offset
+                offset += len(line)
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    logger.warning(f"Skipping unreadable checkpoint line at byte {start}")
+                    continue
+                if all(name in record for name in KEY):
+                    yield start, record
+
+
+def dump(value: object, out: IO[str], indent: int = 0) -> None:
+    """
+    Write value as indented JSON, consuming iterators lazily.
+
+    Lets a result file embed all query records of a checkpoint
+    without holding them in memory.
+
+    Args:
+        value: Dicts, lists, iterators and JSON scalars
+        out: Text stream to write to
+        indent: Current nesting level
+
+    Example:
+        >>> import io
+        >>> out = io.StringIO()
+        >>> dump({"a": iter([1, 2]), "b": {}}, out)
+        >>> json.loads(out.getvalue())
+        {'a': [1, 2], 'b': {}}
+    """
+    pad = "  " * indent
+    if isinstance(value, dict):
+        out.write("{")
+        for idx, (key, item) in enumerate(value.items()):
+            out.write(("," if idx else "") + f"\n{pad}  {json.dumps(key)}: ")
+            dump(item, out, indent + 1)
+        out.write(f"\n{pad}}}" if value else "}")
+    elif isinstance(value, (list, tuple, Iterator)):
+        out.write("[")
+        empty = True
+        for idx, item in enumerate(value):
+            out.write(("," if idx else "") + f"\n{pad}  ")
+            dump(item, out, indent + 1)
+            empty = False
+        out.write("]" if empty else f"\n{pad}]")
+    else:
+        out.write(json.dumps(value, ensure_ascii=False))
+
+
+def write(data: dict, path: str) -> None:
+    """
+    Write result data with lazily consumed parts to a JSON file.
+
+    Args:
+        data: Result data, query lists may be iterators
+        path: Output file path
+    """
+    output = Path(path)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as out:
+        dump(data, out)
+        out.write("\n")
+
+
+def select(records: Iterable[dict], split: str) -> Iterator[dict]:
+    """
+    Records of one split.
+
+    Args:
+        records: Query records
+        split: Split name
+
+    Yields:
+        Records whose split matches
+    """
+    return (record for record in records if record["split"] == split)
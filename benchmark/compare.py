@@ -0,0 +1,330 @@
+"""
+Comparison of benchmark result files with a regression gate.
+
+Pairs queries by split and query ID, estimates recall, latency and
+cost deltas with bootstrap confidence intervals, lists regressed
+queries and exits non-zero when a threshold is breached. Every
+further file is compared against the first one.
+
+Usage:
+    python -m benchmark.compare results/before.json results/after.json
+    python -m benchmark.compare base.json a.json b.json --max-recall-drop 0.02 --max-latency-increase 0.2
+"""
+
+import argparse
+import json
+import logging
+import sys
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+RESAMPLES = 10_000
+CONFIDENCE = 0.95
+BLOCK_ELEMENTS = 4_000_000
+MAX_REGRESSIONS = 20
+
+
+@dataclass
+class Run:
+    """Per-query measurements of one result file, aligned by key."""
+
+    name: str
+    keys: list[tuple[str, str]]
+    recall: np.ndarray
+    latency: np.ndarray
+    cost: np.ndarray
+
+
+@dataclass
+class Delta:
+    """Change of a metric between two runs with its confidence interval."""
+
+    baseline: float
+    candidate: float
+    change: float
+    low: float
+    high: float
+
+
+@dataclass
+class Comparison:
+    """Outcome of comparing a candidate run against a baseline."""
+
+    baseline: str
+    candidate: str
+    paired: int
+    recall: Delta
+    latency: Delta
+    cost: Delta
+    regressions: list[dict] = field(default_factory=list)
+    breaches: list[str] = field(default_factory=list)
+
+
+def load(path: str) -> Run:
+    """
+    Read per-query measurements from a grep or vector result file.
+
+    Args:
+        path: Result JSON of benchmark.grep (one or all splits) or benchmark.vector
+
+    Returns:
+        Run with one entry per query
+    """
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    if "splits" in data:
+        groups = [(split, part["queries"]) for split, part in data["splits"].items()]
+    else:
+        groups = [(data.get("split", ""), data.get("queries", []))]
+    keys = []
+    rows = []
+    for split, queries in groups:
+        for query in queries:
+            keys.append((split, str(query["query_id"])))
+            rows.append(
+                (
+                    query.get("recall_at_k", 0.0),
+                    query.get("latency_seconds", 0.0),
+                    query.get("cost", 0.0),
+                )
+            )
+    table = np.array(rows, dtype=np.float64).reshape(-1, 3)
+    return Run(path, keys, table[:, 0], table[:, 1], table[:, 2])
+
+
+def bootstrap(
+    statistic: Callable[[np.ndarray], np.ndarray],
+    size: int,
+    resamples: int = RESAMPLES,
+    seed: int = 0,
+    confidence: float = CONFIDENCE,
+) -> tuple[float, float]:
+    """
+    Percentile bootstrap interval of a statistic over resampled queries.
+
+    Resamples are drawn as index matrices in blocks, so memory
+    stays bounded for thousands of queries.
+
+    Args:
+        statistic: Maps an index matrix (resamples, size) to one value per row
+        size: Number of paired queries
+        resamples: Number of bootstrap resamples
+        seed: Random seed
+        confidence: Interval coverage
+
+    Returns:
+        Lower and upper bound, NaN when undefined
+
+    Example:
+        >>> values = np.array([1.0, 1.0, 1.0])
+        >>> bootstrap(lambda idx: values[idx].mean(axis=1), 3)
+        (1.0, 1.0)
+    """
+    if size == 0:
+        return float("nan"), float("nan")
+    rng = np.random.default_rng(seed)
+    block = max(1, BLOCK_ELEMENTS // size)
+    samples = []
+    for start in range(0, resamples, block):
+        idx = rng.integers(0, size, size=(min(block, resamples - start), size))
+        samples.append(statistic(idx))
+    values = np.concatenate(samples)
+    values = values[np.isfinite(values)]
+    if not values.size:
+        return float("nan"), float("nan")
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(values, [tail, 100 - tail])
+    return float(low), float(high)
+
+
+def absolute(baseline: np.ndarray, candidate: np.ndarray, seed: int) -> Delta:
+    """Difference of means with interval of the mean paired difference."""
+    diff = candidate - baseline
+    low, high = bootstrap(lambda idx: diff[idx].mean(axis=1), len(diff), seed=seed)
+    return Delta(
+        float(baseline.mean()) if len(baseline) else 0.0,
+        float(candidate.mean()) if len(candidate) else 0.0,
+        float(diff.mean()) if len(diff) else 0.0,
+        low,
+        high,
+    )
+
+
+def relative(baseline: np.ndarray, candidate: np.ndarray, seed: int) -> Delta:
+    """Relative change of means with interval of the resampled ratio."""
+
+    def ratio(idx: np.ndarray) -> np.ndarray:
+        before = baseline[idx].mean(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return candidate[idx].mean(axis=1) / before - 1
+
+    before = float(baseline.mean()) if len(baseline) else 0.0
+    after = float(candidate.mean()) if len(candidate) else 0.0
+    low, high = bootstrap(ratio, len(baseline), seed=seed)
+    change = after / before - 1 if before > 0 else float("nan")
+    return Delta(before, after, change, low, high)
+
+
+def compare(
+    baseline: Run,
+    candidate: Run,
+    max_recall_drop: float | None = 0.0,
+    max_latency_increase: float | None = None,
+    max_cost_increase: float | None = None,
+    seed: int = 0,
+) -> Comparison:
+    """
+    Compare candidate against baseline on queries present in both.
+
+    A threshold is breached when the whole confidence interval lies
+    beyond it: recall drops by more than max_recall_drop, or mean
+    latency or cost grows by more than the given fraction.
+
+    Args:
+        baseline: Reference run
+        candidate: Run under test
+        max_recall_drop: Allowed absolute recall drop, None to skip
+        max_latency_increase: Allowed relative latency growth, None to skip
+        max_cost_increase: Allowed relative cost growth, None to skip
+        seed: Random seed for resampling
+
+    Returns:
+        Comparison with deltas, regressed queries and breached thresholds
+
+    Example:
+        >>> keys = [("s", "1"), ("s", "2")]
+        >>> before = Run("a", keys, np.array([1.0, 1.0]), np.ones(2), np.zeros(2))
+        >>> after = Run("b", keys, np.array([0.0, 0.0]), np.ones(2), np.zeros(2))
+        >>> compare(before, after).breaches
+        ['recall dropped by 1.0000, more than 0.0000']
+    """
+    position = {key: idx for idx, key in enumerate(candidate.keys)}
+    pairs = [(idx, position[key]) for idx, key in enumerate(baseline.keys) if key in position]
+    left = np.array([a for a, _ in pairs], dtype=np.int64)
+    right = np.array([b for _, b in pairs], dtype=np.int64)
+    logger.info(
+        f"Paired {len(pairs)} queries, {len(baseline.keys) - len(pairs)} only in "
+        f"{baseline.name}, {len(candidate.keys) - len(pairs)} only in {candidate.name}"
+    )
+    recall = absolute(baseline.recall[left], candidate.recall[right], seed)
+    latency = relative(baseline.latency[left], candidate.latency[right], seed)
+    cost = relative(baseline.cost[left], candidate.cost[right], seed)
+    drops = baseline.recall[left] - candidate.recall[right]
+    worst = np.argsort(-drops, kind="stable")
+    regressions = [
+        {
+            "split": baseline.keys[left[idx]][0],
+            "query_id": baseline.keys[left[idx]][1],
+            "baseline_recall": float(baseline.recall[left[idx]]),
+            "candidate_recall": float(candidate.recall[right[idx]]),
+        }
+        for idx in worst
+        if drops[idx] > 0
+    ]
+    breaches = []
+    if max_recall_drop is not None and recall.high < -max_recall_drop:
+        breaches.append(
+            f"recall dropped by {-recall.change:.4f}, more than {max_recall_drop:.4f}"
+        )
+    if max_latency_increase is not None and latency.low > max_latency_increase:
+        breaches.append(
+            f"latency grew by {latency.change:.1%}, more than {max_latency_increase:.1%}"
+        )
+    if max_cost_increase is not None and cost.low > max_cost_increase:
+        breaches.append(f"cost grew by {cost.change:.1%}, more than {max_cost_increase:.1%}")
+    return Comparison(
+        baseline=baseline.name,
+        candidate=candidate.name,
+        paired=len(pairs),
+        recall=recall,
+        latency=latency,
+        cost=cost,
+        regressions=regressions,
+        breaches=breaches,
+    )
+
+
+def report(comparison: Comparison) -> str:
+    """
+    Human readable comparison.
+
+    Args:
+        comparison: Comparison to describe
+
+    Returns:
+        Multiline text for console output
+    """
+    recall, latency, cost = comparison.recall, comparison.latency, comparison.cost
+    lines = [
+        f"{comparison.candidate} vs {comparison.baseline} ({comparison.paired} paired queries)",
+        f"  Recall@k: {recall.baseline:.4f} -> {recall.candidate:.4f} "
+        f"({recall.change:+.4f}, {CONFIDENCE:.0%} CI {recall.low:+.4f}..{recall.high:+.4f})",
+        f"  Latency: {latency.baseline:.2f}s -> {latency.candidate:.2f}s "
+        f"({latency.change:+.1%}, CI {latency.low:+.1%}..{latency.high:+.1%})",
+        f"  Cost per query: ${cost.baseline:.4f} -> ${cost.candidate:.4f} "
+        f"({cost.change:+.1%}, CI {cost.low:+.1%}..{cost.high:+.1%})",
+        f"  Regressed queries: {len(comparison.regressions)}",
+    ]
+    for item in comparison.regressions[:MAX_REGRESSIONS]:
+        lines.append(
+            f"    [{item['split']}/{item['query_id']}] "
+            f"{item['baseline_recall']:.3f} -> {item['candidate_recall']:.3f}"
+        )
+    if len(comparison.regressions) > MAX_REGRESSIONS:
+        lines.append(f"    ... {len(comparison.regressions) - MAX_REGRESSIONS} more")
+    for breach in comparison.breaches:
+        lines.append(f"  BREACH: {breach}")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(description="Compare benchmark result files")
+    parser.add_argument("files", nargs="+", help="Baseline result file, then candidates")
+    parser.add_argument(
+        "--max-recall-drop",
+        type=float,
+        default=0.0,
+        help="Allowed absolute drop of mean recall, negative to disable",
+    )
+    parser.add_argument(
+        "--max-latency-increase",
+        type=float,
+        default=None,
+        help="Allowed relative growth of mean latency, e.g. 0.2",
+    )
+    parser.add_argument(
+        "--max-cost-increase",
+        type=float,
+        default=None,
+        help="Allowed relative growth of mean cost, e.g. 0.1",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for resampling")
+    args = parser.parse_args()
+    if len(args.files) < 2:
+        parser.error("need a baseline and at least one candidate file")
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    baseline = load(args.files[0])
+    drop = args.max_recall_drop if args.max_recall_drop >= 0 else None
+    breached = False
+    for path in args.files[1:]:
+        comparison = compare(
+            baseline,
+            load(path),
+            max_recall_drop=drop,
+            max_latency_increase=args.max_latency_increase,
+            max_cost_increase=args.max_cost_increase,
+            seed=args.seed,
+        )
+        print(report(comparison))
+        breached = breached or bool(comparison.breaches)
+    if breached:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
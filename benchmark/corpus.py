@@ -0,0 +1,148 @@
+"""Persistent, content-hashed document folders for BRIGHT splits."""
+
+import hashlib
+import json
+import logging
+import os
+from collections.abc import Iterator, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import final
+
+import settings
+from search_agent.index import replace
+
+logger = logging.getLogger(__name__)
+
+CORPUS_FORMAT = 1
+WRITE_WORKERS = 16
+
+
+def filename(identifier: str) -> str:
+    """
+    File name of a document in the corpus folder.
+
+    Args:
+        identifier: Document ID
+
+    Returns:
+        Flat file name with a .txt extension
+
+    Example:
+        >>> filename("a/b.txt")
+        'a_b.txt'
+    """
+    name = identifier.replace("/", "_").replace("\\", "_")
+    if not name.endswith(".txt"):
+        name += ".txt"
+    return name
+
+
+@final
+class CorpusCache:
+    """
+    Documents of a split written once to a persistent folder.
+
+    A manifest next to the documents stores the content hash and
+    document ID of every file. Later runs rewrite only changed
+    files and skip writing entirely when nothing changed. Given the
+    fingerprint of the source documents, a repeat run whose source
+    is unchanged skips reading and hashing them as well. The folder
+    depends on the split only, so every benchmark can share it.
+
+    Example:
+        >>> import tempfile
+        >>> with tempfile.TemporaryDirectory() as folder:
+        ...     cache = CorpusCache("biology", Path(folder))
+        ...     cache.materialize({"a/b": "text"}, fingerprint="v1")
+        ...     cache.materialize({"a/b": "text"}, fingerprint="v1")
+        1
+        0
+    """
+
+    def __init__(self, split: str, folder: Path | None = None):
+        """
+        Initialize cache for given split.
+
+        Args:
+            split: BRIGHT dataset split name
+            folder: Cache folder, defaults to CACHE_DIR/bright/{split}
+        """
+        self._folder = folder or settings.CACHE_DIR / "bright" / split
+        self.root = self._folder / "docs"
+        self._manifest = self._folder / "manifest.json"
+
+    def files(self) -> dict[str, str]:
+        """
+        Mapping of file name to document ID from the manifest.
+
+        Returns:
+            Empty dict when the corpus was never materialized
+        """
+        return {name: entry[0] for name, entry in self._read().get("files", {}).items()}
+
+    def materialize(self, documents: Mapping[str, str], fingerprint: str | None = None) -> int:
+        """
+        Bring the folder in line with documents.
+
+        Args:
+            documents: Dict mapping doc_id to document text
+            fingerprint: Digest of the source documents, if known
+
+        Returns:
+            Number of files written
+        """
+        manifest = self._read()
+        if fingerprint is not None and manifest.get("source") == fingerprint:
+            logger.info(f"Corpus {self.root} matches its source, skipping preparation")
+            return 0
+        entries = {}
+        for identifier, content in documents.items():
+            digest = hashlib.sha1(content.encode("utf-8")).hexdigest()
+            entries[filename(identifier)] = [identifier, digest]
+        previous = manifest.get("files", {})
+        changed = [
+            name
+            for name, entry in entries.items()
+            if previous.get(name) != entry or not (self.root / name).exists()
+        ]
+        stale = [name for name in previous if name not in entries]
+        self.root.mkdir(parents=True, exist_ok=True)
+        with ThreadPoolExecutor(max_workers=WRITE_WORKERS) as pool:
+            list(pool.map(lambda name: self._write(name, documents[entries[name][0]]), changed))
+        for name in stale:
+            (self.root / name).unlink(missing_ok=True)
+        if changed or stale or manifest.get("source") != fingerprint:
+            manifest = {"format": CORPUS_FORMAT, "source": fingerprint, "files": entries}
+            replace(self._manifest, json.dumps(manifest).encode("utf-8"))
+        if not changed and not stale:
+            logger.info(f"Corpus {self.root} is up to date ({len(entries)} documents)")
+        else:
+            logger.info(
+                f"Wrote {len(changed)} and removed {len(stale)} documents in {self.root}"
+            )
+        return len(changed)
+
+    def documents(self) -> Iterator[tuple[str, str]]:
+        """
+        Read materialized documents back from the folder.
+
+        Yields:
+            Pairs of document ID and text
+        """
+        for name, identifier in self.files().items():
+            yield identifier, (self.root / name).read_text(encoding="utf-8")
+
+    def _write(self, name: str, content: str) -> None:
+        """Write one document atomically."""
+        replace(self.root / name, content.encode("utf-8"))
+
+    def _read(self) -> dict:
+        """Manifest, empty when missing, unreadable, of older format or without folder."""
+        try:
+            manifest = json.loads(self._manifest.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if manifest.get("format") != CORPUS_FORMAT or not os.path.isdir(self.root):
+            return {}
+        return manifest
@@ -6,21 +6,41 @@ Evaluates the greprag search agent on complex reasoning queries.
 Usage:
     python -m benchmark.grep --split biology --limit 5
     python -m benchmark.grep --split biology --output results/grep_biology.json
+    python -m benchmark.grep --split biology --packed
+    python -m benchmark.grep --split all --limit 5 --output results/grep_all.json
+    python -m benchmark.grep --split biology --output results/grep_biology.json --resume
 """
 
 import argparse
 import asyncio
-import json
+import itertools
 import logging
-import shutil
-import tempfile
-from dataclasses import dataclass, field
+import time
+from collections import Counter
+from collections.abc import Iterable, Mapping
+from dataclasses import asdict, dataclass, field, replace
 from pathlib import Path
 
 import settings
-from benchmark.base import BRIGHT_SPLITS, DataLoader
-from benchmark.metrics import mean_recall_at_k, recall_at_k
+from benchmark.base import (
+    BRIGHT_SPLITS,
+    DataLoader,
+    DocumentStore,
+    Performance,
+    describe,
+    performance,
+)
+from benchmark.checkpoint import Checkpoint, select, write
+from benchmark.corpus import CorpusCache
+from benchmark.metrics import recall_at_k
+from benchmark.ranking import means, report
+from benchmark.resolver import Resolver
 from search_agent.agent import run_agent
+from search_agent.cache import location
+from search_agent.corpus import Corpus
+from search_agent.pack import Pack
+from search_agent.profiler import MODES, profiled
+from search_agent.text import scan
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +58,14 @@ class AgentQueryResult:
     retrieved_ids: list[str]
     recall_at_k: float
     error: str | None = None
+    latency_seconds: float = 0.0
+    llm_seconds: float = 0.0
+    tool_seconds: float = 0.0
+    iterations: int = 0
+    tool_calls: dict[str, int] = field(default_factory=dict)
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost: float = 0.0
 
 
 @dataclass
@@ -48,30 +76,103 @@ class AgentBenchmarkResult:
     mean_recall_at_k: float
     evaluated_queries: int
     total_queries: int
-    queries: list[dict] = field(default_factory=list)
+    performance: Performance = field(default_factory=Performance)
+    metrics: dict[str, float] = field(default_factory=dict)
+
+
+@dataclass
+class CombinedBenchmarkResult:
+    """Agent benchmark result over several splits."""
+
+    splits: list[AgentBenchmarkResult]
+    mean_recall_at_k: float
+    macro_recall_at_k: float
+    evaluated_queries: int
+    total_queries: int
+    performance: Performance
+    metrics: dict[str, float] = field(default_factory=dict)
+
+
+def checkpoint_path(name: str) -> Path:
+    """Default checkpoint file of a split, or of all splits."""
+    return settings.CACHE_DIR / "checkpoints" / f"grep_{name}.jsonl"
+
+
+def summarize(
+    split: str, records: Iterable[dict], elapsed: float, evaluated: int
+) -> AgentBenchmarkResult:
+    """
+    Aggregate query records streamed from a checkpoint.
+
+    Only the top ranks of each query are kept for the ranking
+    metrics; throughput counts only queries evaluated in this
+    session, so resumed runs are not inflated.
+
+    Args:
+        split: Split name for the result
+        records: Query records, one per query
+        elapsed: Wall time of this session in seconds
+        evaluated: Queries evaluated in this session
+
+    Returns:
+        AgentBenchmarkResult without query records
+    """
+    recalls: list[float] = []
+    latencies: list[float] = []
+    costs: list[float] = []
+    retrieved: list[list[str]] = []
+    gold: list[list[str]] = []
+    prompt = completion = 0
+    for record in records:
+        recalls.append(record["recall_at_k"])
+        retrieved.append(record["retrieved_ids"][:TOP_K])
+        gold.append(record["gold_ids"])
+        latencies.append(record["latency_seconds"])
+        costs.append(record["cost"])
+        prompt += record["prompt_tokens"]
+        completion += record["completion_tokens"]
+    summary = performance(latencies, recalls, elapsed, costs, (prompt, completion))
+    summary = replace(
+        summary, queries_per_minute=evaluated * 60 / elapsed if elapsed > 0 else 0.0
+    )
+    recall = sum(recalls) / len(recalls) if recalls else 0.0
+    logger.info(f"Benchmark {split} complete: mean_recall@k={recall:.4f} ({len(recalls)} queries)")
+    return AgentBenchmarkResult(
+        split=split,
+        mean_recall_at_k=recall,
+        evaluated_queries=len(recalls),
+        total_queries=len(recalls),
+        performance=summary,
+        metrics=means(retrieved, gold),
+    )
 
 
 class GrepBenchmark:
     """GrepRAG benchmark runner using BRIGHT dataset."""
 
-    def __init__(self, split: str, temp_dir: Path | None = None):
+    def __init__(
+        self, split: str, folder: Path | None = None, packed: bool = False
+    ):
         """
         Initialize the benchmark.
 
         Args:
             split: BRIGHT dataset split to use (e.g., 'biology')
-            temp_dir: Optional temporary directory for documents
+            folder: Optional corpus cache folder, shared between runs
+            packed: Search documents packed into a single file
         """
         if split not in BRIGHT_SPLITS:
             raise ValueError(f"Unknown split: {split}. Available: {BRIGHT_SPLITS}")
-        self._split = split
-        self._temp_dir = temp_dir or Path(tempfile.mkdtemp(prefix="bright_"))
-        self._doc_to_file: dict[str, str] = {}
-        self._file_to_doc: dict[str, str] = {}
-        self._original_folder = settings.DOCS_FOLDER
+        self.split = split
+        self._cache = CorpusCache(split, folder)
+        self._docs = self._cache.root
+        self._resolver = Resolver({})
+        self._corpus: Corpus | None = None
+        self._packed = packed
+        self._pack_dir = location("pack", str(self._docs))
         self._loader = DataLoader(split)
 
-    def _load(self) -> tuple[list[dict], dict[str, str]]:
+    def _load(self) -> tuple[list[dict], DocumentStore]:
         """
         Load BRIGHT dataset using common loader.
 
@@ -80,38 +181,28 @@ class GrepBenchmark:
         """
         return self._loader.load()
 
-    def _prepare(self, documents: dict[str, str]) -> None:
+    def _prepare(self, documents: Mapping[str, str], fingerprint: str | None = None) -> None:
         """
-        Write documents to temporary directory as .txt files.
+        Materialize documents as .txt files in the corpus cache.
+
+        Unchanged documents, and the pack built from them, are
+        reused from earlier runs.
 
         Args:
             documents: Dict mapping doc_id to document text
+            fingerprint: Digest of the documents, skips hashing when unchanged
         """
-        logger.info(f"Preparing documents in {self._temp_dir}")
-        if self._temp_dir.exists():
-            shutil.rmtree(self._temp_dir)
-        self._temp_dir.mkdir(parents=True, exist_ok=True)
-        self._doc_to_file = {}
-        self._file_to_doc = {}
-        for identifier, content in documents.items():
-            name = identifier.replace("/", "_").replace("\\", "_")
-            if not name.endswith(".txt"):
-                name += ".txt"
-            path = self._temp_dir / name
-            path.write_text(content, encoding="utf-8")
-            self._doc_to_file[identifier] = name
-            self._file_to_doc[name] = identifier
-        logger.info(f"Wrote {len(documents)} documents to {self._temp_dir}")
-
-    def _patch(self) -> None:
-        """Patch settings.DOCS_FOLDER to use temporary directory."""
-        settings.DOCS_FOLDER = str(self._temp_dir)
-        logger.debug(f"Patched DOCS_FOLDER to {settings.DOCS_FOLDER}")
-
-    def _restore(self) -> None:
-        """Restore original settings.DOCS_FOLDER."""
-        settings.DOCS_FOLDER = self._original_folder
-        logger.debug(f"Restored DOCS_FOLDER to {settings.DOCS_FOLDER}")
+        logger.info(f"Preparing documents in {self._docs}")
+        self._cache.materialize(documents, fingerprint)
+        self._resolver = Resolver(self._cache.files())
+        if self._packed:
+            pack = Pack(self._pack_dir)
+            if pack.fresh(scan(str(self._docs))):
+                logger.info(f"Reusing packed corpus in {self._pack_dir}")
+            else:
+                count = pack.write(str(self._docs))
+                logger.info(f"Packed {count} documents into {self._pack_dir}")
+        self._corpus = Corpus(str(self._docs), packed=self._packed)
 
     def _extract(self, citations: list) -> list[str]:
         """
@@ -126,17 +217,7 @@ class GrepBenchmark:
         identifiers = []
         seen = set()
         for citation in citations:
-            location = citation.location
-            if location in self._file_to_doc:
-                identifier = self._file_to_doc[location]
-            else:
-                filename = Path(location).name
-                identifier = self._file_to_doc.get(filename)
-                if identifier is None:
-                    for known, doc_id in self._file_to_doc.items():
-                        if filename in known or known in filename:
-                            identifier = doc_id
-                            break
+            identifier = self._resolver.resolve(citation.location)
             if identifier and identifier not in seen:
                 identifiers.append(identifier)
                 seen.add(identifier)
@@ -156,8 +237,11 @@ class GrepBenchmark:
         text = data["query"]
         gold = data["gold_ids"]
         logger.info(f"Evaluating query {identifier}: {text[:100]}...")
+        start = time.perf_counter()
         try:
-            result = await run_agent(text)
+            result = await run_agent(text, corpus=self._corpus)
+            latency = time.perf_counter() - start
+            usage = result.usage
             citations = result.response.citations or []
             retrieved = self._extract(citations)
             logger.debug(f"Gold IDs: {gold[:5]}")
@@ -173,6 +257,14 @@ class GrepBenchmark:
                 gold_ids=gold,
                 retrieved_ids=retrieved,
                 recall_at_k=recall,
+                latency_seconds=latency,
+                llm_seconds=usage.elapsed_seconds,
+                tool_seconds=usage.tool_seconds,
+                iterations=usage.iterations,
+                tool_calls=dict(Counter(name for call in result.tool_calls for name in call)),
+                prompt_tokens=usage.prompt_tokens,
+                completion_tokens=usage.completion_tokens,
+                cost=usage.cost(settings.INPUT_PRICE, settings.OUTPUT_PRICE),
             )
         except Exception as exc:
             logger.error(f"Error evaluating query {identifier}: {exc}")
@@ -183,79 +275,171 @@ class GrepBenchmark:
                 retrieved_ids=[],
                 recall_at_k=0.0,
                 error=str(exc),
+                latency_seconds=time.perf_counter() - start,
             )
 
-    async def run(self, limit: int | None = None) -> AgentBenchmarkResult:
+    def prepare(self, limit: int | None = None) -> list[dict]:
         """
-        Run the benchmark.
+        Load the split and write its documents.
 
         Args:
             limit: Optional limit on number of queries to evaluate
 
         Returns:
-            AgentBenchmarkResult with overall metrics
+            Queries to evaluate
         """
         queries, documents = self._load()
-        self._prepare(documents)
-        if limit:
-            queries = queries[:limit]
-        self._patch()
-        try:
-            sem = asyncio.Semaphore(CONCURRENCY)
-            async def bounded(data: dict) -> AgentQueryResult:
-                async with sem:
-                    return await self._evaluate(data)
-            results = await asyncio.gather(*[bounded(q) for q in queries])
-            data = [
-                {"retrieved_ids": r.retrieved_ids, "gold_ids": r.gold_ids}
-                for r in results
-            ]
-            recall = mean_recall_at_k(data, k=TOP_K)
-            output = AgentBenchmarkResult(
-                split=self._split,
-                mean_recall_at_k=recall,
-                evaluated_queries=len(results),
-                total_queries=len(queries),
-                queries=[
-                    {
-                        "query_id": r.query_id,
-                        "query": r.query,
-                        "gold_ids": r.gold_ids,
-                        "retrieved_ids": r.retrieved_ids,
-                        "recall_at_k": r.recall_at_k,
-                        "error": r.error,
-                    }
-                    for r in results
-                ],
-            )
-            logger.info(
-                f"Benchmark complete: mean_recall@k={recall:.4f} "
-                f"({len(results)} queries)"
-            )
-            return output
-        finally:
-            self._restore()
+        self._prepare(documents, documents.fingerprint)
+        return queries[:limit] if limit else queries
+
+    async def run(
+        self, limit: int | None = None, checkpoint: Checkpoint | None = None
+    ) -> AgentBenchmarkResult:
+        """
+        Run the benchmark, appending every finished query to a checkpoint.
+
+        Queries already completed in the checkpoint are skipped.
+
+        Args:
+            limit: Optional limit on number of queries to evaluate
+            checkpoint: Checkpoint to resume, a fresh default one if omitted
+
+        Returns:
+            AgentBenchmarkResult with overall metrics
+        """
+        if checkpoint is None:
+            checkpoint = Checkpoint(checkpoint_path(self.split))
+            checkpoint.reset()
+        done = checkpoint.completed()
+        queries = [q for q in self.prepare(limit) if (self.split, q["id"]) not in done]
+        logger.info(f"Evaluating {len(queries)} queries, {len(done)} already completed")
+        sem = asyncio.Semaphore(CONCURRENCY)
+        async def bounded(data: dict) -> None:
+            async with sem:
+                result = await self._evaluate(data)
+            checkpoint.append({"split": self.split, **asdict(result)})
+        start = time.perf_counter()
+        await asyncio.gather(*[bounded(q) for q in queries])
+        elapsed = time.perf_counter() - start
+        return summarize(
+            self.split, select(checkpoint.records(), self.split), elapsed, len(queries)
+        )
 
     def cleanup(self) -> None:
-        """Remove temporary directory."""
-        if self._temp_dir.exists():
-            shutil.rmtree(self._temp_dir)
-            logger.info(f"Cleaned up {self._temp_dir}")
+        """Release the corpus, keeping its cached files for the next run."""
+        if self._corpus is not None:
+            self._corpus.close()
+            self._corpus = None
+
+
+async def run_all(
+    benchmarks: list[GrepBenchmark],
+    limit: int | None = None,
+    checkpoint: Checkpoint | None = None,
+) -> CombinedBenchmarkResult:
+    """
+    Run several splits at once under one shared concurrency budget.
+
+    Queries of all splits are interleaved, so every split makes
+    progress while the slowest one is still running. Every finished
+    query is appended to one checkpoint shared by all splits.
+
+    Args:
+        benchmarks: One benchmark per split
+        limit: Optional limit on number of queries per split
+        checkpoint: Checkpoint to resume, a fresh default one if omitted
+
+    Returns:
+        CombinedBenchmarkResult with per-split and overall metrics
+    """
+    if checkpoint is None:
+        checkpoint = Checkpoint(checkpoint_path("all"))
+        checkpoint.reset()
+    done = checkpoint.completed()
+    prepared = []
+    for benchmark in benchmarks:
+        queries = await asyncio.to_thread(benchmark.prepare, limit)
+        prepared.append(
+            [(benchmark, data) for data in queries if (benchmark.split, data["id"]) not in done]
+        )
+    order = [
+        item
+        for batch in itertools.zip_longest(*prepared)
+        for item in batch
+        if item is not None
+    ]
+    sem = asyncio.Semaphore(CONCURRENCY)
+    async def bounded(benchmark: GrepBenchmark, data: dict) -> None:
+        async with sem:
+            result = await benchmark._evaluate(data)
+        checkpoint.append({"split": benchmark.split, **asdict(result)})
+    start = time.perf_counter()
+    await asyncio.gather(*[bounded(b, q) for b, q in order])
+    elapsed = time.perf_counter() - start
+    splits = [
+        summarize(
+            benchmark.split,
+            select(checkpoint.records(), benchmark.split),
+            elapsed,
+            len(batch),
+        )
+        for benchmark, batch in zip(benchmarks, prepared)
+    ]
+    overall = summarize("all", checkpoint.records(), elapsed, len(order))
+    return CombinedBenchmarkResult(
+        splits=splits,
+        mean_recall_at_k=overall.mean_recall_at_k,
+        macro_recall_at_k=(
+            sum(split.mean_recall_at_k for split in splits) / len(splits) if splits else 0.0
+        ),
+        evaluated_queries=overall.evaluated_queries,
+        total_queries=overall.total_queries,
+        performance=overall.performance,
+        metrics=overall.metrics,
+    )
 
 
-def save(result: AgentBenchmarkResult, path: str) -> None:
-    """Save benchmark results to JSON file."""
-    output = Path(path)
-    output.parent.mkdir(parents=True, exist_ok=True)
+def save(result: AgentBenchmarkResult, path: str, checkpoint: Checkpoint) -> None:
+    """Save benchmark results to JSON file, streaming queries from the checkpoint."""
     data = {
         "split": result.split,
         "method": "greprag_agent",
         "mean_recall_at_k": result.mean_recall_at_k,
         "evaluated_queries": result.evaluated_queries,
         "total_queries": result.total_queries,
-        "queries": result.queries,
+        "performance": asdict(result.performance),
+        "metrics": result.metrics,
+        "queries": select(checkpoint.records(), result.split),
+    }
+    write(data, path)
+    logger.info(f"Results saved to {path}")
+
+
+def save_combined(
+    result: CombinedBenchmarkResult, path: str, checkpoint: Checkpoint
+) -> None:
+    """Save results of several splits to one JSON file, streaming queries."""
+    data = {
+        "method": "greprag_agent",
+        "mean_recall_at_k": result.mean_recall_at_k,
+        "macro_recall_at_k": result.macro_recall_at_k,
+        "evaluated_queries": result.evaluated_queries,
+        "total_queries": result.total_queries,
+        "performance": asdict(result.performance),
+        "metrics": result.metrics,
+        "splits": {
+            split.split: {
+                "mean_recall_at_k": split.mean_recall_at_k,
+                "evaluated_queries": split.evaluated_queries,
+                "total_queries": split.total_queries,
+                "performance": asdict(split.performance),
+                "metrics": split.metrics,
+                "queries": select(checkpoint.records(), split.split),
+            }
+            for split in result.splits
+        },
     }
-    output.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+    write(data, path)
     logger.info(f"Results saved to {path}")
 
 
@@ -268,8 +452,8 @@ async def main() -> None:
         "--split",
         type=str,
         default="biology",
-        choices=BRIGHT_SPLITS,
-        help="BRIGHT dataset split to evaluate",
+        choices=[*BRIGHT_SPLITS, "all"],
+        help="BRIGHT dataset split to evaluate, or all splits at once",
     )
     parser.add_argument(
         "--limit",
@@ -283,6 +467,34 @@ async def main() -> None:
         default=None,
         help="Output JSON file path for results",
     )
+    parser.add_argument(
+        "--packed",
+        action="store_true",
+        help="Pack documents into a single file before searching",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=str,
+        default=None,
+        help="JSON lines checkpoint path, defaults to cache/checkpoints/grep_{split}.jsonl",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip queries already completed in the checkpoint",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="sample",
+        choices=MODES,
+        help="Profile the run, by sampling stacks or with cProfile",
+    )
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="Also attribute peak memory with tracemalloc, slowing the run",
+    )
     parser.add_argument(
         "--verbose",
         "-v",
@@ -295,21 +507,61 @@ async def main() -> None:
     if args.verbose:
         logging.getLogger().setLevel(logging.DEBUG)
 
-    benchmark = GrepBenchmark(split=args.split)
+    with profiled(f"grep_{args.split}", args.profile, args.profile_memory):
+        await execute(args)
+
+
+async def execute(args: argparse.Namespace) -> None:
+    """Run the benchmark selected by the command line and report it."""
+    checkpoint = Checkpoint(Path(args.checkpoint or checkpoint_path(args.split)))
+    if not args.resume:
+        checkpoint.reset()
+
+    if args.split == "all":
+        benchmarks = [GrepBenchmark(split=split, packed=args.packed) for split in BRIGHT_SPLITS]
+        try:
+            combined = await run_all(benchmarks, limit=args.limit, checkpoint=checkpoint)
+            if args.output:
+                save_combined(combined, args.output, checkpoint)
+            else:
+                print(f"\n{'=' * 60}")
+                print("GrepRAG Benchmark Results: all splits")
+                print(f"{'=' * 60}")
+                for split in combined.splits:
+                    print(
+                        f"  {split.split:<22} R@k={split.mean_recall_at_k:.4f} "
+                        f"p50={split.performance.p50_latency_seconds:.1f}s "
+                        f"cost=${split.performance.total_cost:.4f}"
+                    )
+                print(f"{'=' * 60}")
+                print(f"Mean Recall@k: {combined.mean_recall_at_k:.4f}")
+                print(f"Macro Recall@k: {combined.macro_recall_at_k:.4f}")
+                print(describe(combined.performance))
+                print(report(combined.metrics))
+                print(f"Evaluated queries: {combined.evaluated_queries}")
+                print(f"{'=' * 60}\n")
+        finally:
+            for benchmark in benchmarks:
+                benchmark.cleanup()
+        return
+
+    benchmark = GrepBenchmark(split=args.split, packed=args.packed)
 
     try:
-        result = await benchmark.run(limit=args.limit)
+        result = await benchmark.run(limit=args.limit, checkpoint=checkpoint)
 
         if args.output:
-            save(result, args.output)
+            save(result, args.output, checkpoint)
         else:
             print(f"\n{'=' * 60}")
             print(f"GrepRAG Benchmark Results: {result.split}")
             print(f"{'=' * 60}")
             print(f"Mean Recall@k: {result.mean_recall_at_k:.4f}")
+            print(describe(result.performance))
+            print(report(result.metrics))
             print(f"Evaluated queries: {result.evaluated_queries}")
             print(f"{'=' * 60}\n")
-            for q in result.queries:
+            for q in select(checkpoint.records(), result.split):
                 status = "ERROR" if q["error"] else f"R@k={q['recall_at_k']:.3f}"
                 print(f"  [{q['query_id']}] {status}")
 
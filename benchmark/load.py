@@ -0,0 +1,248 @@
+"""
+Load test of run_agent against the local stub LLM server.
+
+Starts queries at a target Poisson arrival rate over a corpus and
+samples event-loop lag, in-flight runs, child processes and memory
+while they run.
+
+Usage:
+    python -m benchmark.load --rate 5 --duration 60 --latency 0.5
+    python -m benchmark.load --docs docs/ --rate 20 --output results/load.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import resource
+import shutil
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from openai import AsyncOpenAI
+
+from benchmark.base import percentile
+from benchmark.micro import generate
+from benchmark.stub import StubServer
+from search_agent.agent import run_agent
+from search_agent.corpus import Corpus
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_SECONDS = 0.5
+QUERY = "What does the corpus say about the most common topic?"
+
+
+@dataclass
+class Sample:
+    """Process state at one moment of the load test."""
+
+    at_seconds: float
+    loop_lag_ms: float
+    in_flight: int
+    subprocesses: int
+    rss_mb: float
+
+
+@dataclass
+class LoadResult:
+    """Outcome of a load test."""
+
+    target_rate: float
+    started: int
+    completed: int
+    errors: int
+    elapsed_seconds: float
+    throughput_per_second: float
+    p50_latency_seconds: float
+    p90_latency_seconds: float
+    p99_latency_seconds: float
+    p99_loop_lag_ms: float
+    max_loop_lag_ms: float
+    max_in_flight: int
+    max_subprocesses: int
+    peak_rss_mb: float
+    samples: list[Sample] = field(default_factory=list)
+
+
+def children() -> int:
+    """
+    Number of direct child processes, read from /proc.
+
+    Returns:
+        Child count, zero where /proc is unavailable
+    """
+    parent = str(os.getpid())
+    count = 0
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return 0
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", encoding="latin-1") as file:
+                fields = file.read().rpartition(")")[2].split()
+        except OSError:
+            continue
+        if len(fields) > 1 and fields[1] == parent:
+            count += 1
+    return count
+
+
+def rss() -> float:
+    """
+    Resident memory of this process in megabytes.
+
+    Returns:
+        Current RSS from /proc, or peak RSS where /proc is unavailable
+    """
+    try:
+        with open("/proc/self/statm", encoding="ascii") as file:
+            pages = int(file.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def load(
+    corpus: Corpus, client: AsyncOpenAI, rate: float, duration: float, seed: int = 0
+) -> LoadResult:
+    """
+    Run agent queries at a Poisson arrival rate and sample the process.
+
+    Args:
+        corpus: Corpus to search
+        client: Client of the LLM endpoint, normally the stub server
+        rate: Target arrivals per second
+        duration: Seconds to keep starting queries
+        seed: Random seed for arrival times
+
+    Returns:
+        LoadResult with latency, throughput and sampled process state
+    """
+    rng = random.Random(seed)
+    latencies: list[float] = []
+    errors = 0
+    running: set[asyncio.Task] = set()
+    samples: list[Sample] = []
+    loop = asyncio.get_running_loop()
+    begin = loop.time()
+
+    async def query() -> None:
+        nonlocal errors
+        start = time.perf_counter()
+        try:
+            await run_agent(QUERY, corpus=corpus, client=client)
+            latencies.append(time.perf_counter() - start)
+        except Exception as exc:
+            errors += 1
+            logger.warning(f"Query failed: {exc}")
+
+    async def sample() -> None:
+        while True:
+            expected = loop.time() + SAMPLE_SECONDS
+            await asyncio.sleep(SAMPLE_SECONDS)
+            samples.append(
+                Sample(
+                    at_seconds=loop.time() - begin,
+                    loop_lag_ms=max(0.0, loop.time() - expected) * 1000,
+                    in_flight=len(running),
+                    subprocesses=children(),
+                    rss_mb=rss(),
+                )
+            )
+
+    sampler = asyncio.create_task(sample())
+    started = 0
+    arrival = begin
+    while True:
+        arrival += rng.expovariate(rate)
+        if arrival - begin > duration:
+            break
+        await asyncio.sleep(max(0.0, arrival - loop.time()))
+        task = asyncio.create_task(query())
+        running.add(task)
+        task.add_done_callback(running.discard)
+        started += 1
+    if running:
+        await asyncio.wait(set(running))
+    sampler.cancel()
+    elapsed = loop.time() - begin
+    lags = [s.loop_lag_ms for s in samples]
+    return LoadResult(
+        target_rate=rate,
+        started=started,
+        completed=len(latencies),
+        errors=errors,
+        elapsed_seconds=elapsed,
+        throughput_per_second=len(latencies) / elapsed if elapsed > 0 else 0.0,
+        p50_latency_seconds=percentile(latencies, 50),
+        p90_latency_seconds=percentile(latencies, 90),
+        p99_latency_seconds=percentile(latencies, 99),
+        p99_loop_lag_ms=percentile(lags, 99),
+        max_loop_lag_ms=max(lags, default=0.0),
+        max_in_flight=max((s.in_flight for s in samples), default=0),
+        max_subprocesses=max((s.subprocesses for s in samples), default=0),
+        peak_rss_mb=max((s.rss_mb for s in samples), default=rss()),
+        samples=samples,
+    )
+
+
+async def main() -> None:
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(description="Load test run_agent against a stub LLM")
+    parser.add_argument("--rate", type=float, default=5.0, help="Arrivals per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of arrivals")
+    parser.add_argument("--latency", type=float, default=0.5, help="Stub seconds per answer")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Stub extra random seconds")
+    parser.add_argument("--docs", type=str, default=None, help="Corpus folder, synthetic by default")
+    parser.add_argument("--files", type=int, default=1000, help="Synthetic corpus files")
+    parser.add_argument("--output", type=str, default=None, help="Output JSON file path")
+    args = parser.parse_args()
+    stub = StubServer(latency=args.latency, jitter=args.jitter)
+    server = await stub.serve()
+    port = server.sockets[0].getsockname()[1]
+    client = AsyncOpenAI(base_url=f"http://127.0.0.1:{port}/v1", api_key="stub")
+    root = args.docs
+    if root is None:
+        root = tempfile.mkdtemp(prefix="load_")
+        generate(Path(root), files=args.files)
+    corpus = Corpus(root)
+    try:
+        result = await load(corpus, client, args.rate, args.duration)
+    finally:
+        await client.close()
+        server.close()
+        corpus.close()
+        if args.docs is None:
+            shutil.rmtree(root)
+    logger.info(f"Stub answered {stub.requests} requests")
+    if args.output:
+        path = Path(args.output)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(asdict(result), indent=2), encoding="utf-8")
+        logger.info(f"Results saved to {args.output}")
+    print(f"\n{'=' * 60}")
+    print(f"Load test: {result.target_rate:.1f} arrivals/s for {args.duration:.0f}s")
+    print(f"{'=' * 60}")
+    print(f"Started/completed/errors: {result.started}/{result.completed}/{result.errors}")
+    print(f"Throughput: {result.throughput_per_second:.2f} queries/s")
+    print(
+        f"Latency p50/p90/p99: {result.p50_latency_seconds:.2f}/"
+        f"{result.p90_latency_seconds:.2f}/{result.p99_latency_seconds:.2f}s"
+    )
+    print(f"Loop lag p99/max: {result.p99_loop_lag_ms:.1f}/{result.max_loop_lag_ms:.1f} ms")
+    print(f"Max in flight: {result.max_in_flight}")
+    print(f"Max subprocesses: {result.max_subprocesses}")
+    print(f"Peak RSS: {result.peak_rss_mb:.1f} MB")
+    print(f"{'=' * 60}\n")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,357 @@
+"""
+Offline micro-benchmarks of the search layer on a synthetic corpus.
+
+Measures UgrepSearch, UgrepParser, list_folder and tree without
+datasets, network or an LLM. Components whose tools are not
+installed are reported as skipped.
+
+Usage:
+    python -m benchmark.micro --files 2000 --patterns 50
+    python -m benchmark.micro --files 20000 --pdf-ratio 0.2 --output results/micro.json
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import random
+import shutil
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from benchmark.base import percentile
+from search_agent.folders import list_folder, tree
+from search_agent.parser import UgrepParser
+from search_agent.ugrep import UgrepSearch
+
+logger = logging.getLogger(__name__)
+
+VOCABULARY_SIZE = 5000
+LINE_WORDS = 12
+ROUNDS = 3
+
+
+@dataclass
+class ComponentResult:
+    """Timing of one component over its workload."""
+
+    component: str
+    operations: int
+    total_seconds: float
+    operations_per_second: float
+    p50_ms: float
+    p90_ms: float
+    p99_ms: float
+    skipped: str | None = None
+
+
+def vocabulary(seed: int) -> list[str]:
+    """
+    Deterministic list of pseudo words.
+
+    Args:
+        seed: Random seed
+
+    Returns:
+        Words of three to ten lowercase letters
+    """
+    rng = random.Random(seed)
+    letters = "etaoinshrdlucmfwypvbgkqjxz"
+    weights = list(range(len(letters), 0, -1))
+    return [
+        "".join(rng.choices(letters, weights, k=rng.randint(3, 10)))
+        for _ in range(VOCABULARY_SIZE)
+    ]
+
+
+def pdf(lines: list[str]) -> bytes:
+    """
+    Minimal single-page PDF showing lines of text.
+
+    Args:
+        lines: Text lines, ASCII only
+
+    Returns:
+        PDF file content with a valid cross-reference table
+
+    Example:
+        >>> pdf(["hello"]).startswith(b"%PDF-1.4")
+        True
+    """
+    text = "".join(
+        f"({line.replace(chr(92), '').replace('(', '').replace(')', '')}) Tj T* "
+        for line in lines
+    )
+    stream = f"BT /F1 10 Tf 12 TL 40 800 Td {text}ET".encode("ascii", "replace")
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+        b"/Contents 4 0 R /Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length " + str(len(stream)).encode() + b" >>\nstream\n" + stream + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n".encode()
+    out += f"startxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def generate(
+    root: Path,
+    files: int = 1000,
+    mean_size: int = 4000,
+    pdf_ratio: float = 0.1,
+    fanout: int = 8,
+    depth: int = 2,
+    seed: int = 0,
+) -> list[str]:
+    """
+    Write a deterministic synthetic corpus.
+
+    File sizes follow an exponential distribution around mean_size;
+    files are spread over fanout folders per level down to depth.
+
+    Args:
+        root: Target folder
+        files: Number of files
+        mean_size: Mean file size in characters
+        pdf_ratio: Share of files written as PDF
+        fanout: Subfolders per folder
+        depth: Folder levels below root
+        seed: Random seed
+
+    Returns:
+        Vocabulary the corpus was written from
+
+    Example:
+        >>> import tempfile
+        >>> with tempfile.TemporaryDirectory() as folder:
+        ...     _ = generate(Path(folder), files=5, fanout=2)
+        ...     len([p for p in Path(folder).rglob("*") if p.is_file()])
+        5
+    """
+    rng = random.Random(seed)
+    words = vocabulary(seed)
+    weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(words))))
+    folders = [Path()]
+    for _ in range(depth):
+        folders = [parent / f"d{idx}" for parent in folders for idx in range(fanout)]
+    for number in range(files):
+        size = max(80, int(rng.expovariate(1 / mean_size)))
+        lines = []
+        length = 0
+        while length < size:
+            line = " ".join(rng.choices(words, cum_weights=weights, k=LINE_WORDS))
+            lines.append(line)
+            length += len(line) + 1
+        folder = root / rng.choice(folders)
+        folder.mkdir(parents=True, exist_ok=True)
+        if rng.random() < pdf_ratio:
+            (folder / f"doc{number:06d}.pdf").write_bytes(pdf(lines))
+        else:
+            (folder / f"doc{number:06d}.txt").write_text("\n".join(lines) + "\n")
+    return words
+
+
+def workload(words: list[str], count: int, seed: int = 0) -> list[tuple[str, str | None]]:
+    """
+    Scripted search patterns with optional path restriction.
+
+    Mixes frequent and rare literals, alternations and phrases.
+
+    Args:
+        words: Corpus vocabulary, most frequent first
+        count: Number of patterns
+        seed: Random seed
+
+    Returns:
+        Pairs of pattern and path
+    """
+    rng = random.Random(seed)
+    common = words[:50]
+    rare = words[-1000:]
+    patterns = []
+    for idx in range(count):
+        kind = idx % 5
+        if kind == 0:
+            patterns.append((rng.choice(common), None))
+        elif kind == 1:
+            patterns.append((rng.choice(rare), None))
+        elif kind == 2:
+            patterns.append(("|".join(rng.sample(rare, 3)), None))
+        elif kind == 3:
+            patterns.append((rf"{rng.choice(common)}\s+{rng.choice(common)}", None))
+        else:
+            patterns.append((rng.choice(common), "d0"))
+    return patterns
+
+
+def output(root: Path, blocks: int, seed: int = 0) -> str:
+    """
+    Search output in ugrep row format built from the corpus text files.
+
+    Args:
+        root: Corpus folder
+        blocks: Number of result blocks
+        seed: Random seed
+
+    Returns:
+        Output with blocks of matching and context rows
+    """
+    rng = random.Random(seed)
+    paths = sorted(root.rglob("*.txt"))[:blocks]
+    chunks = []
+    for path in paths:
+        lines = path.read_text().split("\n")
+        start = rng.randrange(max(1, len(lines) - 3))
+        rows = [
+            f"{path}{':' if offset == 1 else '-'}{start + offset + 1}"
+            f"{':' if offset == 1 else '-'}{lines[start + offset]}"
+            for offset in range(min(3, len(lines) - start))
+        ]
+        chunks.append("\n".join(rows))
+    return "\n--\n".join(chunks) + "\n"
+
+
+async def timed(
+    name: str, operations: list[Callable[[], Awaitable[object]]]
+) -> ComponentResult:
+    """
+    Run operations one at a time and summarize their latency.
+
+    Args:
+        name: Component name
+        operations: Coroutine factories, one per operation
+
+    Returns:
+        ComponentResult with throughput and latency percentiles
+    """
+    latencies = []
+    for operation in operations:
+        start = time.perf_counter()
+        await operation()
+        latencies.append(time.perf_counter() - start)
+    total = sum(latencies)
+    return ComponentResult(
+        component=name,
+        operations=len(latencies),
+        total_seconds=total,
+        operations_per_second=len(latencies) / total if total > 0 else 0.0,
+        p50_ms=percentile(latencies, 50) * 1000,
+        p90_ms=percentile(latencies, 90) * 1000,
+        p99_ms=percentile(latencies, 99) * 1000,
+    )
+
+
+def skipped(name: str, reason: str) -> ComponentResult:
+    """Result of a component that could not run."""
+    return ComponentResult(name, 0, 0.0, 0.0, 0.0, 0.0, 0.0, skipped=reason)
+
+
+async def suite(root: Path, words: list[str], patterns: int) -> list[ComponentResult]:
+    """
+    Benchmark every search layer component on a generated corpus.
+
+    Args:
+        root: Corpus folder
+        words: Corpus vocabulary
+        patterns: Number of search patterns
+
+    Returns:
+        One result per component
+    """
+    results = []
+    script = workload(words, patterns)
+    if shutil.which("ug"):
+        search = UgrepSearch(folder=str(root))
+        results.append(
+            await timed(
+                "ugrep_search",
+                [
+                    lambda pattern=pattern, path=path: search.execute(
+                        pattern, str(root / path) if path else None
+                    )
+                    for pattern, path in script
+                ],
+            )
+        )
+    else:
+        results.append(skipped("ugrep_search", "ug is not installed"))
+    parser = UgrepParser()
+    text = output(root, blocks=200)
+
+    async def parse() -> None:
+        parser.spans(text)
+
+    results.append(await timed("ugrep_parser", [parse] * patterns * ROUNDS))
+    folders = sorted(str(path.relative_to(root)) for path in root.rglob("*") if path.is_dir())
+    results.append(
+        await timed(
+            "list_folder",
+            [
+                lambda folder=folder: list_folder(folder, str(root))
+                for folder in folders * ROUNDS
+            ],
+        )
+    )
+    if shutil.which("tree"):
+        results.append(await timed("tree", [lambda: tree(str(root))] * ROUNDS))
+    else:
+        results.append(skipped("tree", "tree is not installed"))
+    return results
+
+
+async def main() -> None:
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(description="Search layer micro-benchmarks")
+    parser.add_argument("--files", type=int, default=2000, help="Number of files")
+    parser.add_argument("--mean-size", type=int, default=4000, help="Mean file size in chars")
+    parser.add_argument("--pdf-ratio", type=float, default=0.1, help="Share of PDF files")
+    parser.add_argument("--fanout", type=int, default=8, help="Subfolders per folder")
+    parser.add_argument("--depth", type=int, default=2, help="Folder levels")
+    parser.add_argument("--patterns", type=int, default=50, help="Number of search patterns")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--output", type=str, default=None, help="Output JSON file path")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    root = Path(tempfile.mkdtemp(prefix="micro_"))
+    try:
+        start = time.perf_counter()
+        words = generate(
+            root, args.files, args.mean_size, args.pdf_ratio, args.fanout, args.depth, args.seed
+        )
+        logger.info(f"Generated {args.files} files in {time.perf_counter() - start:.1f}s")
+        results = await suite(root, words, args.patterns)
+    finally:
+        shutil.rmtree(root)
+    if args.output:
+        path = Path(args.output)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = {"config": vars(args), "components": [asdict(r) for r in results]}
+        path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        logger.info(f"Results saved to {args.output}")
+    print(f"\n{'component':<14} {'ops':>6} {'ops/s':>10} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9}")
+    for r in results:
+        if r.skipped:
+            print(f"{r.component:<14} skipped: {r.skipped}")
+            continue
+        print(
+            f"{r.component:<14} {r.operations:>6} {r.operations_per_second:>10.1f} "
+            f"{r.p50_ms:>9.2f} {r.p90_ms:>9.2f} {r.p99_ms:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
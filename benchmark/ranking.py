@@ -0,0 +1,129 @@
+"""Vectorized ranking metrics over all queries of a run at once."""
+
+from collections.abc import Sequence
+
+import numpy as np
+
+CUTOFFS = (1, 5, 10, 20)
+
+
+def relevance(
+    retrieved: Sequence[Sequence[str]], gold: Sequence[Sequence[str]], depth: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Pack retrieval runs into a relevance matrix.
+
+    A cell is set when the document at that rank is relevant and was
+    not retrieved at a higher rank, so duplicates count once as in
+    recall_at_k.
+
+    Args:
+        retrieved: Ranked document IDs per query
+        gold: Relevant document IDs per query
+        depth: Number of ranks to keep
+
+    Returns:
+        Relevance matrix (queries, depth), gold list sizes and
+        distinct relevant document counts per query
+
+    Example:
+        >>> hits, sizes, distinct = relevance([["a", "x", "a", "b"]], [["a", "b"]], 3)
+        >>> hits.astype(int).tolist(), sizes.tolist(), distinct.tolist()
+        ([[1, 0, 0]], [2.0], [2.0])
+    """
+    hits = np.zeros((len(retrieved), depth), dtype=bool)
+    sizes = np.zeros(len(retrieved), dtype=np.float64)
+    distinct = np.zeros(len(retrieved), dtype=np.float64)
+    for row, (ranking, relevant) in enumerate(zip(retrieved, gold)):
+        wanted = set(relevant)
+        sizes[row] = len(relevant)
+        distinct[row] = len(wanted)
+        for rank, identifier in enumerate(ranking[:depth]):
+            if identifier in wanted:
+                hits[row, rank] = True
+                wanted.discard(identifier)
+    return hits, sizes, distinct
+
+
+def evaluate(
+    retrieved: Sequence[Sequence[str]],
+    gold: Sequence[Sequence[str]],
+    cutoffs: Sequence[int] = CUTOFFS,
+) -> dict[str, np.ndarray]:
+    """
+    Per-query Recall@K, Precision@K, nDCG@K, MRR and MAP.
+
+    Recall divides by the gold list size like recall_at_k; MRR and
+    MAP look at the deepest cutoff. Queries without gold documents
+    score zero everywhere.
+
+    Args:
+        retrieved: Ranked document IDs per query
+        gold: Relevant document IDs per query
+        cutoffs: Values of K
+
+    Returns:
+        Mapping of metric name to one score per query
+
+    Example:
+        >>> scores = evaluate([["a", "x", "b"]], [["a", "b"]], cutoffs=(1, 3))
+        >>> scores["recall@1"].tolist(), scores["recall@3"].tolist(), scores["mrr"].tolist()
+        ([0.5], [1.0], [1.0])
+        >>> round(float(scores["map"][0]), 4)
+        0.8333
+    """
+    depth = max(cutoffs)
+    hits, sizes, distinct = relevance(retrieved, gold, depth)
+    found = np.cumsum(hits, axis=1, dtype=np.float64)
+    ranks = np.arange(1, depth + 1, dtype=np.float64)
+    discounts = 1 / np.log2(ranks + 1)
+    gains = np.cumsum(hits * discounts, axis=1)
+    ideal = np.concatenate(([0.0], np.cumsum(discounts)))
+    scores: dict[str, np.ndarray] = {}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for k in cutoffs:
+            scores[f"recall@{k}"] = np.where(sizes > 0, found[:, k - 1] / sizes, 0.0)
+        for k in cutoffs:
+            scores[f"precision@{k}"] = found[:, k - 1] / k
+        for k in cutoffs:
+            best = ideal[np.minimum(distinct, k).astype(np.int64)]
+            scores[f"ndcg@{k}"] = np.where(best > 0, gains[:, k - 1] / best, 0.0)
+        first = np.where(hits.any(axis=1), hits.argmax(axis=1) + 1, 0)
+        scores["mrr"] = np.where(first > 0, 1 / np.maximum(first, 1), 0.0)
+        precision = np.where(hits, found / ranks, 0.0).sum(axis=1)
+        scores["map"] = np.where(distinct > 0, precision / distinct, 0.0)
+    return scores
+
+
+def means(
+    retrieved: Sequence[Sequence[str]],
+    gold: Sequence[Sequence[str]],
+    cutoffs: Sequence[int] = CUTOFFS,
+) -> dict[str, float]:
+    """
+    Mean of every metric over all queries.
+
+    Args:
+        retrieved: Ranked document IDs per query
+        gold: Relevant document IDs per query
+        cutoffs: Values of K
+
+    Returns:
+        Mapping of metric name to mean score, empty without queries
+    """
+    if not retrieved:
+        return {}
+    return {
+        name: float(values.mean()) for name, values in evaluate(retrieved, gold, cutoffs).items()
+    }
+
+
+def report(scores: dict[str, float]) -> str:
+    """
+    One line of metric means for console output.
+
+    Example:
+        >>> report({"recall@10": 0.5, "mrr": 0.25})
+        'recall@10=0.5000 mrr=0.2500'
+    """
+    return " ".join(f"{name}={value:.4f}" for name, value in scores.items())
@@ -0,0 +1,195 @@
+"""
+Resolution of citation locations to benchmark document IDs.
+
+Usage:
+    python -m benchmark.resolver --files 100000 --citations 2000
+"""
+
+import argparse
+import random
+import string
+import time
+from pathlib import Path
+from typing import final
+
+GRAM = 3
+MAX_CACHED = 100_000
+
+
+def naive(files: dict[str, str], location: str) -> str | None:
+    """
+    Reference resolution by a linear scan over all file names.
+
+    Args:
+        files: Mapping of file name to document ID
+        location: Citation location, a path or file name
+
+    Returns:
+        Document ID or None
+    """
+    if location in files:
+        return files[location]
+    filename = Path(location).name
+    identifier = files.get(filename)
+    if identifier is None:
+        for known, doc_id in files.items():
+            if filename in known or known in filename:
+                return doc_id
+    return identifier
+
+
+@final
+class Resolver:
+    """
+    Index-backed resolution of citation locations to document IDs.
+
+    Matches the linear scan of naive(): an exact key, then the
+    base name, then the first file name in mapping order that
+    contains the base name or is contained in it. Names containing
+    the base name are found through a trigram index, names contained
+    in it through a lookup of its substrings.
+
+    Example:
+        >>> resolver = Resolver({"a_b.txt": "a/b", "c.txt": "c"})
+        >>> resolver.resolve("docs/a_b.txt"), resolver.resolve("a_b"), resolver.resolve("xc.txt")
+        ('a/b', 'a/b', 'c')
+    """
+
+    def __init__(self, files: dict[str, str]):
+        """
+        Build indexes over file names.
+
+        Args:
+            files: Mapping of file name to document ID
+        """
+        self._files = files
+        self._names = list(files)
+        self._order = {name: idx for idx, name in enumerate(self._names)}
+        self._lengths = sorted({len(name) for name in self._names})
+        self._grams: dict[str, list[int]] = {}
+        for idx, name in enumerate(self._names):
+            for gram in {name[i : i + GRAM] for i in range(len(name) - GRAM + 1)}:
+                self._grams.setdefault(gram, []).append(idx)
+        self._cache: dict[str, str | None] = {}
+
+    def resolve(self, location: str) -> str | None:
+        """
+        Document ID cited by location.
+
+        Args:
+            location: Citation location, a path or file name
+
+        Returns:
+            Document ID or None
+        """
+        if location in self._files:
+            return self._files[location]
+        filename = Path(location).name
+        if filename in self._files:
+            return self._files[filename]
+        if filename not in self._cache:
+            if len(self._cache) >= MAX_CACHED:
+                self._cache.clear()
+            self._cache[filename] = self._partial(filename)
+        return self._cache[filename]
+
+    def _partial(self, filename: str) -> str | None:
+        """First file name in mapping order overlapping filename."""
+        found = min(self._containing(filename), self._contained(filename))
+        if found == len(self._names):
+            return None
+        return self._files[self._names[found]]
+
+    def _containing(self, filename: str) -> int:
+        """Position of first name that contains filename, or past the end."""
+        if len(filename) < GRAM:
+            candidates = range(len(self._names))
+        else:
+            postings = []
+            for i in range(len(filename) - GRAM + 1):
+                posting = self._grams.get(filename[i : i + GRAM])
+                if posting is None:
+                    return len(self._names)
+                postings.append(posting)
+            candidates = min(postings, key=len)
+        for idx in candidates:
+            if filename in self._names[idx]:
+                return idx
+        return len(self._names)
+
+    def _contained(self, filename: str) -> int:
+        """Position of first name contained in filename, or past the end."""
+        best = len(self._names)
+        for length in self._lengths:
+            if length > len(filename):
+                break
+            for start in range(len(filename) - length + 1):
+                idx = self._order.get(filename[start : start + length])
+                if idx is not None and idx < best:
+                    best = idx
+        return best
+
+
+def synthetic(count: int, seed: int = 0) -> dict[str, str]:
+    """
+    Mapping of file name to document ID shaped like BRIGHT splits.
+
+    Args:
+        count: Number of files
+        seed: Random seed
+
+    Returns:
+        Mapping of file name to document ID
+    """
+    rng = random.Random(seed)
+    files = {}
+    while len(files) < count:
+        words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9))) for _ in range(3)]
+        identifier = f"{'_'.join(words)}/{rng.randint(0, 99)}.txt"
+        files[identifier.replace("/", "_")] = identifier
+    return files
+
+
+def main() -> None:
+    """Compare resolution time of Resolver against the linear scan."""
+    parser = argparse.ArgumentParser(description="Citation resolver micro-benchmark")
+    parser.add_argument("--files", type=int, default=100_000, help="Number of files")
+    parser.add_argument("--citations", type=int, default=2000, help="Number of citations")
+    parser.add_argument("--naive", type=int, default=50, help="Citations resolved by linear scan")
+    args = parser.parse_args()
+    files = synthetic(args.files)
+    names = list(files)
+    rng = random.Random(1)
+    citations = []
+    for _ in range(args.citations):
+        name = rng.choice(names)
+        kind = rng.randrange(4)
+        if kind == 0:
+            citations.append(f"docs/{name}")
+        elif kind == 1:
+            citations.append(name.removesuffix(".txt"))
+        elif kind == 2:
+            citations.append(f"docs/copy_of_{name}")
+        else:
+            citations.append(f"docs/missing_{rng.randrange(10**9)}.md")
+    start = time.perf_counter()
+    resolver = Resolver(files)
+    built = time.perf_counter() - start
+    start = time.perf_counter()
+    resolved = [resolver.resolve(location) for location in citations]
+    indexed = (time.perf_counter() - start) / len(citations)
+    sample = citations[: args.naive]
+    start = time.perf_counter()
+    expected = [naive(files, location) for location in sample]
+    scanned = (time.perf_counter() - start) / len(sample)
+    if expected != resolved[: len(sample)]:
+        raise SystemExit("Resolver disagrees with linear scan")
+    print(f"Files: {len(files)}, citations: {len(citations)}")
+    print(f"Index build: {built * 1000:.0f} ms")
+    print(f"Resolver: {indexed * 1e6:.1f} us per citation")
+    print(f"Linear scan: {scanned * 1e6:.1f} us per citation")
+    print(f"Speedup: {scanned / indexed:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Local OpenAI-compatible chat completions server with scripted answers.
+
+Every agent turn gets the next scripted batch of tool calls; once
+the script is used up the model stops calling tools, and requests
+for structured output get a fixed final answer.
+
+Usage:
+    python -m benchmark.stub --port 8765 --latency 0.5
+    LLM_BASE_URL=http://127.0.0.1:8765/v1 python -m search_agent.agent "query"
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import random
+import time
+from typing import final
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY_BYTES = 64 * 1024 * 1024
+SCRIPT: list[list[dict]] = [
+    [{"name": "list_folder", "arguments": {"folder": ""}}],
+    [
+        {"name": "search", "arguments": {"pattern": "the"}},
+        {"name": "count", "arguments": {"pattern": "and"}},
+    ],
+    [{"name": "term_stats", "arguments": {"terms": ["the", "and"]}}],
+]
+ANSWER = {"question": "stub question", "answer": "stub answer"}
+
+
+@final
+class StubServer:
+    """
+    Answers POST .../chat/completions with scripted tool calls.
+
+    Example:
+        >>> server = StubServer(latency=0.0)
+        >>> reply = server.reply({"messages": [{"role": "user", "content": "q"}]})
+        >>> reply["choices"][0]["message"]["tool_calls"][0]["function"]["name"]
+        'list_folder'
+    """
+
+    def __init__(
+        self,
+        script: list[list[dict]] | None = None,
+        latency: float = 0.5,
+        jitter: float = 0.0,
+        seed: int = 0,
+    ):
+        """
+        Initialize server.
+
+        Args:
+            script: Tool calls per agent turn, each with name and arguments
+            latency: Seconds to wait before every answer
+            jitter: Extra uniform random wait of up to this many seconds
+            seed: Random seed for jitter
+        """
+        self._script = SCRIPT if script is None else script
+        self._latency = latency
+        self._jitter = jitter
+        self._rng = random.Random(seed)
+        self._ids = itertools.count()
+        self.requests = 0
+
+    def reply(self, request: dict) -> dict:
+        """
+        Completion for a chat request.
+
+        Args:
+            request: Chat completions request body
+
+        Returns:
+            Chat completion response body
+        """
+        self.requests += 1
+        messages = request.get("messages", [])
+        turn = sum(1 for message in messages if message.get("role") == "assistant")
+        message: dict = {"role": "assistant", "content": ""}
+        finish = "stop"
+        if request.get("response_format"):
+            message["content"] = json.dumps(ANSWER)
+        elif turn < len(self._script):
+            message["tool_calls"] = [
+                {
+                    "id": f"call_{next(self._ids)}",
+                    "type": "function",
+                    "function": {
+                        "name": call["name"],
+                        "arguments": json.dumps(call["arguments"]),
+                    },
+                }
+                for call in self._script[turn]
+            ]
+            finish = "tool_calls"
+        prompt = sum(len(str(m.get("content", ""))) for m in messages) // 4
+        completion = len(json.dumps(message)) // 4
+        return {
+            "id": f"chatcmpl-{next(self._ids)}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "stub"),
+            "choices": [{"index": 0, "message": message, "finish_reason": finish}],
+            "usage": {
+                "prompt_tokens": prompt,
+                "completion_tokens": completion,
+                "total_tokens": prompt + completion,
+            },
+        }
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 0) -> asyncio.Server:
+        """
+        Start listening, port 0 picks a free port.
+
+        Args:
+            host: Interface to bind
+            port: TCP port
+
+        Returns:
+            Running server
+        """
+        return await asyncio.start_server(self._connection, host, port)
+
+    async def _connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Answer HTTP/1.1 requests of one keep-alive connection."""
+        try:
+            while line := await reader.readline():
+                method, path, _ = line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while (header := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = header.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = min(int(headers.get("content-length", 0)), MAX_BODY_BYTES)
+                body = await reader.readexactly(length) if length else b""
+                if method == "POST" and path.rstrip("/").endswith("/chat/completions"):
+                    await asyncio.sleep(self._latency + self._rng.uniform(0, self._jitter))
+                    status, payload = "200 OK", self.reply(json.loads(body))
+                else:
+                    status, payload = "404 Not Found", {"error": {"message": f"No route {path}"}}
+                data = json.dumps(payload).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n\r\n".encode("latin-1") + data
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError) as exc:
+            logger.debug(f"Stub connection closed: {exc}")
+        finally:
+            writer.close()
+
+
+async def main() -> None:
+    """Serve the stub until interrupted."""
+    parser = argparse.ArgumentParser(description="Stub OpenAI-compatible LLM server")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port")
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds per answer")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random seconds")
+    parser.add_argument("--script", type=str, default=None, help="JSON file with tool calls per turn")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    script = None
+    if args.script:
+        with open(args.script, encoding="utf-8") as file:
+            script = json.load(file)
+    server = await StubServer(script, args.latency, args.jitter).serve(args.host, args.port)
+    logger.info(f"Stub LLM listening on http://{args.host}:{args.port}/v1")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -10,6 +10,7 @@ Usage:
 
 import argparse
 import logging
+import time
 from pathlib import Path
 from typing import final
 
@@ -18,13 +19,19 @@ from benchmark.base import (
     BaseBenchmark,
     BenchmarkResult,
     DataLoader,
+    DocumentStore,
     QueryResult,
+    describe,
+    performance,
     save,
 )
+from benchmark.corpus import CorpusCache
 from benchmark.metrics import mean_recall_at_k, recall_at_k
+from benchmark.ranking import means, report
 from benchmark.vector_store.database import SqliteVectorStorage
 from benchmark.vector_store.embeddings import GemmaEmbedder
 from benchmark.vector_store.retriever import VectorRetriever
+from search_agent.profiler import MODES, profiled
 
 logger = logging.getLogger(__name__)
 
@@ -37,7 +44,9 @@ class VectorBenchmark(BaseBenchmark):
     BRIGHT benchmark runner for vector store evaluation.
 
     Loads BRIGHT dataset, indexes documents using embeddings,
-    and evaluates retrieval quality using Recall@K.
+    and evaluates retrieval quality using Recall@K. Documents are
+    indexed from the corpus cache shared with the grep benchmark,
+    so both methods see the same files.
 
     Example:
         >>> benchmark = VectorBenchmark("biology")
@@ -45,25 +54,27 @@ class VectorBenchmark(BaseBenchmark):
         >>> print(f"Recall@K: {result.recall:.4f}")
     """
 
-    def __init__(self, split: str, db: str | None = None):
+    def __init__(self, split: str, db: str | None = None, folder: Path | None = None):
         """
         Initialize benchmark for given split.
 
         Args:
             split: BRIGHT dataset split name
             db: Database file path, defaults to data/{split}.db
+            folder: Optional corpus cache folder, shared with the grep benchmark
         """
         self._split = split
         self._db = db or f"data/{split}.db"
         self._loader = DataLoader(split)
+        self._cache = CorpusCache(split, folder)
         self._retriever: VectorRetriever | None = None
 
-    def _index(self, documents: dict[str, str]) -> None:
+    def _index(self, documents: DocumentStore) -> None:
         """
-        Index documents into vector store.
+        Index documents of the shared corpus cache into vector store.
 
         Args:
-            documents: Dict mapping doc_id to content
+            documents: Source documents, materialized into the cache if needed
         """
         path = Path(self._db)
         path.parent.mkdir(parents=True, exist_ok=True)
@@ -74,9 +85,9 @@ class VectorBenchmark(BaseBenchmark):
         if storage.count() > 0:
             logger.info(f"Using existing index with {storage.count()} documents")
             return
-        items = list(documents.items())
-        logger.info(f"Indexing {len(items)} documents to {path}")
-        self._retriever.index(items)
+        self._cache.materialize(documents, documents.fingerprint)
+        logger.info(f"Indexing {len(self._cache.files())} documents to {path}")
+        self._retriever.index(self._cache.documents())
         logger.info("Indexing complete")
 
     def _evaluate(self, query: dict) -> QueryResult:
@@ -93,6 +104,7 @@ class VectorBenchmark(BaseBenchmark):
         text = query["query"]
         gold = query["gold_ids"]
         logger.debug(f"Evaluating query {identifier}")
+        start = time.perf_counter()
         try:
             retrieved = self._retriever.retrieve(text, limit=TOP_K)
             recall = recall_at_k(retrieved, gold, k=TOP_K)
@@ -102,6 +114,7 @@ class VectorBenchmark(BaseBenchmark):
                 gold=gold,
                 retrieved=retrieved,
                 recall=recall,
+                latency=time.perf_counter() - start,
             )
         except Exception as exc:
             logger.error(f"Query {identifier} failed: {exc}")
@@ -112,6 +125,7 @@ class VectorBenchmark(BaseBenchmark):
                 retrieved=[],
                 recall=0.0,
                 error=str(exc),
+                latency=time.perf_counter() - start,
             )
 
     def run(self, limit: int | None = None) -> BenchmarkResult:
@@ -128,7 +142,9 @@ class VectorBenchmark(BaseBenchmark):
         self._index(documents)
         if limit:
             queries = queries[:limit]
+        start = time.perf_counter()
         results = [self._evaluate(q) for q in queries]
+        elapsed = time.perf_counter() - start
         data = [{"retrieved_ids": r.retrieved, "gold_ids": r.gold} for r in results]
         recall = mean_recall_at_k(data, k=TOP_K)
         return BenchmarkResult(
@@ -144,10 +160,15 @@ class VectorBenchmark(BaseBenchmark):
                     "gold_ids": r.gold,
                     "retrieved_ids": r.retrieved,
                     "recall_at_k": r.recall,
+                    "latency_seconds": r.latency,
                     "error": r.error,
                 }
                 for r in results
             ],
+            performance=performance(
+                [r.latency for r in results], [r.recall for r in results], elapsed
+            ),
+            metrics=means([r.retrieved for r in results], [r.gold for r in results]),
         )
 
 
@@ -181,6 +202,18 @@ def main() -> None:
         default=None,
         help="Database file path, defaults to data/{split}.db",
     )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="sample",
+        choices=MODES,
+        help="Profile the run, by sampling stacks or with cProfile",
+    )
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="Also attribute peak memory with tracemalloc, slowing the run",
+    )
     parser.add_argument(
         "--verbose",
         "-v",
@@ -193,7 +226,8 @@ def main() -> None:
         format="%(asctime)s %(levelname)s %(name)s: %(message)s",
     )
     benchmark = VectorBenchmark(split=args.split, db=args.db)
-    result = benchmark.run(limit=args.limit)
+    with profiled(f"vector_{args.split}", args.profile, args.profile_memory):
+        result = benchmark.run(limit=args.limit)
     if args.output:
         save(result, args.output)
     else:
@@ -202,6 +236,8 @@ def main() -> None:
         print(f"{'=' * 60}")
         print(f"Method: {result.method}")
         print(f"Mean Recall@k: {result.recall:.4f}")
+        print(describe(result.performance))
+        print(report(result.metrics))
         print(f"Evaluated queries: {result.evaluated}")
         print(f"{'=' * 60}\n")
         for q in result.queries:
@@ -1,6 +1,7 @@
 """Abstract base classes for vector store components."""
 
 from abc import ABC, abstractmethod
+from collections.abc import Iterable
 
 
 class Encoder(ABC):
@@ -89,12 +90,12 @@ class Retriever(ABC):
     """
 
     @abstractmethod
-    def index(self, documents: list[tuple[str, str]]) -> None:
+    def index(self, documents: Iterable[tuple[str, str]]) -> None:
         """
         Index documents for retrieval.
 
         Args:
-            documents: List of (doc_id, content) tuples
+            documents: Iterable of (doc_id, content) tuples
         """
         ...
 
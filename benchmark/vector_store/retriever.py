@@ -1,5 +1,6 @@
 """Combined retriever using embeddings and vector storage."""
 
+from collections.abc import Iterable
 from typing import final
 
 from benchmark.vector_store.base import Encoder, Retriever, Storage
@@ -35,7 +36,7 @@ class VectorRetriever(Retriever):
         self._encoder = encoder
         self._storage = storage
 
-    def index(self, documents: list[tuple[str, str]]) -> None:
+    def index(self, documents: Iterable[tuple[str, str]]) -> None:
         """
         Index documents for semantic retrieval.
 
@@ -43,7 +44,7 @@ class VectorRetriever(Retriever):
         in the vector storage for later similarity search.
 
         Args:
-            documents: List of (doc_id, content) tuples to index
+            documents: Iterable of (doc_id, content) tuples to index
         """
         for identifier, content in documents:
             embedding = self._encoder.encode(content)
@@ -1,72 +1,100 @@
+import argparse
 import asyncio
 import json
 import logging
-import sys
 import time
-from pathlib import Path
 
 from openai import AsyncOpenAI
 
+from search_agent.boolean import Query
+from search_agent.citations import CitationStore
+from search_agent.corpus import Corpus
+from search_agent.delta import SeenBlocks
+from search_agent.folders import list_folder  # noqa: F401 re-exported for callers
+from search_agent.guard import GuardedBoolean, GuardedSearch
 from search_agent.models import AgentResponse, AgentResult, UsageStats
+from search_agent.pages import PagedSearch
 from search_agent.parser import UgrepParser
+from search_agent.profiler import MODES, profiled
 from search_agent.prompts import SYSTEM_PROMPT_TEMPLATE
+from search_agent.ranked import RankedSearch
+from search_agent.shards import ShardedSearch
+from search_agent.span import line
+from search_agent.stats import TermStats
 from search_agent.tools import TOOLS
-from search_agent.ugrep import UgrepSearch
 import settings
 
 logger = logging.getLogger(__name__)
-client = AsyncOpenAI(
-    base_url="https://openrouter.ai/api/v1", api_key=settings.OPENROUTER_API_KEY
-)
+clients: dict[tuple[str, str | None], AsyncOpenAI] = {}
+corpora: dict[str, Corpus] = {}
 
 
-async def tree() -> str:
-    """Generate tree output of DOCS_FOLDER structure."""
-    cmd = ["tree", "-L", "2", settings.DOCS_FOLDER]
-    logger.debug(f"tree command: {' '.join(cmd)}")
-    proc = await asyncio.create_subprocess_exec(
-        *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
-    )
-    stdout, stderr = await proc.communicate()
-    result = stdout.decode() if stdout else ""
-    if stderr:
-        logger.debug(f"tree stderr: {stderr.decode()}")
-    return result
+def llm() -> AsyncOpenAI:
+    """Client of the LLM endpoint configured in settings at call time, shared across runs."""
+    key = (settings.LLM_BASE_URL, settings.OPENROUTER_API_KEY)
+    if key not in clients:
+        clients[key] = AsyncOpenAI(base_url=key[0], api_key=key[1])
+    return clients[key]
+
+
+def default() -> Corpus:
+    """Corpus of the configured DOCS_FOLDER, shared across runs."""
+    folder = settings.DOCS_FOLDER
+    if folder not in corpora:
+        corpora[folder] = Corpus(
+            folder, packed=settings.PACKED_CORPUS, shards=settings.SHARDS
+        )
+    return corpora[folder]
+
 
+async def coalesce(search: PagedSearch, calls: list[tuple[str, dict]]) -> dict[str, str]:
+    """Run search calls of one turn as one pass per path, results by call id."""
+    groups: dict[str | None, list[tuple[str, str]]] = {}
+    for identifier, args in calls:
+        groups.setdefault(args.get("path"), []).append(
+            (identifier, args.get("pattern", ""))
+        )
+    results = {}
+    for path, group in groups.items():
+        outputs = await search.batch([pattern for _, pattern in group], path)
+        results.update(zip([identifier for identifier, _ in group], outputs))
+    return results
 
-async def list_folder(folder: str) -> str:
-    """List files in a folder within DOCS_FOLDER."""
-    base = Path(settings.DOCS_FOLDER)
-    folder_name = folder.split("/")[-1]
-    target = base / folder if not folder.startswith(str(base)) else Path(folder)
-    if not target.exists():
-        target = base / folder_name
-    if target.exists() and target.is_dir():
-        files = sorted([str(f) for f in target.iterdir() if f.is_file()])
-        if files:
-            return f"Files in {target.name}/:\n" + "\n".join(files)
-    prefix = folder_name + "_"
-    matching = sorted([str(f) for f in base.iterdir() if f.is_file() and f.name.startswith(prefix)])
-    if matching:
-        return f"Files with prefix '{prefix}':\n" + "\n".join(matching)
-    return f"No files found for: {folder}"
 
+async def run_agent(
+    query: str,
+    max_iterations: int = 15,
+    corpus: Corpus | None = None,
+    client: AsyncOpenAI | None = None,
+) -> AgentResult:
+    """Run the search agent with the given query over corpus, DOCS_FOLDER by default.
 
-async def run_agent(query: str, max_iterations: int = 15) -> AgentResult:
-    """Run the search agent with the given query."""
+    The LLM is reached through client, by default one for the
+    endpoint configured in settings.
+    """
     logger.info(f"Running agent for query: {query}")
+    corpus = corpus or default()
+    client = client or llm()
     stats = UsageStats()
     tool_calls_log = []
-    collected_citations = []
-    structure = await tree()
+    citations = CitationStore()
+    await corpus.refresh()
+    structure = await corpus.tree()
     prompt = SYSTEM_PROMPT_TEMPLATE.format(tree=structure)
     logger.debug(f"System prompt:\n{prompt}")
     messages = [
         {"role": "system", "content": prompt},
         {"role": "user", "content": query},
     ]
-    search = UgrepSearch()
+    origin = corpus.search()
+    listing = origin if isinstance(origin, ShardedSearch) else corpus
+    search = PagedSearch(GuardedSearch(origin), corpus.pages)
+    count = GuardedSearch(corpus.count())
+    boolean = GuardedBoolean(corpus.boolean())
+    ranked = RankedSearch(corpus.index, state=corpus.state)
+    terms = TermStats(corpus.index, state=corpus.state)
     parser = UgrepParser()
+    seen = SeenBlocks()
     for _ in range(max_iterations):
         start = time.perf_counter()
         response = await client.chat.completions.create(
@@ -89,31 +117,79 @@ async def run_agent(query: str, max_iterations: int = 15) -> AgentResult:
                 for tc in msg.tool_calls
             ]
         messages.append(msg_dict)
+        stats.iterations += 1
         if not msg.tool_calls:
             break
-        for tc in msg.tool_calls:
-            args = json.loads(tc.function.arguments)
+        start = time.perf_counter()
+        calls = [(tc, json.loads(tc.function.arguments)) for tc in msg.tool_calls]
+        prefetched = await coalesce(
+            search,
+            [(tc.id, args) for tc, args in calls if tc.function.name == "search"],
+        )
+        for tc, args in calls:
             logger.info(f"{tc.function.name}: tool call {args}")
             tool_calls_log.append({tc.function.name: args})
-            if tc.function.name == "search":
-                result = await search.execute(
-                    args.get("pattern", ""),
-                    args.get("path"),
-                )
-                logger.info("search: tool finished")
+            if tc.function.name in (
+                "search",
+                "next_page",
+                "boolean_search",
+                "ranked_search",
+            ):
+                if tc.function.name == "search":
+                    result = prefetched[tc.id]
+                elif tc.function.name == "ranked_search":
+                    result = await ranked.execute(
+                        args.get("query", ""),
+                        args.get("path"),
+                    )
+                elif tc.function.name == "boolean_search":
+                    query_terms = Query(
+                        args.get("all", []),
+                        args.get("any"),
+                        args.get("none"),
+                        args.get("within"),
+                    )
+                    result = await boolean.execute(query_terms, args.get("path"))
+                else:
+                    result = search.more(args.get("cursor", ""))
+                logger.info(f"{tc.function.name}: tool finished")
                 logger.debug(f"search result preview: {result[:200]}...")
                 if result != "No matches found":
-                    citations = parser.parse(result)
-                    collected_citations.extend(citations)
-                    logger.info(f"Extracted {len(citations)} citations from search")
+                    spans = parser.spans(result)
+                    citations.add(spans)
+                    logger.info(f"Extracted {len(spans)} citations from search")
                 else:
                     logger.info("No matches found for this search")
+                result = seen.fresh(result)
+            elif tc.function.name == "term_stats":
+                result = await terms.execute(args.get("terms", []))
+                logger.info("term_stats: tool finished")
+            elif tc.function.name == "read_span":
+                first = line(args.get("start_line", 1))
+                last = line(args.get("end_line", 1))
+                if first is None or last is None:
+                    result = (
+                        f"Invalid line range: {args.get('start_line')}-{args.get('end_line')}"
+                    )
+                else:
+                    result = await asyncio.to_thread(
+                        corpus.reader.read, args.get("path", ""), first, last
+                    )
+                    citations.add(parser.spans(result))
+                logger.info("read_span: tool finished")
+            elif tc.function.name == "count":
+                result = await count.execute(
+                    args.get("pattern", ""),
+                    args.get("path"),
+                )
+                logger.info("count: tool finished")
             elif tc.function.name == "list_folder":
-                result = await list_folder(args.get("folder", ""))
+                result = await listing.list_folder(args.get("folder", ""))
                 logger.info(f"list_folder: {result}...")
             else:
                 result = f"Unknown tool: {tc.function.name}"
             messages.append({"role": "tool", "tool_call_id": tc.id, "content": result})
+        stats.tool_seconds += time.perf_counter() - start
     messages.append(
         {
             "role": "user",
@@ -128,10 +204,8 @@ async def run_agent(query: str, max_iterations: int = 15) -> AgentResult:
     elapsed = time.perf_counter() - start
     stats.add(final_response.usage, elapsed)
     parsed_response = final_response.choices[0].message.parsed
-    logger.info(
-        f"Collected {len(collected_citations)} total citations from search results"
-    )
-    parsed_response.citations = collected_citations[:100]
+    logger.info(f"Collected {len(citations)} merged citations from search results")
+    parsed_response.citations = citations.top(100)
     logger.info(f"Added {len(parsed_response.citations)} citations from search results")
     agent_result = AgentResult(
         response=parsed_response,
@@ -150,5 +224,20 @@ async def run_agent(query: str, max_iterations: int = 15) -> AgentResult:
 
 
 if __name__ == "__main__":
-    query = " ".join(sys.argv[1:])
-    asyncio.run(run_agent(query))
+    parser = argparse.ArgumentParser(description="Answer a question from the documents")
+    parser.add_argument("query", nargs="+", help="Question to answer")
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="sample",
+        choices=MODES,
+        help="Profile the run, by sampling stacks or with cProfile",
+    )
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="Also attribute peak memory with tracemalloc, slowing the run",
+    )
+    args = parser.parse_args()
+    with profiled("agent", args.profile, args.profile_memory):
+        asyncio.run(run_agent(" ".join(args.query)))
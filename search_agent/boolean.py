@@ -0,0 +1,203 @@
+import re
+import warnings
+from typing import final
+
+import settings
+from search_agent.parser import Row, row
+from search_agent.ugrep import MAX_OUTPUT_CHARS, MAX_RESULT_CHARS, STOPPED, portable, run
+
+MAX_LINES_PER_FILE = 12
+
+
+@final
+class Query:
+    """Boolean combination of terms evaluated per file.
+
+    All required terms and at least one optional term (if any are
+    given) must occur in a file, and no excluded term may occur in
+    it. With within set, required and optional terms must occur
+    together inside a window spanning at most that many lines;
+    excluded terms always apply to the whole file.
+
+    >>> query = Query(["isostatic", "rebound"], within=2)
+    >>> print(query.select("docs/a.txt:4:isostatic\\ndocs/a.txt:5:rebound\\n"))
+    docs/a.txt:4:isostatic
+    docs/a.txt:5:rebound
+    """
+
+    def __init__(
+        self,
+        required: list[str],
+        optional: list[str] | None = None,
+        excluded: list[str] | None = None,
+        within: int | None = None,
+    ) -> None:
+        self._required = list(required)
+        self._optional = list(optional or [])
+        self._excluded = list(excluded or [])
+        self._within = within
+        self._patterns = [self._compile(term) for term in self.terms()]
+
+    def terms(self) -> list[str]:
+        """All distinct terms, required first, then optional, then excluded."""
+        return list(dict.fromkeys(self._required + self._optional + self._excluded))
+
+    def rewrite(self, replacements: dict[str, str]) -> "Query":
+        """Same query with terms replaced, keeping their roles.
+
+        >>> Query([".*crust"], excluded=["mantle"]).rewrite({".*crust": "crust"}).terms()
+        ['crust', 'mantle']
+        """
+
+        def swap(terms: list[str]) -> list[str]:
+            return [replacements.get(term, term) for term in terms]
+
+        return Query(
+            swap(self._required), swap(self._optional), swap(self._excluded), self._within
+        )
+
+    def patterns(self) -> list[str]:
+        """Search patterns of terms, invalid regexes escaped as in select.
+
+        >>> Query(["rebound", "(unclosed"]).patterns()
+        ['rebound', '\\\\(unclosed']
+        """
+        return [
+            term if pattern is None else pattern.pattern
+            for term, pattern in zip(self.terms(), self._patterns)
+        ]
+
+    def unsupported(self) -> list[str]:
+        """Terms using ugrep-only syntax that select cannot check in Python.
+
+        >>> Query(["\\\\<rebound\\\\>", "[[:alpha:]]+ice", "crust"]).unsupported()
+        ['\\\\<rebound\\\\>', '[[:alpha:]]+ice']
+        """
+        return [term for term, pattern in zip(self.terms(), self._patterns) if pattern is None]
+
+    def select(self, output: str, limit: int = MAX_OUTPUT_CHARS) -> str:
+        """Filter single-pass ugrep output of all terms down to matching files."""
+        files: dict[str, list[tuple[Row, set[str]]]] = {}
+        for line in output.split("\n"):
+            parsed = row(line)
+            if parsed is None or not parsed.match:
+                continue
+            hits = {
+                term
+                for term, pattern in zip(self.terms(), self._patterns)
+                if pattern is not None and pattern.search(parsed.content)
+            }
+            if hits:
+                files.setdefault(parsed.path, []).append((parsed, hits))
+        chunks = []
+        for path, rows in files.items():
+            found = set().union(*(hits for _, hits in rows))
+            if found & set(self._excluded):
+                continue
+            if self._within is None:
+                if not self._satisfied(found):
+                    continue
+                wanted = set(self._required + self._optional)
+                selected = [parsed for parsed, hits in rows if hits & wanted]
+                chunks.append(selected[:MAX_LINES_PER_FILE])
+            else:
+                for window in self._windows(rows):
+                    chunks.append(window[:MAX_LINES_PER_FILE])
+        if not chunks:
+            return "No matches found"
+        text = "\n--\n".join(
+            "\n".join(self._render(parsed) for parsed in chunk) for chunk in chunks
+        )
+        return text[:limit]
+
+    @staticmethod
+    def _render(parsed: Row) -> str:
+        """Format row back into ugrep output line."""
+        if parsed.number is None:
+            return f"{parsed.path}:{parsed.content}"
+        return f"{parsed.path}:{parsed.number}:{parsed.content}"
+
+    def _satisfied(self, found: set[str]) -> bool:
+        """Check required and optional terms against found terms."""
+        if not set(self._required) <= found:
+            return False
+        return not self._optional or bool(found & set(self._optional))
+
+    def _windows(self, rows: list[tuple[Row, set[str]]]) -> list[list[Row]]:
+        """Find disjoint minimal windows of at most within lines that qualify."""
+        ordered = [(parsed, hits) for parsed, hits in rows if parsed.number is not None]
+        ordered.sort(key=lambda item: item[0].number)
+        windows = []
+        left = 0
+        for right in range(len(ordered)):
+            while ordered[right][0].number - ordered[left][0].number > self._within:
+                left += 1
+            found = set().union(*(hits for _, hits in ordered[left : right + 1]))
+            if not self._satisfied(found):
+                continue
+            while left < right:
+                rest = set().union(*(hits for _, hits in ordered[left + 1 : right + 1]))
+                if not self._satisfied(rest):
+                    break
+                left += 1
+            windows.append([parsed for parsed, _ in ordered[left : right + 1]])
+            left = right + 1
+        return windows
+
+    @staticmethod
+    def _compile(term: str) -> re.Pattern | None:
+        """Compile term case-insensitively, as literal if not a valid regex.
+
+        Returns None for terms Python accepts but reads differently
+        from ugrep, such as word boundaries and POSIX classes.
+        """
+        found = portable(term)
+        if found is not None:
+            return found
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                re.compile(term)
+        except re.error:
+            return re.compile(re.escape(term), re.IGNORECASE)
+        return None
+
+
+@final
+class BooleanSearch:
+    """Evaluates boolean term queries with one ugrep pass over the files.
+
+    All terms are searched together without context lines; the
+    boolean and proximity conditions are then applied per file.
+
+    >>> import asyncio
+    >>> search = BooleanSearch()
+    >>> result = asyncio.run(search.execute(Query(["test"]), "docs/"))
+    >>> isinstance(result, str)
+    True
+    """
+
+    def __init__(self, limit: int = MAX_OUTPUT_CHARS, folder: str | None = None) -> None:
+        self._folder = folder or settings.DOCS_FOLDER
+        self._limit = limit
+
+    async def execute(self, query: Query, path: str | None) -> str:
+        """Execute boolean query and return matching lines per file."""
+        patterns = query.patterns()
+        if not patterns:
+            return "No terms given"
+        unsupported = query.unsupported()
+        if unsupported:
+            return (
+                f"Terms not supported by boolean_search: {', '.join(unsupported)}."
+                " Use portable regex syntax, e.g. \\b instead of \\< and \\>,"
+                " and [a-z] instead of POSIX classes like [[:alpha:]]."
+            )
+        target = path if path else self._folder
+        cmd = ["ug", "--config=.ugrep", "-r", "--context=0"]
+        for pattern in patterns:
+            cmd += ["-e", pattern]
+        cmd.append(target)
+        output, stopped = await run(cmd, MAX_RESULT_CHARS)
+        result = query.select(output, self._limit)
+        return f"{result}\n{STOPPED}" if stopped else result
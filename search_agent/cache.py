@@ -0,0 +1,15 @@
+import hashlib
+import os
+from pathlib import Path
+
+import settings
+
+
+def location(kind: str, root: str) -> Path:
+    """Cache folder for derived data of given kind about a docs folder.
+
+    >>> location("index", "docs/") == location("index", "docs")
+    True
+    """
+    digest = hashlib.sha1(os.path.abspath(root).encode()).hexdigest()[:16]
+    return settings.CACHE_DIR / kind / digest
@@ -0,0 +1,161 @@
+import heapq
+from dataclasses import dataclass, field
+from typing import Iterable, final
+
+from search_agent.models import Citation
+
+MAX_SPANS = 2000
+
+
+@dataclass(slots=True)
+class Span:
+    """Contiguous run of lines from one file, located by its full path.
+
+    Lines are indexed from start; missing lines are empty strings.
+    Spans without line numbers have start and end set to None.
+    """
+
+    location: str
+    start: int | None
+    end: int | None
+    lines: list[str]
+    hits: int = 1
+    order: int = field(default=0, compare=False)
+
+    def text(self) -> str:
+        """Join non-empty lines with single spaces."""
+        return " ".join(line for line in self.lines if line)
+
+
+@final
+class CitationStore:
+    """Accumulates search blocks as merged per-file line spans.
+
+    Overlapping and adjacent spans of one file are merged into one;
+    files are told apart by full path and named by file name only in
+    the citations built by top().
+    Each span counts how many searches hit it; when capacity is
+    exceeded, the span with fewest hits (oldest arrival on ties)
+    is evicted, so late evidence can still replace stale single
+    hits. Candidates sit in a heap whose outdated entries are
+    skipped on eviction. Citation models are only built by top().
+
+    >>> store = CitationStore()
+    >>> store.add([Span("docs/a.txt", 1, 2, ["one", "two"])])
+    >>> store.add([Span("docs/a.txt", 2, 3, ["two", "three"])])
+    >>> [(c.location, c.text) for c in store.top(10)]
+    [('a.txt', 'one two three')]
+    """
+
+    def __init__(self, capacity: int = MAX_SPANS) -> None:
+        self._capacity = capacity
+        self._spans: dict[str, list[Span]] = {}
+        self._count = 0
+        self._arrivals = 0
+        self._heap: list[tuple[int, int, int, Span]] = []
+        self._live: set[int] = set()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, spans: Iterable[Span]) -> None:
+        """Merge spans from one search into the store."""
+        for span in spans:
+            if not span.lines:
+                continue
+            span.order = self._arrivals
+            self._arrivals += 1
+            if span.start is None or span.end is None:
+                self._repeat(span)
+            else:
+                self._merge(span)
+            while self._count > self._capacity:
+                self._evict()
+
+    def top(self, limit: int) -> list[Citation]:
+        """Return citations for spans with most hits, earliest first on ties."""
+        spans = [span for group in self._spans.values() for span in group]
+        spans.sort(key=lambda span: (-span.hits, span.order))
+        return [
+            Citation(location=span.location.split("/")[-1], text=span.text())
+            for span in spans[:limit]
+        ]
+
+    def _repeat(self, span: Span) -> None:
+        """Count hit on identical unnumbered span or store it as new."""
+        group = self._spans.setdefault(span.location, [])
+        for known in group:
+            if known.start is None and known.lines == span.lines:
+                known.hits += 1
+                self._push(known)
+                return
+        self._store(group, span)
+
+    def _merge(self, span: Span) -> None:
+        """Merge span with overlapping and adjacent spans of same file."""
+        group = self._spans.setdefault(span.location, [])
+        touching = [
+            known
+            for known in group
+            if known.start is not None
+            and known.start <= span.end + 1
+            and known.end >= span.start - 1
+        ]
+        if not touching:
+            self._store(group, span)
+            return
+        for known in touching:
+            if known.start <= span.end and known.end >= span.start:
+                known.hits += 1
+            group.remove(known)
+            self._live.discard(id(known))
+            self._count -= 1
+        parts = touching + [span]
+        start = min(part.start for part in parts)
+        end = max(part.end for part in parts)
+        lines = [""] * (end - start + 1)
+        for part in parts:
+            for offset, line in enumerate(part.lines):
+                if line:
+                    lines[part.start - start + offset] = line
+        merged = Span(
+            location=span.location,
+            start=start,
+            end=end,
+            lines=lines,
+            hits=max(part.hits for part in parts),
+            order=min(part.order for part in parts),
+        )
+        self._store(group, merged)
+
+    def _store(self, group: list[Span], span: Span) -> None:
+        """Add span to its file group and to the eviction heap."""
+        group.append(span)
+        self._live.add(id(span))
+        self._count += 1
+        self._push(span)
+
+    def _push(self, span: Span) -> None:
+        """Record current hits of span, rebuilding the heap when mostly stale."""
+        if len(self._heap) > 4 * self._count + 64:
+            self._heap = [
+                (known.hits, known.order, id(known), known)
+                for group in self._spans.values()
+                for known in group
+            ]
+            heapq.heapify(self._heap)
+            return
+        heapq.heappush(self._heap, (span.hits, span.order, id(span), span))
+
+    def _evict(self) -> None:
+        """Drop span with fewest hits, oldest arrival on ties."""
+        while True:
+            hits, order, key, victim = heapq.heappop(self._heap)
+            if key in self._live and victim.hits == hits and victim.order == order:
+                break
+        group = self._spans[victim.location]
+        group.remove(victim)
+        if not group:
+            del self._spans[victim.location]
+        self._live.discard(key)
+        self._count -= 1
@@ -0,0 +1,103 @@
+import asyncio
+import logging
+from typing import final
+
+from search_agent.boolean import BooleanSearch
+from search_agent.cache import location
+from search_agent.folders import list_folder, tree
+from search_agent.index import InvertedIndex
+from search_agent.pack import Pack, PackedSearch
+from search_agent.pages import MAX_STORED_CHARS, ResultStore
+from search_agent.shards import RemoteShard, ShardedSearch
+from search_agent.span import SpanReader
+from search_agent.ugrep import MAX_RESULT_CHARS, Search, UgrepCount, UgrepSearch
+from search_agent.watcher import CorpusState
+
+logger = logging.getLogger(__name__)
+
+
+@final
+class Corpus:
+    """Document collection with its own change tracking, indexes and caches.
+
+    Several corpora can be served by one process; every tool of an
+    agent run works on the corpus passed to it. Derived state is
+    built lazily and bounded per corpus; shard connections are opened
+    once and shared by all runs.
+
+    >>> import tempfile
+    >>> with tempfile.TemporaryDirectory() as root:
+    ...     corpus = Corpus(root)
+    ...     _ = open(f"{root}/a.txt", "w").write("text")
+    ...     asyncio.run(corpus.refresh())
+    1
+    """
+
+    def __init__(
+        self,
+        root: str,
+        packed: bool = False,
+        shards: list[str] | None = None,
+        capacity: int = MAX_STORED_CHARS,
+    ) -> None:
+        self.root = root
+        self._packed = packed
+        self._addresses = list(shards or [])
+        self._shards: list[RemoteShard] | None = None
+        self.state = CorpusState(root)
+        self.pages = ResultStore(capacity=capacity)
+        self.reader = SpanReader(root)
+        self._index: InvertedIndex | None = None
+        self._tree: tuple[int, str] | None = None
+
+    @property
+    def index(self) -> InvertedIndex:
+        """Inverted index of the corpus, opened on first use."""
+        if self._index is None:
+            self._index = InvertedIndex(self.root)
+        return self._index
+
+    async def refresh(self) -> int:
+        """Pick up file changes and return corpus version."""
+        return await asyncio.to_thread(self.state.poll)
+
+    async def tree(self) -> str:
+        """Folder structure summary, regenerated when the corpus changes."""
+        version = self.state.version
+        if self._tree is None or self._tree[0] != version:
+            self._tree = (version, await tree(self.root))
+        return self._tree[1]
+
+    def search(self, limit: int = MAX_RESULT_CHARS) -> Search:
+        """Backend for pattern search: shards, packed file, or folder scan."""
+        if self._addresses:
+            if self._shards is None:
+                self._shards = [RemoteShard(address) for address in self._addresses]
+            return ShardedSearch(self._shards, limit)
+        origin = UgrepSearch(limit=limit, folder=self.root)
+        if self._packed:
+            pack = Pack(location("pack", self.root))
+            if pack.fresh(self.state.files()):
+                return PackedSearch(pack, origin, limit=limit)
+            logger.warning("Packed corpus is missing or stale, searching files directly")
+        return origin
+
+    def count(self) -> UgrepCount:
+        """Per-file match counter over the corpus."""
+        return UgrepCount(folder=self.root)
+
+    def boolean(self) -> BooleanSearch:
+        """Boolean term search over the corpus."""
+        return BooleanSearch(folder=self.root)
+
+    async def list_folder(self, folder: str) -> str:
+        """List files of a folder in the corpus."""
+        return await list_folder(folder, self.root)
+
+    def close(self) -> None:
+        """Stop watching files and release open readers and shard connections."""
+        self.state.close()
+        self.reader.close()
+        for shard in self._shards or []:
+            shard.disconnect()
+        self._shards = None
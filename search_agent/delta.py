@@ -0,0 +1,56 @@
+from typing import final
+
+from search_agent.parser import blocks, row
+
+
+@final
+class SeenBlocks:
+    """Per-conversation memory of search output blocks already returned.
+
+    Keys blocks on file path and line numbers. A block whose lines
+    were all returned before is dropped from later output and
+    replaced by a short note. Blocks without line numbers are
+    always kept.
+
+    >>> seen = SeenBlocks()
+    >>> seen.fresh("docs/a.txt:3:alpha\\n")
+    'docs/a.txt:3:alpha\\n'
+    >>> print(seen.fresh("docs/a.txt:3:alpha\\n--\\ndocs/b.txt:7:beta\\n"))
+    docs/b.txt:7:beta
+    [1 previously returned blocks omitted]
+    """
+
+    def __init__(self) -> None:
+        self._lines: dict[str, set[int]] = {}
+
+    def fresh(self, output: str) -> str:
+        """Return output without blocks returned earlier in conversation."""
+        kept: list[list[str]] = []
+        omitted = 0
+        for lines in blocks(output):
+            rows = [parsed for parsed in map(row, lines) if parsed is not None]
+            numbers = {parsed.number for parsed in rows if parsed.number is not None}
+            if not rows or not numbers:
+                kept.append(lines)
+                continue
+            known = self._lines.setdefault(rows[0].path, set())
+            if numbers <= known:
+                omitted += 1
+                continue
+            known |= numbers
+            kept.append(lines)
+        if omitted == 0:
+            return output
+        result: list[str] = []
+        previous = False
+        for lines in kept:
+            block = row(lines[0]) is not None
+            if block and previous:
+                result.append("--")
+            result.extend(lines)
+            previous = block
+        note = f"[{omitted} previously returned blocks omitted]"
+        if not any(row(line) for line in result):
+            note = f"No new matches, {omitted} previously returned blocks omitted"
+            return "\n".join([note] + result)
+        return "\n".join(result + [note])
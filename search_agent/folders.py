@@ -0,0 +1,43 @@
+import asyncio
+import logging
+from pathlib import Path
+
+import settings
+
+logger = logging.getLogger(__name__)
+
+
+async def tree(root: str | None = None) -> str:
+    """Generate tree output of root structure, DOCS_FOLDER by default."""
+    cmd = ["tree", "-L", "2", root or settings.DOCS_FOLDER]
+    logger.debug(f"tree command: {' '.join(cmd)}")
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+    except OSError as exc:
+        logger.debug(f"tree unavailable: {exc}")
+        return ""
+    stdout, stderr = await proc.communicate()
+    result = stdout.decode() if stdout else ""
+    if stderr:
+        logger.debug(f"tree stderr: {stderr.decode()}")
+    return result
+
+
+async def list_folder(folder: str, root: str | None = None) -> str:
+    """List files in a folder within root, DOCS_FOLDER by default."""
+    base = Path(root or settings.DOCS_FOLDER)
+    folder_name = folder.split("/")[-1]
+    target = base / folder if not folder.startswith(str(base)) else Path(folder)
+    if not target.exists():
+        target = base / folder_name
+    if target.exists() and target.is_dir():
+        files = sorted([str(f) for f in target.iterdir() if f.is_file()])
+        if files:
+            return f"Files in {target.name}/:\n" + "\n".join(files)
+    prefix = folder_name + "_"
+    matching = sorted([str(f) for f in base.iterdir() if f.is_file() and f.name.startswith(prefix)])
+    if matching:
+        return f"Files with prefix '{prefix}':\n" + "\n".join(matching)
+    return f"No files found for: {folder}"
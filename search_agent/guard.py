@@ -0,0 +1,297 @@
+import re
+from typing import NamedTuple, final
+
+from search_agent.boolean import BooleanSearch, Query
+from search_agent.ugrep import Search
+
+MIN_LITERAL_CHARS = 2
+MAX_ALTERNATIVES = 64
+MAX_PATTERN_CHARS = 500
+MAX_REPEAT = 1000
+
+LEADING = re.compile(r"^(\^?\.\*)+")
+TRAILING = re.compile(r"\.\*\$?$")
+NESTED = re.compile(r"\((?:[^()\\]|\\.)*[*+](?:[^()\\]|\\.)*\)[*+{]")
+REPEAT = re.compile(r"\{(\d+)(?:,(\d*))?\}")
+ESCAPES = set("wWdDsSbBAzZ<>")
+
+
+class Review(NamedTuple):
+    """Outcome of reviewing a pattern: pattern to run, or None if rejected."""
+
+    pattern: str | None
+    note: str
+
+
+def alternatives(pattern: str) -> list[str]:
+    """Split pattern on top-level alternation bars.
+
+    >>> alternatives("cat|d(o|u)g")
+    ['cat', 'd(o|u)g']
+    """
+    parts, depth, start, idx = [], 0, 0, 0
+    while idx < len(pattern):
+        char = pattern[idx]
+        if char == "\\":
+            idx += 2
+            continue
+        if char == "[":
+            idx = klass(pattern, idx)
+            continue
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            parts.append(pattern[start:idx])
+            start = idx + 1
+        idx += 1
+    parts.append(pattern[start:])
+    return parts
+
+
+def klass(pattern: str, idx: int) -> int:
+    """Index just past character class starting at idx."""
+    end = idx + 1
+    if end < len(pattern) and pattern[end] == "^":
+        end += 1
+    if end < len(pattern) and pattern[end] == "]":
+        end += 1
+    while end < len(pattern) and pattern[end] != "]":
+        end += 2 if pattern[end] == "\\" else 1
+    return end + 1
+
+
+def literal(pattern: str) -> int:
+    """Length of longest literal text every match of pattern must contain.
+
+    >>> literal("geomagnetic reversal")
+    20
+    >>> literal("colou?r")
+    4
+    >>> literal(r"\\w+")
+    0
+    >>> literal("teacher|tutor")
+    5
+    """
+    return min(required(part) for part in alternatives(pattern))
+
+
+def required(pattern: str) -> int:
+    """Longest guaranteed literal run in pattern without top-level alternation."""
+    best, run, idx = 0, 0, 0
+    while idx < len(pattern):
+        char = pattern[idx]
+        if char == "(":
+            end = closing(pattern, idx)
+            optional = optionally(pattern, end)
+            if not optional:
+                inner = pattern[idx + 1 : end - 1]
+                if inner.startswith("?:"):
+                    inner = inner[2:]
+                best = max(best, literal(inner))
+            best, run = max(best, run), 0
+            idx = skip(pattern, end) if quantified(pattern, end) else end
+            continue
+        if char == "[" or char == "." or char in "^$":
+            step = klass(pattern, idx) if char == "[" else idx + 1
+            best, run = max(best, run), 0
+            idx = skip(pattern, step) if quantified(pattern, step) else step
+            continue
+        if char == "\\":
+            token = pattern[idx : idx + 2]
+            idx += 2
+            if len(token) < 2 or token[1] in ESCAPES or token[1].isdigit():
+                best, run = max(best, run), 0
+                idx = skip(pattern, idx) if quantified(pattern, idx) else idx
+                continue
+        else:
+            idx += 1
+        if optionally(pattern, idx):
+            best, run = max(best, run), 0
+            idx = skip(pattern, idx)
+            continue
+        run += 1
+        if quantified(pattern, idx):
+            best, run = max(best, run), 0
+            idx = skip(pattern, idx)
+    return max(best, run)
+
+
+def closing(pattern: str, idx: int) -> int:
+    """Index just past group opened at idx."""
+    depth = 0
+    while idx < len(pattern):
+        char = pattern[idx]
+        if char == "\\":
+            idx += 2
+            continue
+        if char == "[":
+            idx = klass(pattern, idx)
+            continue
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                return idx + 1
+        idx += 1
+    return len(pattern)
+
+
+def quantified(pattern: str, idx: int) -> bool:
+    """Check if a quantifier starts at idx."""
+    if idx >= len(pattern):
+        return False
+    return pattern[idx] in "*?+" or bool(REPEAT.match(pattern, idx))
+
+
+def optionally(pattern: str, idx: int) -> bool:
+    """Check if quantifier at idx allows zero repetitions."""
+    if idx >= len(pattern):
+        return False
+    if pattern[idx] in "*?":
+        return True
+    found = REPEAT.match(pattern, idx)
+    return bool(found and found.group(1) == "0")
+
+
+def skip(pattern: str, idx: int) -> int:
+    """Index just past quantifier at idx, including lazy or possessive suffix."""
+    found = REPEAT.match(pattern, idx)
+    end = found.end() if found else idx + 1
+    if end < len(pattern) and pattern[end] in "?+":
+        end += 1
+    return end
+
+
+def edges(pattern: str) -> str:
+    """Strip leading and trailing .* that cannot change which lines match.
+
+    An escaped dot is literal, and .+ needs at least one character, so
+    both are kept.
+
+    >>> edges("^.*magnetic reversal.*$")
+    'magnetic reversal'
+    >>> edges("version\\\\.*"), edges(".+foo"), edges("path\\\\\\\\.*")
+    ('version\\\\.*', '.+foo', 'path\\\\\\\\')
+    """
+    pattern = LEADING.sub("", pattern)
+    while found := TRAILING.search(pattern):
+        start = found.start()
+        slashes = start - len(pattern[:start].rstrip("\\"))
+        if slashes % 2:
+            break
+        pattern = pattern[:start]
+    return pattern
+
+
+def review(pattern: str) -> Review:
+    """Estimate pattern cost, rewriting or rejecting expensive patterns.
+
+    >>> review(".*magnetic reversal.*")
+    Review(pattern='magnetic reversal', note="Pattern rewritten to 'magnetic reversal': leading and trailing .* are redundant")
+    >>> review("\\\\w+").pattern is None
+    True
+    """
+    if len(pattern) > MAX_PATTERN_CHARS:
+        return Review(
+            None,
+            f"Pattern rejected: longer than {MAX_PATTERN_CHARS} characters."
+            " Split it into several shorter searches.",
+        )
+    stripped = edges(pattern)
+    note = ""
+    if stripped != pattern and stripped:
+        note = (
+            f"Pattern rewritten to '{stripped}':"
+            " leading and trailing .* are redundant"
+        )
+    if NESTED.search(stripped):
+        return Review(
+            None,
+            "Pattern rejected: nested repetition like (a+)+ can take very long."
+            " Remove the outer quantifier.",
+        )
+    if stripped.count("|") + 1 > MAX_ALTERNATIVES:
+        return Review(
+            None,
+            f"Pattern rejected: more than {MAX_ALTERNATIVES} alternatives."
+            " Split it into several searches sent in the same turn.",
+        )
+    for found in REPEAT.finditer(stripped):
+        if max(int(found.group(1)), int(found.group(2) or 0)) > MAX_REPEAT:
+            return Review(
+                None,
+                f"Pattern rejected: repetition counts above {MAX_REPEAT} are too costly.",
+            )
+    if not stripped or literal(stripped) < MIN_LITERAL_CHARS:
+        return Review(
+            None,
+            "Pattern rejected: it matches almost every line because it has no"
+            f" literal text of at least {MIN_LITERAL_CHARS} characters."
+            " Search for concrete words, e.g. 'magnetic reversal' instead of '.*a.*b.*'.",
+        )
+    return Review(stripped, note)
+
+
+@final
+class GuardedSearch(Search):
+    """Reviews patterns before searching, returning a tool message on rejection.
+
+    >>> import asyncio
+    >>> class Echo(Search):
+    ...     async def execute(self, pattern, path):
+    ...         return f"docs/a.txt:1:{pattern}"
+    >>> print(asyncio.run(GuardedSearch(Echo()).execute(".*", None)))
+    Pattern rejected: it matches almost every line because it has no literal text of at least 2 characters. Search for concrete words, e.g. 'magnetic reversal' instead of '.*a.*b.*'.
+    """
+
+    def __init__(self, origin: Search) -> None:
+        self._origin = origin
+
+    async def execute(self, pattern: str, path: str | None) -> str:
+        """Execute reviewed pattern, or explain why it was rejected."""
+        verdict = review(pattern)
+        if verdict.pattern is None:
+            return verdict.note
+        output = await self._origin.execute(verdict.pattern, path)
+        return f"[{verdict.note}]\n{output}" if verdict.note else output
+
+    async def batch(self, patterns: list[str], path: str | None) -> list[str]:
+        """Execute accepted patterns in one batch, explaining rejected ones."""
+        verdicts = [review(pattern) for pattern in patterns]
+        accepted = [verdict.pattern for verdict in verdicts if verdict.pattern]
+        outputs = iter(await self._origin.batch(accepted, path) if accepted else [])
+        results = []
+        for verdict in verdicts:
+            if verdict.pattern is None:
+                results.append(verdict.note)
+            elif verdict.note:
+                results.append(f"[{verdict.note}]\n{next(outputs)}")
+            else:
+                results.append(next(outputs))
+        return results
+
+
+@final
+class GuardedBoolean:
+    """Reviews every term of a boolean query before searching.
+
+    A rejected term rejects the query; rewritten terms are searched
+    in their rewritten form, with the notes shown before the output.
+    """
+
+    def __init__(self, origin: BooleanSearch) -> None:
+        self._origin = origin
+
+    async def execute(self, query: Query, path: str | None) -> str:
+        """Execute query with reviewed terms, or explain why it was rejected."""
+        verdicts = {term: review(term) for term in query.terms()}
+        for verdict in verdicts.values():
+            if verdict.pattern is None:
+                return verdict.note
+        reviewed = query.rewrite({term: verdict.pattern for term, verdict in verdicts.items()})
+        output = await self._origin.execute(reviewed, path)
+        notes = "".join(f"[{verdict.note}]\n" for verdict in verdicts.values() if verdict.note)
+        return f"{notes}{output}"
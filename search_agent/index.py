@@ -0,0 +1,356 @@
+import array
+import heapq
+import json
+import math
+import mmap
+import os
+import re
+import shutil
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Iterator, final
+
+from search_agent.cache import location
+from search_agent.text import extract, scan
+from search_agent.watcher import CorpusState
+
+TOKEN = re.compile(r"\w+")
+STEM = "~"
+SUFFIXES = (
+    "ational",
+    "ization",
+    "iveness",
+    "fulness",
+    "ousness",
+    "ations",
+    "ation",
+    "ments",
+    "ment",
+    "ness",
+    "ings",
+    "ated",
+    "ates",
+    "ing",
+    "ate",
+    "ies",
+    "ied",
+    "ed",
+    "ly",
+    "es",
+    "s",
+)
+MIN_STEM_CHARS = 3
+INDEX_FORMAT = 2
+MAX_SEGMENTS = 8
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def tokens(text: str) -> list[str]:
+    """Split text into lowercase word tokens.
+
+    >>> tokens("Isostatic Rebound, post-glacial")
+    ['isostatic', 'rebound', 'post', 'glacial']
+    """
+    return TOKEN.findall(text.lower())
+
+
+def stem(word: str) -> str:
+    """Strip common English suffix, keeping at least a short stem.
+
+    >>> [stem(word) for word in ["motivation", "motivated", "glaciers", "glass"]]
+    ['motiv', 'motiv', 'glacier', 'glass']
+    """
+    for suffix in SUFFIXES:
+        if suffix == "s" and word.endswith("ss"):
+            continue
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM_CHARS:
+            return word[: -len(suffix)]
+    return word
+
+
+def replace(path: Path, data: bytes) -> None:
+    """Write file atomically through a temporary sibling."""
+    temp = path.with_name(path.name + ".tmp")
+    temp.write_bytes(data)
+    os.replace(temp, path)
+
+
+@final
+class Segment:
+    """Immutable postings for a batch of documents, memory-mapped from disk.
+
+    Postings of every term are consecutive (doc, tf) uint32 pairs
+    in a single array file; the term table maps each term to its
+    first pair and pair count.
+    """
+
+    def __init__(self, folder: Path, name: str) -> None:
+        self.name = name
+        table = (folder / f"{name}.terms").read_text(encoding="utf-8")
+        self._terms: dict[str, list[int]] = json.loads(table)
+        self._file = open(folder / f"{name}.post", "rb")
+        self._map: mmap.mmap | None = None
+        self._pairs = memoryview(array.array("I"))
+        if os.fstat(self._file.fileno()).st_size:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._pairs = memoryview(self._map).cast("I")
+
+    @staticmethod
+    def write(folder: Path, name: str, postings: dict[str, array.array]) -> None:
+        """Write postings lists of (doc, tf) pairs as a new segment."""
+        data = array.array("I")
+        table = {}
+        for term, pairs in postings.items():
+            table[term] = [len(data) // 2, len(pairs) // 2]
+            data.extend(pairs)
+        replace(folder / f"{name}.post", data.tobytes())
+        replace(folder / f"{name}.terms", json.dumps(table).encode("utf-8"))
+
+    def terms(self) -> Iterator[str]:
+        """Iterate over terms present in this segment."""
+        return iter(self._terms)
+
+    def pairs(self, term: str) -> memoryview:
+        """Flat (doc, tf) pairs for term, empty if absent."""
+        entry = self._terms.get(term)
+        if entry is None:
+            return self._pairs[0:0]
+        start, count = entry
+        return self._pairs[2 * start : 2 * (start + count)]
+
+    def close(self) -> None:
+        """Release memory map and file handle."""
+        self._pairs.release()
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+    def remove(self, folder: Path) -> None:
+        """Close segment and delete its files."""
+        self.close()
+        for suffix in (".post", ".terms"):
+            (folder / f"{self.name}{suffix}").unlink(missing_ok=True)
+
+
+@final
+class InvertedIndex:
+    """BM25 inverted index over text files and PDFs of a folder.
+
+    Stored on disk as a manifest plus immutable segments. Refreshing
+    tokenizes only added or modified files into a new segment;
+    postings of replaced or deleted files are skipped at query time
+    and dropped when segments are compacted.
+
+    >>> import tempfile
+    >>> with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as cache:
+    ...     _ = (Path(root) / "a.txt").write_text("glacial rebound")
+    ...     index = InvertedIndex(root, Path(cache))
+    ...     _ = index.refresh()
+    ...     [Path(path).name for path, _ in index.ranked("rebound", 5)]
+    ['a.txt']
+    """
+
+    def __init__(self, root: str, folder: Path | None = None) -> None:
+        self._root = os.path.normpath(root)
+        self._folder = folder or location("index", root)
+        self._lock = threading.Lock()
+        self._docs: dict[int, list] = {}
+        self._length = 0
+        self._paths: dict[str, int] = {}
+        self._segments: list[Segment] = []
+        self._next = 0
+        self._generation = 0
+        self._version = -1
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def refresh(self) -> int:
+        """Re-scan root folder and index changes, return number of changed files."""
+        current = scan(self._root)
+        with self._lock:
+            changed = {
+                path: stat
+                for path, stat in current.items()
+                if path not in self._paths
+                or tuple(self._docs[self._paths[path]][1:3]) != stat
+            }
+            removed = [path for path in self._paths if path not in current]
+            return self._apply(changed, removed)
+
+    def update(self, paths: list[str]) -> int:
+        """Re-index given files only, dropping those that no longer exist."""
+        changed = {}
+        removed = []
+        for path in map(os.path.normpath, paths):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                removed.append(path)
+                continue
+            changed[path] = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            return self._apply(changed, [path for path in removed if path in self._paths])
+
+    def follow(self, state: CorpusState) -> int:
+        """Apply changes published by corpus state since last call.
+
+        Falls back to a full refresh when the change history needed
+        is no longer available.
+        """
+        version = state.version
+        changes = state.changes(self._version)
+        if changes is None:
+            count = self.refresh()
+        else:
+            count = self.update([change.path for change in changes])
+        self._version = version
+        return count
+
+    def ranked(
+        self, text: str, limit: int, prefix: str | None = None
+    ) -> list[tuple[str, float]]:
+        """Top files for text by BM25 score, optionally under path prefix."""
+        with self._lock:
+            total = len(self._docs)
+            if total == 0:
+                return []
+            average = self._length / total or 1.0
+            scores: dict[int, float] = {}
+            for term in set(tokens(text)):
+                live = self._live(term)
+                if not live:
+                    continue
+                idf = math.log(1 + (total - len(live) + 0.5) / (len(live) + 0.5))
+                for doc, tf in live:
+                    norm = 1 - BM25_B + BM25_B * self._docs[doc][3] / average
+                    gain = idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * norm)
+                    scores[doc] = scores.get(doc, 0.0) + gain
+            if prefix:
+                scope = os.path.normpath(prefix)
+                scores = {
+                    doc: score
+                    for doc, score in scores.items()
+                    if self._docs[doc][0] == scope
+                    or self._docs[doc][0].startswith(scope + os.sep)
+                }
+            top = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+            return [(self._docs[doc][0], score) for doc, score in top]
+
+    def frequency(self, term: str) -> int:
+        """Number of live files containing term."""
+        with self._lock:
+            return len(self._live(term))
+
+    def family(self, term: str) -> int:
+        """Number of live files containing any word sharing the stem of term."""
+        with self._lock:
+            return len(self._live(STEM + stem(term)))
+
+    def together(self, terms: list[str]) -> int:
+        """Number of live files containing all terms."""
+        with self._lock:
+            found: set[int] | None = None
+            for term in terms:
+                docs = {doc for doc, _ in self._live(term)}
+                found = docs if found is None else found & docs
+                if not found:
+                    return 0
+            return len(found or set())
+
+    def _live(self, term: str) -> list[tuple[int, int]]:
+        """Postings of term across segments, skipping replaced documents."""
+        live = []
+        for segment in self._segments:
+            pairs = segment.pairs(term)
+            for idx in range(0, len(pairs), 2):
+                if pairs[idx] in self._docs:
+                    live.append((pairs[idx], pairs[idx + 1]))
+        return live
+
+    def _apply(self, changed: dict[str, tuple[int, int]], removed: list[str]) -> int:
+        """Tokenize changed files into a new segment and forget removed ones."""
+        if not changed and not removed:
+            return 0
+        for path in [*removed, *changed]:
+            doc = self._paths.pop(path, None)
+            if doc is not None:
+                self._length -= self._docs.pop(doc)[3]
+        postings: dict[str, array.array] = {}
+        for path, (mtime, size) in changed.items():
+            counts = Counter(tokens(extract(Path(path))))
+            doc = self._next
+            self._next += 1
+            self._docs[doc] = [path, mtime, size, sum(counts.values())]
+            self._length += self._docs[doc][3]
+            self._paths[path] = doc
+            stems: Counter[str] = Counter()
+            for term, tf in counts.items():
+                postings.setdefault(term, array.array("I")).extend((doc, tf))
+                stems[STEM + stem(term)] += tf
+            for key, tf in stems.items():
+                postings.setdefault(key, array.array("I")).extend((doc, tf))
+        if postings:
+            self._folder.mkdir(parents=True, exist_ok=True)
+            name = f"segment{self._generation:06d}"
+            self._generation += 1
+            Segment.write(self._folder, name, postings)
+            self._segments.append(Segment(self._folder, name))
+        if len(self._segments) > MAX_SEGMENTS:
+            self._compact()
+        self._save()
+        return len(changed) + len(removed)
+
+    def _compact(self) -> None:
+        """Merge all segments into one, dropping postings of dead documents."""
+        terms = sorted({term for segment in self._segments for term in segment.terms()})
+        postings = {}
+        for term in terms:
+            pairs = array.array("I")
+            for doc, tf in self._live(term):
+                pairs.extend((doc, tf))
+            if pairs:
+                postings[term] = pairs
+        name = f"segment{self._generation:06d}"
+        self._generation += 1
+        Segment.write(self._folder, name, postings)
+        merged = Segment(self._folder, name)
+        for segment in self._segments:
+            segment.remove(self._folder)
+        self._segments = [merged]
+
+    def _save(self) -> None:
+        """Persist manifest of documents and segments."""
+        manifest = {
+            "format": INDEX_FORMAT,
+            "root": self._root,
+            "next": self._next,
+            "generation": self._generation,
+            "segments": [segment.name for segment in self._segments],
+            "docs": [[doc, *record] for doc, record in self._docs.items()],
+        }
+        replace(self._folder / "manifest.json", json.dumps(manifest).encode("utf-8"))
+
+    def _load(self) -> None:
+        """Open existing index from disk, starting over if it is damaged."""
+        manifest = self._folder / "manifest.json"
+        if not manifest.exists():
+            return
+        try:
+            data = json.loads(manifest.read_text(encoding="utf-8"))
+            if data.get("format") != INDEX_FORMAT:
+                raise ValueError("outdated index format")
+            segments = [Segment(self._folder, name) for name in data["segments"]]
+        except (OSError, ValueError, KeyError):
+            shutil.rmtree(self._folder, ignore_errors=True)
+            return
+        self._segments = segments
+        self._next = data["next"]
+        self._generation = data["generation"]
+        for doc, *record in data["docs"]:
+            self._docs[doc] = record
+            self._length += record[3]
+            self._paths[record[0]] = doc
@@ -33,6 +33,8 @@ class UsageStats(BaseModel):
     total_tokens: int = 0
     calls: int = 0
     elapsed_seconds: float = 0.0
+    tool_seconds: float = 0.0
+    iterations: int = 0
 
     def add(self, usage: CompletionUsage | None, elapsed: float = 0.0) -> None:
         if usage:
@@ -61,6 +63,8 @@ class UsageStats(BaseModel):
             f"Completion tokens: {self.completion_tokens:,}\n"
             f"Total tokens: {self.total_tokens:,}\n"
             f"Time: {self.elapsed_seconds:.2f}s\n"
+            f"Tool time: {self.tool_seconds:.2f}s\n"
+            f"Iterations: {self.iterations}\n"
             f"Speed: {self.tokens_per_second:.1f} tokens/s"
         )
 
@@ -0,0 +1,196 @@
+import bisect
+import json
+import os
+import re
+import sys
+from pathlib import Path
+from typing import final
+
+import settings
+from search_agent.cache import location
+from search_agent.index import replace
+from search_agent.parser import blocks
+from search_agent.text import extract, scan
+from search_agent.ugrep import MAX_OUTPUT_CHARS, STOPPED, Demux, Search, portable, run
+
+PACK_ROW = re.compile(r"([:-])(\d+)\1")
+
+
+@final
+class Pack:
+    """Documents of a folder concatenated into one text file.
+
+    A table of starting lines maps every line of the packed file
+    back to its original file and line, so a single ugrep pass
+    over the pack replaces opening thousands of small files.
+
+    >>> import tempfile
+    >>> with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as cache:
+    ...     _ = (Path(root) / "a.txt").write_text("one\\ntwo")
+    ...     _ = (Path(root) / "b.txt").write_text("three\\n")
+    ...     pack = Pack(Path(cache))
+    ...     _ = pack.write(root)
+    ...     Path(pack.locate(3)[0]).name, pack.locate(3)[1]
+    ('b.txt', 1)
+    """
+
+    def __init__(self, folder: Path) -> None:
+        self._folder = folder
+        self.corpus = folder / "corpus.txt"
+        self._root = ""
+        self._files: list[list] = []
+        self._starts: list[int] = []
+        self._load()
+
+    def write(self, root: str) -> int:
+        """Pack all documents under root, return number of packed files."""
+        self._folder.mkdir(parents=True, exist_ok=True)
+        files = []
+        line = 1
+        temp = self.corpus.with_name(self.corpus.name + ".tmp")
+        with open(temp, "w", encoding="utf-8") as out:
+            for path, (mtime, size) in sorted(scan(root).items()):
+                text = extract(Path(path)).replace("\0", " ")
+                if text and not text.endswith("\n"):
+                    text += "\n"
+                out.write(text)
+                files.append([path, mtime, size, line])
+                line += text.count("\n")
+        os.replace(temp, self.corpus)
+        table = {"root": os.path.normpath(root), "files": files}
+        replace(self._folder / "table.json", json.dumps(table).encode("utf-8"))
+        self._load()
+        return len(files)
+
+    def fresh(self, files: dict[str, tuple[int, int]]) -> bool:
+        """Check that pack exists and matches files mapped to (mtime_ns, size)."""
+        if not self._files:
+            return False
+        packed = {path: (mtime, size) for path, mtime, size, _ in self._files}
+        return packed == files
+
+    def covers(self, path: str | None) -> bool:
+        """Check if a search over path can run on the pack."""
+        return path is None or os.path.normpath(path) == self._root
+
+    def locate(self, line: int) -> tuple[str, int]:
+        """Original file and its line number of a pack line."""
+        idx = bisect.bisect_right(self._starts, line) - 1
+        path, _, _, start = self._files[idx]
+        return path, line - start + 1
+
+    def remap(self, output: str) -> str:
+        """Rewrite ugrep output over the pack to original files and lines.
+
+        Context lines spilling over from a neighbouring document are
+        dropped, so every block stays within the file it matched.
+        """
+        prefix = str(self.corpus)
+        chunks = []
+        for lines in blocks(output):
+            rows = []
+            for line in lines:
+                found = PACK_ROW.match(line, len(prefix))
+                if not line.startswith(prefix) or not found:
+                    continue
+                path, number = self.locate(int(found.group(2)))
+                sep = found.group(1)
+                rows.append((path, sep, f"{path}{sep}{number}{sep}{line[found.end():]}"))
+            matched = {path for path, sep, _ in rows if sep == ":"}
+            current: list[str] = []
+            owner = None
+            for path, _, text in rows:
+                if path not in matched:
+                    continue
+                if path != owner and current:
+                    chunks.append(current)
+                    current = []
+                owner = path
+                current.append(text)
+            if current:
+                chunks.append(current)
+        if not chunks:
+            return ""
+        return "\n--\n".join("\n".join(chunk) for chunk in chunks) + "\n"
+
+    def _load(self) -> None:
+        """Read offset table from disk, leaving pack empty if missing or damaged."""
+        table = self._folder / "table.json"
+        if not table.exists() or not self.corpus.exists():
+            return
+        try:
+            data = json.loads(table.read_text(encoding="utf-8"))
+            self._root = data["root"]
+            self._files = data["files"]
+        except (OSError, ValueError, KeyError):
+            self._root, self._files = "", []
+        self._starts = [entry[3] for entry in self._files]
+
+
+@final
+class PackedSearch(Search):
+    """Searches the packed corpus with one ugrep pass over a single file.
+
+    Output is remapped to original file names and line numbers.
+    Searches scoped to a subfolder or file go to the origin search.
+
+    >>> import asyncio, tempfile
+    >>> from search_agent.ugrep import UgrepSearch
+    >>> with tempfile.TemporaryDirectory() as cache:
+    ...     search = PackedSearch(Pack(Path(cache)), UgrepSearch())
+    ...     isinstance(asyncio.run(search.execute("test", "docs/")), str)
+    True
+    """
+
+    def __init__(self, pack: Pack, origin: Search, limit: int = MAX_OUTPUT_CHARS) -> None:
+        self._pack = pack
+        self._origin = origin
+        self._limit = limit
+
+    async def execute(self, pattern: str, path: str | None) -> str:
+        """Execute search over the pack and return remapped output."""
+        if not self._pack.covers(path):
+            return await self._origin.execute(pattern, path)
+        cmd = ["ug", "--config=.ugrep", "--with-filename", pattern, str(self._pack.corpus)]
+        output, stopped = await run(cmd, self._limit)
+        result = self._pack.remap(output)[: self._limit] or "No matches found"
+        return f"{result}\n{STOPPED}" if stopped else result
+
+    async def batch(self, patterns: list[str], path: str | None) -> list[str]:
+        """Search all patterns in one pass over the pack, split per pattern.
+
+        Like UgrepSearch.batch, only portable patterns share the pass and
+        an unattributable split falls back to separate searches.
+        """
+        if not self._pack.covers(path):
+            return await self._origin.batch(patterns, path)
+        compiled: dict[int, re.Pattern] = {}
+        for idx, pattern in enumerate(patterns):
+            found = portable(pattern)
+            if found is not None:
+                compiled[idx] = found
+        if len(compiled) < 2:
+            return await super().batch(patterns, path)
+        cmd = ["ug", "--config=.ugrep", "--with-filename"]
+        for idx in compiled:
+            cmd += ["-e", patterns[idx]]
+        cmd.append(str(self._pack.corpus))
+        combined, stopped = await run(cmd, self._limit * len(compiled))
+        parts = Demux(list(compiled.values())).split(self._pack.remap(combined))
+        if parts is None:
+            return await super().batch(patterns, path)
+        split = dict(zip(compiled, parts))
+        results = []
+        for idx, pattern in enumerate(patterns):
+            if idx not in compiled:
+                results.append(await self.execute(pattern, path))
+            else:
+                results.append(split[idx][: self._limit] or "No matches found")
+        if stopped:
+            return [f"{result}\n{STOPPED}" for result in results]
+        return results
+
+if __name__ == "__main__":
+    root = sys.argv[1] if len(sys.argv) > 1 else settings.DOCS_FOLDER
+    count = Pack(location("pack", root)).write(root)
+    print(f"Packed {count} files from {root}")
@@ -0,0 +1,123 @@
+import secrets
+import time
+from collections import OrderedDict
+from typing import final
+
+from search_agent.ugrep import MAX_OUTPUT_CHARS, Search
+
+PAGE_TTL_SECONDS = 600
+MAX_STORED_CHARS = 50_000_000
+
+
+@final
+class ResultStore:
+    """Remainders of truncated search output awaiting continuation.
+
+    Entries expire after ttl seconds; oldest entries are evicted
+    when total stored characters exceed capacity.
+
+    >>> store = ResultStore(ttl=60, capacity=100)
+    >>> cursor = store.put("rest of output")
+    >>> store.take(cursor)
+    'rest of output'
+    >>> store.take(cursor) is None
+    True
+    """
+
+    def __init__(
+        self, ttl: float = PAGE_TTL_SECONDS, capacity: int = MAX_STORED_CHARS
+    ) -> None:
+        self._ttl = ttl
+        self._capacity = capacity
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._size = 0
+
+    def put(self, text: str) -> str:
+        """Store text and return cursor for retrieving it."""
+        self._expire()
+        cursor = secrets.token_hex(8)
+        self._entries[cursor] = (time.monotonic(), text)
+        self._size += len(text)
+        while self._size > self._capacity and self._entries:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+        return cursor
+
+    def take(self, cursor: str) -> str | None:
+        """Remove and return text stored under cursor, None if gone."""
+        self._expire()
+        entry = self._entries.pop(cursor, None)
+        if entry is None:
+            return None
+        self._size -= len(entry[1])
+        return entry[1]
+
+    def size(self) -> int:
+        """Total characters currently stored."""
+        return self._size
+
+    def _expire(self) -> None:
+        """Drop entries older than ttl, oldest first."""
+        deadline = time.monotonic() - self._ttl
+        while self._entries:
+            cursor, (created, text) = next(iter(self._entries.items()))
+            if created > deadline:
+                break
+            del self._entries[cursor]
+            self._size -= len(text)
+
+
+@final
+class PagedSearch(Search):
+    """Splits search output into pages with continuation cursors.
+
+    The first page is returned directly; the remainder is kept in
+    the store so the next page does not re-scan the corpus.
+    Pages are cut at line boundaries.
+
+    >>> import asyncio
+    >>> class Fixed(Search):
+    ...     async def execute(self, pattern, path):
+    ...         return "docs/a.txt:one\\ndocs/a.txt:two\\n"
+    >>> search = PagedSearch(Fixed(), ResultStore(), size=16)
+    >>> print(asyncio.run(search.execute("x", None)).split("\\n")[0])
+    docs/a.txt:one
+    """
+
+    def __init__(
+        self, origin: Search, store: ResultStore, size: int = MAX_OUTPUT_CHARS
+    ) -> None:
+        self._origin = origin
+        self._store = store
+        self._size = size
+
+    async def execute(self, pattern: str, path: str | None) -> str:
+        """Execute search and return first page of output."""
+        return self._page(await self._origin.execute(pattern, path))
+
+    async def batch(self, patterns: list[str], path: str | None) -> list[str]:
+        """Execute searches in one batch and return first page of each."""
+        outputs = await self._origin.batch(patterns, path)
+        return [self._page(output) for output in outputs]
+
+    def more(self, cursor: str) -> str:
+        """Return next page of output stored under cursor."""
+        rest = self._store.take(cursor)
+        if rest is None:
+            return f"Cursor {cursor} expired or unknown, run the search again"
+        return self._page(rest)
+
+    def _page(self, output: str) -> str:
+        """Cut output to page size, storing the remainder."""
+        if len(output) <= self._size:
+            return output
+        cut = output.rfind("\n", 0, self._size) + 1
+        if cut <= 0:
+            cut = self._size
+        head, rest = output[:cut], output[cut:]
+        cursor = self._store.put(rest)
+        return (
+            head.rstrip("\n")
+            + f"\n[Output truncated, {len(rest)} more characters."
+            + f' Call next_page with cursor "{cursor}" to continue.]'
+        )
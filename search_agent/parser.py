@@ -1,9 +1,86 @@
+import re
 from abc import ABC, abstractmethod
-from typing import final
+from typing import NamedTuple, final
 
+from search_agent.citations import Span
 from search_agent.models import Citation
 from settings import FILE_EXTENSIONS
 
+NUMBER = re.compile(r"(\d+)[:-]")
+
+
+class Row(NamedTuple):
+    """Single ugrep output line split into its parts."""
+
+    path: str
+    match: bool
+    number: int | None
+    content: str
+
+
+def row(line: str) -> Row | None:
+    """Split ugrep output line into path, match flag, line number and content.
+
+    Handles format: path:content, path-content and, with line
+    numbers enabled, path:number:content or path-number-content.
+    Returns None for lines without a known file path.
+
+    >>> row("docs/a.txt:12:Hello")
+    Row(path='docs/a.txt', match=True, number=12, content='Hello')
+    >>> row("docs/a.txt-World")
+    Row(path='docs/a.txt', match=False, number=None, content='World')
+    """
+    stripped = line.strip()
+    if "/" not in stripped:
+        return None
+    for ext in FILE_EXTENSIONS:
+        idx = stripped.find(ext)
+        if idx > 0:
+            sep_idx = idx + len(ext)
+            if sep_idx < len(stripped) and stripped[sep_idx] in (":", "-"):
+                rest = stripped[sep_idx + 1 :]
+                number = None
+                found = NUMBER.match(rest)
+                if found:
+                    number = int(found.group(1))
+                    rest = rest[found.end() :]
+                return Row(
+                    path=stripped[:sep_idx],
+                    match=stripped[sep_idx] == ":",
+                    number=number,
+                    content=rest.strip(),
+                )
+    return None
+
+
+def blocks(output: str) -> list[list[str]]:
+    """Split ugrep output into blocks of raw lines.
+
+    Blocks end at "--" separators and where the file path changes.
+    Lines that are not ugrep rows form single-line blocks of their own.
+
+    >>> blocks("docs/a.txt:1:x\\n--\\ndocs/a.txt:9:y\\ndocs/b.txt:2:z\\n")
+    [['docs/a.txt:1:x'], ['docs/a.txt:9:y'], ['docs/b.txt:2:z']]
+    """
+    result: list[list[str]] = []
+    current: list[str] = []
+    path: str | None = None
+    for line in output.split("\n"):
+        parsed = row(line)
+        if parsed is None or parsed.path != path:
+            if current:
+                result.append(current)
+            current, path = [], None
+        if parsed is None:
+            if line.strip() and line.strip() != "--":
+                result.append([line])
+            continue
+        path = parsed.path
+        current.append(line)
+    if current:
+        result.append(current)
+    return result
+
 
 class Parser(ABC):
     """Parses text output into citations."""
@@ -17,7 +94,8 @@ class Parser(ABC):
 class Block:
     """Single context block from ugrep output.
 
-    Accumulates lines until separator, then converts to Citation.
+    Accumulates lines until separator, then converts to Citation
+    named by file name, or to Span keyed by full path.
 
     >>> block = Block("report.pdf")
     >>> block.append("First line")
@@ -27,13 +105,17 @@ class Block:
     'First line Second line'
     """
 
-    def __init__(self, filename: str) -> None:
-        self._filename = filename
+    def __init__(self, path: str) -> None:
+        self._path = path
+        self._filename = path.split("/")[-1]
         self._lines: list[str] = []
+        self._numbers: list[int] = []
 
-    def append(self, line: str) -> None:
-        """Add a line to this block."""
+    def append(self, line: str, number: int | None = None) -> None:
+        """Add a line to this block, with its line number if known."""
         self._lines.append(line)
+        if number is not None:
+            self._numbers.append(number)
 
     def empty(self) -> bool:
         """Check if block has no content."""
@@ -44,17 +126,28 @@ class Block:
         text = " ".join(self._lines)
         return Citation(location=self._filename, text=text)
 
+    def span(self) -> Span:
+        """Convert block to compact Span placed by line numbers."""
+        if len(self._numbers) != len(self._lines):
+            return Span(self._path, None, None, list(self._lines))
+        start, end = min(self._numbers), max(self._numbers)
+        lines = [""] * (end - start + 1)
+        for number, line in zip(self._numbers, self._lines):
+            lines[number - start] = line
+        return Span(self._path, start, end, lines)
+
 
 @final
 class UgrepParser(Parser):
     """Parses ugrep output format into citations.
 
-    Handles format: path:content or path-content
+    Handles format: path:content or path-content, optionally
+    with line numbers after the path.
     Blocks are separated by "--".
     Extracts filename from path and joins content lines.
 
     >>> parser = UgrepParser()
-    >>> output = "docs/file.txt:Hello\\ndocs/file.txt-World\\n"
+    >>> output = "docs/file.txt:1:Hello\\ndocs/file.txt-2-World\\n"
     >>> citations = parser.parse(output)
     >>> len(citations)
     1
@@ -64,47 +157,46 @@ class UgrepParser(Parser):
 
     def __init__(self) -> None:
         self._block: Block | None = None
-        self._citations: list[Citation] = []
-        self._filename: str = ""
+        self._blocks: list[Block] = []
+        self._path: str = ""
 
     def parse(self, output: str) -> list[Citation]:
         """Parse ugrep output into list of citations."""
+        return [block.citation() for block in self._split(output)]
+
+    def spans(self, output: str) -> list[Span]:
+        """Parse ugrep output into compact spans for CitationStore."""
+        return [block.span() for block in self._split(output)]
+
+    def _split(self, output: str) -> list[Block]:
+        """Split output into non-empty blocks."""
         self._block = None
-        self._citations = []
-        self._filename = ""
+        self._blocks = []
+        self._path = ""
         for line in output.split("\n"):
             self._process(line)
         self._flush()
-        return self._citations
+        return self._blocks
 
     def _process(self, line: str) -> None:
         """Process a single line of output."""
-        stripped = line.strip()
-        if stripped == "--":
+        if line.strip() == "--":
             self._flush()
             return
-        if "/" not in stripped:
+        parsed = row(line)
+        if parsed is None:
             return
-        for ext in FILE_EXTENSIONS:
-            idx = stripped.find(ext)
-            if idx > 0:
-                sep_idx = idx + len(ext)
-                if sep_idx < len(stripped) and stripped[sep_idx] in (":", "-"):
-                    path = stripped[:sep_idx]
-                    content = stripped[sep_idx + 1 :].strip()
-                    filename = path.split("/")[-1]
-                    if self._filename != filename:
-                        self._flush()
-                        self._filename = filename
-                        self._block = Block(filename)
-                    if self._block is None:
-                        self._block = Block(filename)
-                    if content:
-                        self._block.append(content)
-                    return
+        if self._path != parsed.path:
+            self._flush()
+            self._path = parsed.path
+            self._block = Block(parsed.path)
+        if self._block is None:
+            self._block = Block(parsed.path)
+        if parsed.content:
+            self._block.append(parsed.content, parsed.number)
 
     def _flush(self) -> None:
-        """Emit current block as citation if non-empty."""
+        """Emit current block if non-empty."""
         if self._block is not None and not self._block.empty():
-            self._citations.append(self._block.citation())
+            self._blocks.append(self._block)
         self._block = None
@@ -0,0 +1,84 @@
+import asyncio
+from pathlib import Path
+from typing import final
+
+from search_agent.index import InvertedIndex, tokens
+from search_agent.text import extract
+from search_agent.ugrep import MAX_OUTPUT_CHARS, Search
+from search_agent.watcher import CorpusState
+
+MAX_RANKED_FILES = 10
+SNIPPET_CONTEXT = 1
+
+
+def snippet(path: str, query: str, context: int = SNIPPET_CONTEXT) -> list[str]:
+    """Best matching line of file with surrounding lines, in ugrep row format.
+
+    The best line holds the most distinct query tokens.
+
+    >>> import tempfile
+    >>> with tempfile.NamedTemporaryFile("w", suffix=".txt") as tmp:
+    ...     _ = tmp.write("intro\\nglacial rebound here\\noutro\\n")
+    ...     tmp.flush()
+    ...     [line.split(tmp.name)[1] for line in snippet(tmp.name, "rebound", 0)]
+    [':2:glacial rebound here']
+    """
+    wanted = set(tokens(query))
+    lines = extract(Path(path)).split("\n")
+    best, score = 0, -1
+    for idx, line in enumerate(lines):
+        found = len(wanted & set(tokens(line)))
+        if found > score:
+            best, score = idx, found
+    start = max(0, best - context)
+    end = min(len(lines), best + context + 1)
+    rows = []
+    for idx in range(start, end):
+        sep = ":" if idx == best else "-"
+        rows.append(f"{path}{sep}{idx + 1}{sep}{lines[idx].strip()}")
+    return rows
+
+
+@final
+class RankedSearch(Search):
+    """Ranks files by BM25 relevance using an on-disk inverted index.
+
+    Treats the pattern as free text query. Returns top files, best
+    first, each with its best snippet in ugrep row format. Given a
+    corpus state, only files it reports as changed are re-indexed.
+
+    >>> import asyncio, tempfile
+    >>> with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as cache:
+    ...     _ = (Path(root) / "a.txt").write_text("glacial rebound")
+    ...     search = RankedSearch(InvertedIndex(root, Path(cache)))
+    ...     "a.txt:1:glacial rebound" in asyncio.run(search.execute("rebound", None))
+    True
+    """
+
+    def __init__(
+        self,
+        index: InvertedIndex,
+        limit: int = MAX_RANKED_FILES,
+        size: int = MAX_OUTPUT_CHARS,
+        state: CorpusState | None = None,
+    ) -> None:
+        self._index = index
+        self._state = state
+        self._limit = limit
+        self._size = size
+
+    async def execute(self, pattern: str, path: str | None) -> str:
+        """Execute ranked search and return snippets of top files."""
+        if self._state is None:
+            await asyncio.to_thread(self._index.refresh)
+        else:
+            await asyncio.to_thread(self._index.follow, self._state)
+        ranked = await asyncio.to_thread(self._index.ranked, pattern, self._limit, path)
+        if not ranked:
+            return "No matches found"
+        snippets = await asyncio.gather(
+            *[asyncio.to_thread(snippet, found, pattern) for found, _ in ranked]
+        )
+        header = f"Top {len(ranked)} files by relevance, best first:"
+        body = "\n--\n".join("\n".join(lines) for lines in snippets)
+        return f"{header}\n{body}"[: self._size]
@@ -0,0 +1,328 @@
+import argparse
+import asyncio
+import heapq
+import json
+import logging
+from abc import ABC, abstractmethod
+from typing import final
+
+from search_agent.folders import list_folder
+from search_agent.parser import blocks, row
+from search_agent.ugrep import MAX_RESULT_CHARS, Search, UgrepSearch
+
+logger = logging.getLogger(__name__)
+
+MAX_MESSAGE_BYTES = 64 * 1024 * 1024
+SHARD_TIMEOUT_SECONDS = 60.0
+SHARD_CONNECTIONS = 4
+
+
+def merge(outputs: list[str], limit: int) -> str:
+    """Merge search outputs of shards into one, ordered by file path.
+
+    Blocks of each shard keep their order; ties between shards keep
+    shard order. Output stops at the last whole block within limit.
+
+    >>> print(merge(["a/x.txt:1:cat\\n", "b/w.txt:2:cat\\n"], 100), end="")
+    a/x.txt:1:cat
+    --
+    b/w.txt:2:cat
+    """
+    streams = []
+    notes: list[str] = []
+    for output in outputs:
+        stream = []
+        for lines in blocks(output):
+            parsed = row(lines[0])
+            if parsed is None:
+                notes.extend(line for line in lines if line not in notes)
+                continue
+            stream.append((parsed.path, "\n".join(lines)))
+        streams.append(stream)
+    chunks: list[str] = []
+    size = 0
+    dropped = 0
+    for _, text in heapq.merge(*streams, key=lambda block: block[0]):
+        if dropped or size + len(text) > limit:
+            dropped += 1
+            continue
+        chunks.append(text)
+        size += len(text) + 4
+    notes = [note for note in notes if note and note != "No matches found"]
+    if dropped:
+        notes.append(f"[{dropped} blocks over the output budget omitted]")
+    if not chunks:
+        return "\n".join(notes) or "No matches found"
+    return "\n--\n".join(chunks) + "\n" + "".join(f"{note}\n" for note in notes)
+
+
+def listing(outputs: list[str], folder: str) -> str:
+    """Merge list_folder outputs of shards into one sorted listing.
+
+    >>> print(listing(["Files in t/:\\na/t/x.txt", "No files found for: t"], "t"))
+    Files in t/:
+    a/t/x.txt
+    """
+    header = ""
+    files: list[str] = []
+    for output in outputs:
+        lines = output.split("\n")
+        if lines[0].startswith("No files found"):
+            continue
+        header = header or lines[0]
+        files.extend(line for line in lines[1:] if line)
+    if not files:
+        return f"No files found for: {folder}"
+    return header + "\n" + "\n".join(sorted(files))
+
+
+@final
+class ShardServer:
+    """Serves search and folder listing over one shard folder as JSON lines.
+
+    Every request line is an object with method and params; every
+    response line holds either result or error.
+
+    >>> import tempfile
+    >>> with tempfile.TemporaryDirectory() as root:
+    ...     server = ShardServer(root)
+    ...     asyncio.run(server.handle({"method": "ping", "params": {}}))
+    {'result': 'pong'}
+    """
+
+    def __init__(self, folder: str, limit: int = MAX_RESULT_CHARS) -> None:
+        self._folder = folder
+        self._search = UgrepSearch(limit=limit, folder=folder)
+
+    async def handle(self, request: dict) -> dict:
+        """Answer one request."""
+        method = request.get("method")
+        params = request.get("params", {})
+        try:
+            if method == "ping":
+                return {"result": "pong"}
+            if method == "search":
+                result = await self._search.execute(params["pattern"], params.get("path"))
+                return {"result": result}
+            if method == "batch":
+                result = await self._search.batch(params["patterns"], params.get("path"))
+                return {"result": result}
+            if method == "list_folder":
+                return {"result": await list_folder(params["folder"], self._folder)}
+        except (KeyError, TypeError) as exc:
+            return {"error": f"Bad params for {method}: {exc}"}
+        return {"error": f"Unknown method: {method}"}
+
+    async def serve(self, address: str) -> asyncio.Server:
+        """Start listening on unix:/path or host:port address."""
+        if address.startswith("unix:"):
+            return await asyncio.start_unix_server(
+                self._connection, address[5:], limit=MAX_MESSAGE_BYTES
+            )
+        host, _, port = address.rpartition(":")
+        return await asyncio.start_server(
+            self._connection, host or "127.0.0.1", int(port), limit=MAX_MESSAGE_BYTES
+        )
+
+    async def _connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Answer requests of one connection in order until it closes."""
+        try:
+            while line := await reader.readline():
+                try:
+                    response = await self.handle(json.loads(line))
+                except ValueError as exc:
+                    response = {"error": f"Bad request: {exc}"}
+                writer.write(json.dumps(response).encode("utf-8") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+class Shard(ABC):
+    """One part of the corpus that answers search requests."""
+
+    @abstractmethod
+    async def call(self, method: str, **params) -> str | list[str]:
+        """Call method on the shard, raising ConnectionError on failure."""
+
+
+@final
+class LocalShard(Shard):
+    """Shard served in-process, without sockets."""
+
+    def __init__(self, server: ShardServer) -> None:
+        self._server = server
+
+    async def call(self, method: str, **params) -> str | list[str]:
+        """Call method on the server directly."""
+        response = await self._server.handle({"method": method, "params": params})
+        if "error" in response:
+            raise ConnectionError(response["error"])
+        return response["result"]
+
+
+@final
+class RemoteShard(Shard):
+    """Shard behind a ShardServer, reached over a pool of persistent connections.
+
+    The server answers each connection in order, so concurrent calls
+    take separate connections, up to connections at a time. Idle
+    connections are kept open for later calls.
+    """
+
+    def __init__(
+        self,
+        address: str,
+        timeout: float = SHARD_TIMEOUT_SECONDS,
+        connections: int = SHARD_CONNECTIONS,
+    ) -> None:
+        self.address = address
+        self._timeout = timeout
+        self._slots = asyncio.Semaphore(connections)
+        self._idle: list[tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+
+    async def call(self, method: str, **params) -> str | list[str]:
+        """Send request and wait for its response, reconnecting once if needed."""
+        request = json.dumps({"method": method, "params": params}).encode("utf-8")
+        async with self._slots:
+            for attempt in range(2):
+                streams = self._idle.pop() if self._idle and not attempt else None
+                try:
+                    if streams is None:
+                        streams = await asyncio.wait_for(self._connect(), self._timeout)
+                    response = await asyncio.wait_for(
+                        self._exchange(streams, request), self._timeout
+                    )
+                    break
+                except (OSError, EOFError, TimeoutError, ValueError) as exc:
+                    if streams is not None:
+                        self._discard(streams)
+                    if attempt:
+                        raise ConnectionError(f"{self.address}: {exc}") from exc
+            self._idle.append(streams)
+        if "error" in response:
+            raise ConnectionError(f"{self.address}: {response['error']}")
+        return response["result"]
+
+    @staticmethod
+    async def _exchange(
+        streams: tuple[asyncio.StreamReader, asyncio.StreamWriter], request: bytes
+    ) -> dict:
+        """Write request line and read response line."""
+        reader, writer = streams
+        writer.write(request + b"\n")
+        await writer.drain()
+        line = await reader.readline()
+        if not line:
+            raise EOFError("connection closed")
+        return json.loads(line)
+
+    async def _connect(self) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        """Open connection to unix:/path or host:port address."""
+        if self.address.startswith("unix:"):
+            return await asyncio.open_unix_connection(
+                self.address[5:], limit=MAX_MESSAGE_BYTES
+            )
+        host, _, port = self.address.rpartition(":")
+        return await asyncio.open_connection(
+            host or "127.0.0.1", int(port), limit=MAX_MESSAGE_BYTES
+        )
+
+    async def close(self) -> None:
+        """Close idle connections to the shard."""
+        idle, self._idle = self._idle, []
+        for _, writer in idle:
+            writer.close()
+            await writer.wait_closed()
+
+    def disconnect(self) -> None:
+        """Close idle connections without waiting, e.g. at shutdown."""
+        idle, self._idle = self._idle, []
+        for streams in idle:
+            self._discard(streams)
+
+    @staticmethod
+    def _discard(streams: tuple[asyncio.StreamReader, asyncio.StreamWriter]) -> None:
+        """Close a broken or unwanted connection without waiting."""
+        try:
+            streams[1].close()
+        except RuntimeError:
+            pass  # event loop already closed, the transport went with it
+
+
+@final
+class ShardedSearch(Search):
+    """Fans searches out to all shards and merges their output.
+
+    Results are ordered by file path across shards and cut to a
+    global output budget. Shards that fail are reported in a note
+    while the others still answer.
+    """
+
+    def __init__(self, shards: list[Shard], limit: int = MAX_RESULT_CHARS) -> None:
+        self._shards = shards
+        self._limit = limit
+
+    async def execute(self, pattern: str, path: str | None) -> str:
+        """Search pattern on every shard and return merged output."""
+        outputs = await self._gather("search", pattern=pattern, path=path)
+        return merge(outputs, self._limit)
+
+    async def batch(self, patterns: list[str], path: str | None) -> list[str]:
+        """Search all patterns in one batch per shard, merged per pattern."""
+        answers = await asyncio.gather(
+            *[self._safe(shard, "batch", patterns=patterns, path=path) for shard in self._shards]
+        )
+        results = []
+        for idx in range(len(patterns)):
+            outputs = [
+                answer[idx] if isinstance(answer, list) else answer for answer in answers
+            ]
+            results.append(merge(outputs, self._limit))
+        return results
+
+    async def list_folder(self, folder: str) -> str:
+        """List folder on every shard and return merged listing."""
+        outputs = await self._gather("list_folder", folder=folder)
+        return listing(outputs, folder)
+
+    async def _gather(self, method: str, **params) -> list[str]:
+        """Call method on all shards concurrently."""
+        return list(
+            await asyncio.gather(
+                *[self._safe(shard, method, **params) for shard in self._shards]
+            )
+        )
+
+    @staticmethod
+    async def _safe(shard: Shard, method: str, **params) -> str | list[str]:
+        """Call shard, turning failure into a note."""
+        try:
+            return await shard.call(method, **params)
+        except ConnectionError as exc:
+            logger.warning(f"Shard call {method} failed: {exc}")
+            return f"[Shard unavailable, results are incomplete: {exc}]"
+
+
+async def main() -> None:
+    """Serve one shard folder until interrupted."""
+    parser = argparse.ArgumentParser(description="Serve a corpus shard")
+    parser.add_argument("folder", help="Shard documents folder")
+    parser.add_argument(
+        "--listen",
+        default="127.0.0.1:7700",
+        help="Address to listen on, host:port or unix:/path",
+    )
+    args = parser.parse_args()
+    server = await ShardServer(args.folder).serve(args.listen)
+    logger.info(f"Serving shard {args.folder} on {args.listen}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,198 @@
+import array
+import hashlib
+import mmap
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import final
+
+import settings
+from search_agent.cache import location
+from search_agent.index import replace
+from search_agent.text import extract
+
+MAX_SPAN_LINES = 200
+MAX_OPEN_FILES = 64
+
+
+def line(value: object) -> int | None:
+    """Line number from a model-supplied tool argument, or None.
+
+    >>> line(12), line("7"), line("10-20"), line(None)
+    (12, 7, None, None)
+    """
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+@final
+class LineIndex:
+    """Line start offsets of a text file, reading lines from a memory map.
+
+    >>> import tempfile
+    >>> with tempfile.NamedTemporaryFile("w", suffix=".txt") as tmp:
+    ...     _ = tmp.write("one\\ntwo\\nthree")
+    ...     tmp.flush()
+    ...     lines = LineIndex(Path(tmp.name))
+    ...     len(lines), lines.read(2, 3)
+    (3, ['two', 'three'])
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.users = 0
+        self.retired = False
+        self._file = open(path, "rb")
+        self._map: mmap.mmap | None = None
+        self._offsets = array.array("Q", [0])
+        size = os.fstat(self._file.fileno()).st_size
+        if not size:
+            return
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        end = self._map.find(b"\n")
+        while end != -1:
+            self._offsets.append(end + 1)
+            end = self._map.find(b"\n", end + 1)
+        if self._offsets[-1] != size:
+            self._offsets.append(size)
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def read(self, start: int, end: int) -> list[str]:
+        """Lines start to end inclusive, numbered from one."""
+        if self._map is None or start > end:
+            return []
+        data = self._map[self._offsets[start - 1] : self._offsets[end]]
+        text = data.decode(errors="replace").removesuffix("\n")
+        return [line.removesuffix("\r") for line in text.split("\n")]
+
+    def close(self) -> None:
+        """Release memory map and file handle."""
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+
+@final
+class SpanReader:
+    """Reads exact line ranges of documents under a folder.
+
+    Line indexes are built on first read of a file and kept for a
+    bounded number of files, least recently used dropped first.
+    PDFs are read from their extracted text, cached on disk. Reads
+    may run in several threads at once: an index dropped from the
+    cache is closed only after its last reader is done.
+
+    >>> import tempfile
+    >>> with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as cache:
+    ...     _ = (Path(root) / "a.txt").write_text("one\\ntwo\\nthree\\n")
+    ...     reader = SpanReader(root, Path(cache))
+    ...     print(reader.read(str(Path(root) / "a.txt"), 2, 2).split(root)[1])
+    /a.txt:2:two
+    """
+
+    def __init__(
+        self, root: str, folder: Path | None = None, capacity: int = MAX_OPEN_FILES
+    ) -> None:
+        self._base = os.path.normpath(root)
+        self._root = os.path.realpath(root)
+        self._folder = folder or location("text", root)
+        self._capacity = capacity
+        self._files: OrderedDict[str, tuple[tuple[int, int], LineIndex]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def read(self, path: str, start: int, end: int) -> str:
+        """Lines start to end of file in ugrep row format, or an explanation."""
+        target = self._resolve(path)
+        if target is None:
+            return f"File not found in docs folder: {path}"
+        if start < 1 or end < start:
+            return f"Invalid line range: {start}-{end}"
+        lines = self._acquire(target)
+        try:
+            total = len(lines)
+            content = lines.read(start, min(end, total, start + MAX_SPAN_LINES - 1))
+        finally:
+            self._release(lines)
+        shown = os.path.join(self._base, os.path.relpath(target, self._root))
+        if start > total:
+            return f"{shown} has only {total} lines"
+        last = start + len(content) - 1
+        rows = [f"{shown}:{number}:{text}" for number, text in enumerate(content, start)]
+        if last < min(end, total):
+            rows.append(
+                f"[Span limited to {MAX_SPAN_LINES} lines, continue from line {last + 1}]"
+            )
+        return "\n".join(rows)
+
+    def close(self) -> None:
+        """Release all open line indexes once their readers are done."""
+        with self._lock:
+            for _, lines in self._files.values():
+                self._retire(lines)
+            self._files.clear()
+
+    def _resolve(self, path: str) -> str | None:
+        """Real path of a document inside root, or None."""
+        candidates = [path, os.path.join(self._root, path)]
+        for candidate in candidates:
+            real = os.path.realpath(candidate)
+            inside = os.path.commonpath([real, self._root]) == self._root
+            document = real.lower().endswith(settings.FILE_EXTENSIONS)
+            if inside and document and os.path.isfile(real):
+                return real
+        return None
+
+    def _acquire(self, path: str) -> LineIndex:
+        """Line index of file for one read, rebuilt when file changed.
+
+        The index is built outside the lock, so a slow PDF does not
+        hold up reads of other files; release it with _release.
+        """
+        info = os.stat(path)
+        stamp = (info.st_mtime_ns, info.st_size)
+        with self._lock:
+            cached = self._files.get(path)
+            if cached is not None and cached[0] == stamp:
+                self._files.move_to_end(path)
+                cached[1].users += 1
+                return cached[1]
+        source = Path(path)
+        if source.suffix.lower() == ".pdf":
+            source = self._text(source, stamp)
+        lines = LineIndex(source)
+        with self._lock:
+            lines.users += 1
+            cached = self._files.pop(path, None)
+            if cached is not None:
+                self._retire(cached[1])
+            self._files[path] = (stamp, lines)
+            while len(self._files) > self._capacity:
+                _, (_, oldest) = self._files.popitem(last=False)
+                self._retire(oldest)
+        return lines
+
+    def _release(self, lines: LineIndex) -> None:
+        """End one read, closing the index if it was dropped meanwhile."""
+        with self._lock:
+            lines.users -= 1
+            if lines.retired and not lines.users:
+                lines.close()
+
+    @staticmethod
+    def _retire(lines: LineIndex) -> None:
+        """Drop an index, closing it now or after its last read; lock held."""
+        lines.retired = True
+        if not lines.users:
+            lines.close()
+
+    def _text(self, path: Path, stamp: tuple[int, int]) -> Path:
+        """Cached extracted text of a PDF version."""
+        key = f"{path}:{stamp[0]}:{stamp[1]}".encode()
+        cached = self._folder / f"{hashlib.sha1(key).hexdigest()}.txt"
+        if not cached.exists():
+            self._folder.mkdir(parents=True, exist_ok=True)
+            replace(cached, extract(path).encode("utf-8"))
+        return cached
@@ -0,0 +1,58 @@
+import asyncio
+from typing import final
+
+from search_agent.index import InvertedIndex, stem, tokens
+from search_agent.watcher import CorpusState
+
+MAX_TERMS = 50
+
+
+@final
+class TermStats:
+    """Reports how many files contain each of a batch of terms.
+
+    Single words get their own document frequency and that of all
+    words sharing their stem; phrases get the number of files
+    containing all their words. Regex terms are approximated by
+    their literal words.
+
+    >>> import tempfile
+    >>> from pathlib import Path
+    >>> with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as cache:
+    ...     _ = (Path(root) / "a.txt").write_text("glaciers retreat")
+    ...     stats = TermStats(InvertedIndex(root, Path(cache)))
+    ...     print(asyncio.run(stats.execute(["glacier"])))
+    Document frequency across 1 files:
+    glacier: 0 files, 1 files with any form of 'glacier*'
+    """
+
+    def __init__(self, index: InvertedIndex, state: CorpusState | None = None) -> None:
+        self._index = index
+        self._state = state
+
+    async def execute(self, terms: list[str]) -> str:
+        """Execute statistics lookup for terms, one line per term."""
+        if not terms:
+            return "No terms given"
+        if self._state is None:
+            await asyncio.to_thread(self._index.refresh)
+        else:
+            await asyncio.to_thread(self._index.follow, self._state)
+        lines = [f"Document frequency across {len(self._index)} files:"]
+        for term in terms[:MAX_TERMS]:
+            lines.append(await asyncio.to_thread(self._describe, term))
+        if len(terms) > MAX_TERMS:
+            lines.append(f"[Only the first {MAX_TERMS} terms are reported]")
+        return "\n".join(lines)
+
+    def _describe(self, term: str) -> str:
+        """Frequency line of a single term."""
+        words = tokens(term)
+        if not words:
+            return f"{term}: no words to look up"
+        if len(words) > 1:
+            return f"{term}: {self._index.together(words)} files with all words"
+        word = words[0]
+        exact = self._index.frequency(word)
+        forms = self._index.family(word)
+        return f"{term}: {exact} files, {forms} files with any form of '{stem(word)}*'"
@@ -0,0 +1,49 @@
+import os
+import subprocess
+from pathlib import Path
+
+import settings
+
+
+def extract(path: Path) -> str:
+    """Read document text, converting PDFs with pdftotext.
+
+    Returns empty string when the file cannot be read.
+
+    >>> import tempfile
+    >>> with tempfile.NamedTemporaryFile("w", suffix=".txt") as tmp:
+    ...     _ = tmp.write("hello")
+    ...     tmp.flush()
+    ...     extract(Path(tmp.name))
+    'hello'
+    """
+    if path.suffix.lower() == ".pdf":
+        try:
+            proc = subprocess.run(
+                ["pdftotext", str(path), "-"],
+                capture_output=True,
+                check=False,
+            )
+        except OSError:
+            return ""
+        return proc.stdout.decode(errors="replace")
+    try:
+        return path.read_text(encoding="utf-8", errors="replace")
+    except OSError:
+        return ""
+
+
+def scan(root: str) -> dict[str, tuple[int, int]]:
+    """Map searchable files under root to (mtime_ns, size)."""
+    found = {}
+    for parent, _, names in os.walk(os.path.normpath(root)):
+        for name in names:
+            if not name.lower().endswith(settings.FILE_EXTENSIONS):
+                continue
+            path = os.path.join(parent, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            found[path] = (stat.st_mtime_ns, stat.st_size)
+    return found
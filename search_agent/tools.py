@@ -20,6 +20,144 @@ TOOLS = [
             },
         },
     },
+    {
+        "type": "function",
+        "function": {
+            "name": "next_page",
+            "description": "Fetch the next page of a truncated search result. Use the cursor from the '[Output truncated ...]' note at the end of a search result. Does not re-run the search.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "cursor": {
+                        "type": "string",
+                        "description": "Cursor from the truncation note of the previous page",
+                    },
+                },
+                "required": ["cursor"],
+            },
+        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "term_stats",
+            "description": "Look up in how many files each candidate term occurs, from a precomputed word index, without searching. Reports exact word counts, counts for all forms sharing the word stem, and for phrases the number of files containing all words. Use it to choose selective patterns before searching.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "terms": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Candidate words or phrases to look up, all in one call",
+                    },
+                },
+                "required": ["terms"],
+            },
+        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "read_span",
+            "description": "Read exact lines of a file by line number, without searching. Use it after a search hit to read more of the same passage, e.g. lines before and after a match. Returns at most 200 lines per call.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "path": {
+                        "type": "string",
+                        "description": "File path as shown in search results",
+                    },
+                    "start_line": {
+                        "type": "integer",
+                        "description": "First line to read, numbered from 1",
+                    },
+                    "end_line": {
+                        "type": "integer",
+                        "description": "Last line to read, inclusive",
+                    },
+                },
+                "required": ["path", "start_line", "end_line"],
+            },
+        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "boolean_search",
+            "description": "Find files where several terms occur together, in one call. A file matches if it contains ALL terms in 'all', at least one term in 'any' (if given) and none of the terms in 'none'. With 'within', the 'all' and 'any' terms must occur within that many lines of each other. Returns the matching lines per file.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "all": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Regex terms that must all occur (AND)",
+                    },
+                    "any": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Optional: regex terms of which at least one must occur (OR)",
+                    },
+                    "none": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Optional: regex terms that must not occur anywhere in the file (NOT)",
+                    },
+                    "within": {
+                        "type": "integer",
+                        "description": "Optional: maximum distance in lines between the 'all' and 'any' terms (NEAR)",
+                    },
+                    "path": {
+                        "type": "string",
+                        "description": "Optional: specific file or folder to search. If not provided, searches the entire docs folder.",
+                    },
+                },
+                "required": ["all"],
+            },
+        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "ranked_search",
+            "description": "Rank files by relevance (BM25) to a free-text query using a prebuilt word index. Returns the top files, best first, each with its most relevant snippet. Use it to find the most promising files quickly, then search or read them in detail.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "query": {
+                        "type": "string",
+                        "description": "Free-text query: keywords, not a regex",
+                    },
+                    "path": {
+                        "type": "string",
+                        "description": "Optional: restrict ranking to this file or folder. If not provided, ranks the entire docs folder.",
+                    },
+                },
+                "required": ["query"],
+            },
+        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "count",
+            "description": "Count matching lines per file without returning any content. Returns files ranked by number of matches. Much cheaper than search: use it first to find which files match a pattern and how often, then run search with path=... on the most promising files.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "pattern": {
+                        "type": "string",
+                        "description": "Regex pattern to count",
+                    },
+                    "path": {
+                        "type": "string",
+                        "description": "Optional: specific file or folder to count in. If not provided, counts across the entire docs folder.",
+                    },
+                },
+                "required": ["pattern"],
+            },
+        },
+    },
     {
         "type": "function",
         "function": {
@@ -1,10 +1,77 @@
 import asyncio
+import re
+import signal
+import warnings
 from abc import ABC, abstractmethod
 from typing import final
 
 import settings
+from search_agent.parser import Row, blocks, row
 
 MAX_OUTPUT_CHARS = 30000
+MAX_RESULT_CHARS = 2_000_000
+MAX_COUNT_FILES = 50
+SEARCH_TIMEOUT_SECONDS = 30.0
+SEARCH_CPU_SECONDS = 20
+CONTEXT_LINES = 3
+WORD_BOUNDARY = re.compile(r"(?<!\\)(?:\\\\)*\\[<>]")
+READ_CHUNK_BYTES = 65536
+STOPPED = (
+    "[Search stopped at time limit, results are incomplete."
+    " Use a more specific pattern or path.]"
+)
+
+
+async def run(
+    cmd: list[str],
+    limit: int,
+    timeout: float = SEARCH_TIMEOUT_SECONDS,
+    cpu: int = SEARCH_CPU_SECONDS,
+) -> tuple[str, bool]:
+    """Run search command under CPU and wall-clock limits.
+
+    Reads at most limit bytes of output, then kills the process.
+    Returns decoded output and whether the process was stopped by
+    a time limit.
+
+    >>> import asyncio
+    >>> asyncio.run(run(["echo", "hello"], 100))
+    ('hello\\n', False)
+    >>> asyncio.run(run(["sleep", "5"], 100, timeout=0.1))
+    ('', True)
+    """
+    proc = await asyncio.create_subprocess_exec(
+        "sh",
+        "-c",
+        'ulimit -t "$0" && exec "$@"',
+        str(cpu),
+        *cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL,
+    )
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    chunks: list[bytes] = []
+    size = 0
+    stopped = False
+    try:
+        while size < limit:
+            chunk = await asyncio.wait_for(
+                proc.stdout.read(READ_CHUNK_BYTES), deadline - loop.time()
+            )
+            if not chunk:
+                break
+            chunks.append(chunk)
+            size += len(chunk)
+    except TimeoutError:
+        stopped = True
+    killed = proc.returncode is None and (stopped or size >= limit)
+    if killed:
+        proc.kill()
+    await proc.wait()
+    if not killed and proc.returncode in (-signal.SIGXCPU, -signal.SIGKILL):
+        stopped = True
+    return b"".join(chunks)[:limit].decode(errors="replace"), stopped
 
 
 class Search(ABC):
@@ -14,6 +81,10 @@ class Search(ABC):
     async def execute(self, pattern: str, path: str | None) -> str:
         """Execute search and return raw output."""
 
+    async def batch(self, patterns: list[str], path: str | None) -> list[str]:
+        """Execute several searches over one path, output per pattern."""
+        return [await self.execute(pattern, path) for pattern in patterns]
+
 
 @final
 class UgrepSearch(Search):
@@ -28,18 +99,223 @@ class UgrepSearch(Search):
     True
     """
 
-    def __init__(self) -> None:
-        self._folder = settings.DOCS_FOLDER
+    def __init__(self, limit: int = MAX_OUTPUT_CHARS, folder: str | None = None) -> None:
+        self._folder = folder or settings.DOCS_FOLDER
+        self._limit = limit
 
     async def execute(self, pattern: str, path: str | None) -> str:
         """Execute ugrep search and return truncated output."""
         target = path if path else self._folder
         cmd = ["ug", "--config=.ugrep", "-r", pattern, target]
-        proc = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.DEVNULL,
-        )
-        stdout, _ = await proc.communicate()
-        result = stdout.decode() if stdout else "No matches found"
-        return result[:MAX_OUTPUT_CHARS]
+        result, stopped = await run(cmd, self._limit)
+        result = result[: self._limit] if result else "No matches found"
+        return f"{result}\n{STOPPED}" if stopped else result
+
+    async def batch(self, patterns: list[str], path: str | None) -> list[str]:
+        """Search all patterns in one ugrep pass, then split output per pattern.
+
+        Only patterns that Python reads the same way as ugrep share the
+        pass; the others are searched separately. When a match line
+        belongs to none of the shared patterns, the split cannot be
+        trusted and every pattern is searched separately instead.
+        """
+        compiled: dict[int, re.Pattern] = {}
+        for idx, pattern in enumerate(patterns):
+            found = portable(pattern)
+            if found is not None:
+                compiled[idx] = found
+        if len(compiled) < 2:
+            return await super().batch(patterns, path)
+        target = path if path else self._folder
+        cmd = ["ug", "--config=.ugrep", "-r"]
+        for idx in compiled:
+            cmd += ["-e", patterns[idx]]
+        cmd.append(target)
+        combined, stopped = await run(cmd, self._limit * len(compiled))
+        parts = Demux(list(compiled.values())).split(combined)
+        if parts is None:
+            return await super().batch(patterns, path)
+        split = dict(zip(compiled, parts))
+        results = []
+        for idx, pattern in enumerate(patterns):
+            if idx not in compiled:
+                results.append(await self.execute(pattern, path))
+            elif split[idx]:
+                results.append(split[idx][: self._limit])
+            else:
+                results.append("No matches found")
+        if stopped:
+            return [f"{result}\n{STOPPED}" for result in results]
+        return results
+
+
+def portable(pattern: str) -> re.Pattern | None:
+    """Compile pattern case-insensitively if Python reads it like ugrep.
+
+    Returns None for patterns Python rejects or only accepts with a
+    warning, such as POSIX classes, and for word boundaries \\< and
+    \\>, which Python reads as plain angle brackets.
+
+    >>> portable("teach(er|ing)").pattern
+    'teach(er|ing)'
+    >>> portable("[[:alpha:]]+") is None, portable("\\\\<word") is None
+    (True, True)
+    >>> portable("a\\\\\\\\<b").pattern
+    'a\\\\\\\\<b'
+    """
+    if WORD_BOUNDARY.search(pattern):
+        return None
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        try:
+            return re.compile(pattern, re.IGNORECASE)
+        except (re.error, Warning):
+            return None
+
+
+@final
+class Demux:
+    """Splits output of a multi-pattern ugrep pass back per pattern.
+
+    Each pattern gets its own match lines and the context lines within
+    CONTEXT_LINES of them; match lines of other patterns nearby become
+    context. Split returns None when a match line belongs to no pattern,
+    so the caller can search separately rather than guess.
+
+    >>> demux = Demux([re.compile("cat"), re.compile("dog")])
+    >>> demux.split("docs/a.txt:1:cat\\n--\\ndocs/b.txt:4:dog\\n")
+    ['docs/a.txt:1:cat\\n', 'docs/b.txt:4:dog\\n']
+    >>> demux.split("docs/a.txt:1:cat\\ndocs/a.txt-2-x\\ndocs/a.txt:3:dog\\n")[1]
+    'docs/a.txt-1-cat\\ndocs/a.txt-2-x\\ndocs/a.txt:3:dog\\n'
+    >>> demux.split("docs/a.txt:1:bird\\n") is None
+    True
+    """
+
+    def __init__(self, patterns: list[re.Pattern], context: int = CONTEXT_LINES) -> None:
+        self._patterns = patterns
+        self._context = context
+
+    def split(self, output: str) -> list[str] | None:
+        """Return output of each pattern in pattern order, None if unattributable."""
+        grouped: list[list[list[str]]] = [[] for _ in self._patterns]
+        for lines in blocks(output):
+            rows = [(line, parsed) for line in lines if (parsed := row(line)) is not None]
+            if not rows:
+                continue
+            owners: dict[int, set[int]] = {}
+            for position, (_, parsed) in enumerate(rows):
+                if not parsed.match:
+                    continue
+                found = [
+                    idx
+                    for idx, pattern in enumerate(self._patterns)
+                    if pattern.search(parsed.content)
+                ]
+                if not found:
+                    return None
+                for idx in found:
+                    owners.setdefault(idx, set()).add(position)
+            for idx, own in owners.items():
+                grouped[idx].extend(self._trim(rows, own))
+        return [
+            "\n--\n".join("\n".join(lines) for lines in group) + "\n" if group else ""
+            for group in grouped
+        ]
+
+    def _trim(self, rows: list[tuple[str, Row]], own: set[int]) -> list[list[str]]:
+        """Blocks of one pattern: its match rows and their context."""
+        if any(parsed.number is None for _, parsed in rows):
+            return [[line for line, _ in rows]]
+        near = [
+            min(abs(parsed.number - rows[position][1].number) for position in own)
+            for _, parsed in rows
+        ]
+        result: list[list[str]] = []
+        current: list[str] = []
+        previous: int | None = None
+        for position, (line, parsed) in enumerate(rows):
+            if near[position] > self._context:
+                continue
+            if previous is not None and parsed.number != previous + 1 and current:
+                result.append(current)
+                current = []
+            if parsed.match and position not in own:
+                line = context(line, parsed)
+            current.append(line)
+            previous = parsed.number
+        if current:
+            result.append(current)
+        return result
+
+
+def context(line: str, parsed: Row) -> str:
+    """Turn a numbered match row into a context row.
+
+    >>> context("docs/a.txt:7:dog", row("docs/a.txt:7:dog"))
+    'docs/a.txt-7-dog'
+    """
+    prefix = f"{parsed.path}:{parsed.number}:"
+    start = line.find(prefix)
+    if start < 0:
+        return line
+    return f"{line[:start]}{parsed.path}-{parsed.number}-{line[start + len(prefix) :]}"
+
+
+@final
+class Tally:
+    """Per-file match counts parsed from ugrep --count output.
+
+    Ranks files by number of matching lines, most matches first.
+
+    >>> tally = Tally("docs/a.txt:2\\ndocs/b.txt:7\\ndocs/c.txt:0\\n")
+    >>> print(tally.summary(10))
+    9 matching lines in 2 files:
+    7 docs/b.txt
+    2 docs/a.txt
+    """
+
+    def __init__(self, output: str) -> None:
+        self._counts: dict[str, int] = {}
+        for line in output.splitlines():
+            path, sep, count = line.rpartition(":")
+            if sep and count.strip().isdigit() and int(count) > 0:
+                self._counts[path] = self._counts.get(path, 0) + int(count)
+
+    def summary(self, limit: int) -> str:
+        """Render ranked list of at most limit files with their counts."""
+        if not self._counts:
+            return "No matches found"
+        ranked = sorted(self._counts.items(), key=lambda item: (-item[1], item[0]))
+        total = sum(self._counts.values())
+        header = f"{total} matching lines in {len(ranked)} files"
+        if len(ranked) > limit:
+            header += f" (top {limit} shown)"
+        lines = [f"{count} {path}" for path, count in ranked[:limit]]
+        return header + ":\n" + "\n".join(lines)
+
+
+@final
+class UgrepCount(Search):
+    """Counts matching lines per file with ugrep, without context.
+
+    Cheap first-stage search: returns a ranked file list in a few
+    hundred tokens instead of full context blocks.
+
+    >>> import asyncio
+    >>> count = UgrepCount()
+    >>> result = asyncio.run(count.execute("test", "docs/"))
+    >>> isinstance(result, str)
+    True
+    """
+
+    def __init__(self, limit: int = MAX_COUNT_FILES, folder: str | None = None) -> None:
+        self._folder = folder or settings.DOCS_FOLDER
+        self._limit = limit
+
+    async def execute(self, pattern: str, path: str | None) -> str:
+        """Execute ugrep count and return ranked summary."""
+        target = path if path else self._folder
+        cmd = ["ug", "--config=.ugrep", "-r", "--count", "-m1,", pattern, target]
+        output, stopped = await run(cmd, MAX_RESULT_CHARS)
+        summary = Tally(output).summary(self._limit)
+        return f"{summary}\n{STOPPED}" if stopped else summary
@@ -0,0 +1,235 @@
+import ctypes
+import logging
+import os
+import stat
+import struct
+import threading
+from collections import deque
+from typing import NamedTuple, final
+
+import settings
+from search_agent.text import scan
+
+logger = logging.getLogger(__name__)
+
+MAX_CHANGES = 10000
+READ_BYTES = 65536
+EVENT = struct.Struct("iIII")
+
+IN_MODIFY = 0x2
+IN_ATTRIB = 0x4
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_FROM = 0x40
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_DELETE_SELF = 0x400
+IN_MOVE_SELF = 0x800
+IN_Q_OVERFLOW = 0x4000
+IN_IGNORED = 0x8000
+IN_ISDIR = 0x40000000
+WATCH_MASK = (
+    IN_MODIFY
+    | IN_ATTRIB
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+)
+
+
+class Change(NamedTuple):
+    """File change published at a corpus version."""
+
+    version: int
+    path: str
+    kind: str
+
+
+class Events(NamedTuple):
+    """Paths touched since last read, added and removed folders, queue overflow."""
+
+    paths: set[str]
+    added: set[str]
+    removed: set[str]
+    overflow: bool
+
+
+@final
+class Inotify:
+    """Linux inotify watches over directories, read without blocking.
+
+    Raises OSError or AttributeError when inotify is unavailable.
+    """
+
+    def __init__(self) -> None:
+        self._libc = ctypes.CDLL(None, use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._folders: dict[int, str] = {}
+
+    def watch(self, folder: str) -> None:
+        """Watch folder and all folders below it."""
+        for parent, _, _ in os.walk(folder):
+            handle = self._libc.inotify_add_watch(
+                self._fd, os.fsencode(parent), WATCH_MASK
+            )
+            if handle < 0:
+                raise OSError(ctypes.get_errno(), f"cannot watch {parent}")
+            self._folders[handle] = parent
+
+    def read(self) -> Events:
+        """Drain pending events."""
+        data = b""
+        while True:
+            try:
+                chunk = os.read(self._fd, READ_BYTES)
+            except BlockingIOError:
+                break
+            if not chunk:
+                break
+            data += chunk
+        events = Events(set(), set(), set(), False)
+        offset = 0
+        while offset < len(data):
+            handle, mask, _, length = EVENT.unpack_from(data, offset)
+            start = offset + EVENT.size
+            name = os.fsdecode(data[start : start + length].rstrip(b"\0"))
+            offset = start + length
+            if mask & IN_Q_OVERFLOW:
+                return Events(set(), set(), set(), True)
+            parent = self._folders.get(handle)
+            if mask & IN_IGNORED:
+                self._folders.pop(handle, None)
+            if parent is None:
+                continue
+            path = os.path.join(parent, name) if name else parent
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                events.added.add(path)
+            elif mask & IN_ISDIR and mask & (IN_DELETE | IN_MOVED_FROM):
+                events.removed.add(path)
+            elif mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                events.removed.add(path)
+            else:
+                events.paths.add(path)
+        return events
+
+    def close(self) -> None:
+        """Release inotify descriptor and its watches."""
+        os.close(self._fd)
+
+
+@final
+class CorpusState:
+    """Tracks files of a folder and publishes a corpus version with change events.
+
+    Uses inotify where available and a stat scan of the folder
+    otherwise. Every added, modified or deleted file bumps the
+    version by one; downstream caches ask for changes since the
+    version they last saw and rebuild fully only when that history
+    is no longer kept.
+
+    >>> import tempfile
+    >>> from pathlib import Path
+    >>> with tempfile.TemporaryDirectory() as root:
+    ...     state = CorpusState(root)
+    ...     _ = (Path(root) / "a.txt").write_text("new")
+    ...     version = state.poll()
+    ...     [change.kind for change in state.changes(0)], version
+    (['added'], 1)
+    """
+
+    def __init__(self, root: str, history: int = MAX_CHANGES) -> None:
+        self._root = os.path.normpath(root)
+        self._lock = threading.Lock()
+        self._log: deque[Change] = deque(maxlen=history)
+        self._floor = 0
+        self.version = 0
+        self._notify: Inotify | None = None
+        try:
+            self._notify = Inotify()
+            self._notify.watch(self._root)
+        except (OSError, AttributeError) as exc:
+            logger.info(f"inotify unavailable, scanning for changes: {exc}")
+            if self._notify is not None:
+                self._notify.close()
+            self._notify = None
+        self._files = scan(self._root)
+
+    def poll(self) -> int:
+        """Pick up changes on disk and return current version."""
+        with self._lock:
+            if self._notify is None:
+                self._reconcile(set(self._files), scan(self._root))
+                return self.version
+            events = self._notify.read()
+            if events.overflow:
+                self._reconcile(set(self._files), scan(self._root))
+                return self.version
+            touched = set(events.paths)
+            for folder in events.removed:
+                prefix = folder + os.sep
+                touched.update(known for known in self._files if known.startswith(prefix))
+            for folder in events.added:
+                try:
+                    self._notify.watch(folder)
+                except OSError as exc:
+                    logger.warning(f"Cannot watch {folder}: {exc}")
+                touched.update(scan(folder))
+            self._reconcile(touched, scan_paths(touched))
+            return self.version
+
+    def changes(self, since: int) -> list[Change] | None:
+        """Changes after version since, or None if they are no longer kept."""
+        with self._lock:
+            if since < self._floor:
+                return None
+            return [change for change in self._log if change.version > since]
+
+    def files(self) -> dict[str, tuple[int, int]]:
+        """Current files mapped to (mtime_ns, size)."""
+        with self._lock:
+            return dict(self._files)
+
+    def close(self) -> None:
+        """Stop watching the folder."""
+        if self._notify is not None:
+            self._notify.close()
+            self._notify = None
+
+    def _reconcile(self, paths: set[str], current: dict[str, tuple[int, int]]) -> None:
+        """Compare known state of paths with current stats and publish changes."""
+        for path in sorted(paths | set(current)):
+            before = self._files.get(path)
+            after = current.get(path)
+            if before == after:
+                continue
+            if after is None:
+                del self._files[path]
+                kind = "deleted"
+            else:
+                self._files[path] = after
+                kind = "added" if before is None else "modified"
+            self.version += 1
+            if len(self._log) == self._log.maxlen:
+                self._floor = self._log[0].version
+            self._log.append(Change(self.version, path, kind))
+
+
+def scan_paths(paths: set[str]) -> dict[str, tuple[int, int]]:
+    """Stat searchable files among paths, skipping missing ones."""
+    found = {}
+    for path in paths:
+        if not path.lower().endswith(settings.FILE_EXTENSIONS):
+            continue
+        try:
+            info = os.stat(path)
+        except OSError:
+            continue
+        if stat.S_ISREG(info.st_mode):
+            found[path] = (info.st_mtime_ns, info.st_size)
+    return found
@@ -9,15 +9,20 @@ load_dotenv()
 
 # agent setup
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
+LLM_BASE_URL = os.getenv("LLM_BASE_URL", "https://openrouter.ai/api/v1")
 DOCS_FOLDER = "docs/"
 FILE_EXTENSIONS = (".pdf", ".txt", ".md")
 MODEL = "x-ai/grok-4.1-fast"
 INPUT_PRICE = 0.2
 OUTPUT_PRICE = 0.5
+CACHE_DIR = Path("cache")
+PACKED_CORPUS = False
+SHARDS: list[str] = []  # shard server addresses, host:port or unix:/path
 
 # logging setup
 LOGS_DIR = Path("logs")
 LOG_FILE = LOGS_DIR / "bot.log"
+PROFILES_DIR = LOGS_DIR / "profiles"
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 LOG_LEVEL = logging.INFO
 LOG_MAX_BYTES = 10 * 1024 * 1024  # 10MB
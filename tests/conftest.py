@@ -3,6 +3,7 @@ from pathlib import Path
 
 import pytest
 
+import settings
 from search_agent.ugrep import UgrepSearch
 
 FIXTURES_DIR = Path(__file__).parent / "fixtures"
@@ -33,3 +34,11 @@ def sample_txt_path() -> str:
 def search() -> UgrepSearch:
     """UgrepSearch instance for integration tests."""
     return UgrepSearch()
+
+
+@pytest.fixture
+def cache_dir(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Path:
+    """Temporary settings.CACHE_DIR, so derived data stays out of the repo."""
+    folder = tmp_path / "cache"
+    monkeypatch.setattr(settings, "CACHE_DIR", folder)
+    return folder
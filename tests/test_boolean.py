@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+from search_agent.boolean import BooleanSearch, Query
+
+OUTPUT = """docs/both.txt:2:isostatic adjustment
+docs/both.txt:30:post-glacial rebound
+docs/near.txt:7:isostatic
+docs/near.txt:8:rebound of crust
+docs/one.txt:4:isostatic only
+docs/excluded.txt:1:isostatic rebound
+docs/excluded.txt:9:ice sheet
+"""
+
+
+class TestQuery:
+    """Tests for Query that evaluates boolean term conditions per file."""
+
+    def test_requires_all_terms_in_file(self) -> None:
+        result = Query(["isostatic", "rebound"]).select(OUTPUT)
+        assert "both.txt" in result, "expected file with both terms"
+        assert "one.txt" not in result, "expected file with one term dropped"
+
+    def test_accepts_any_optional_term(self) -> None:
+        result = Query([], optional=["adjustment", "crust"]).select(OUTPUT)
+        assert "both.txt" in result and "near.txt" in result, "expected OR matches"
+        assert "one.txt" not in result, "expected file without optional terms dropped"
+
+    def test_excludes_files_with_forbidden_term(self) -> None:
+        result = Query(["isostatic"], excluded=["ice"]).select(OUTPUT)
+        assert "excluded.txt" not in result, "expected NOT term to drop file"
+        assert "one.txt" in result, "expected other files kept"
+
+    def test_restricts_terms_to_line_window(self) -> None:
+        result = Query(["isostatic", "rebound"], within=3).select(OUTPUT)
+        assert "near.txt" in result, "expected close terms matched"
+        assert "both.txt" not in result, "expected distant terms rejected"
+
+    def test_returns_only_window_lines(self) -> None:
+        output = "docs/a.txt:1:alpha\ndocs/a.txt:50:alpha\ndocs/a.txt:51:beta\n"
+        result = Query(["alpha", "beta"], within=2).select(output)
+        assert result == "docs/a.txt:50:alpha\ndocs/a.txt:51:beta", (
+            "expected minimal window lines"
+        )
+
+    def test_reports_no_matches(self) -> None:
+        result = Query(["nonexistent"]).select(OUTPUT)
+        assert result == "No matches found", "expected no matches message"
+
+    def test_ignores_context_lines(self) -> None:
+        output = "docs/a.txt-1-alpha\ndocs/a.txt:2:beta\n"
+        result = Query(["alpha", "beta"]).select(output)
+        assert result == "No matches found", "expected context lines ignored"
+
+    def test_lists_distinct_terms(self) -> None:
+        query = Query(["a", "b"], optional=["b", "c"], excluded=["d"])
+        assert query.terms() == ["a", "b", "c", "d"], "expected distinct ordered terms"
+
+    def test_treats_invalid_regex_as_literal(self) -> None:
+        output = "docs/a.txt:1:value (unclosed\n"
+        result = Query(["(unclosed"]).select(output)
+        assert "a.txt" in result, "expected literal match for invalid regex"
+
+    def test_escapes_invalid_regex_for_search(self) -> None:
+        query = Query(["(unclosed", "valid.*"])
+        assert query.patterns() == [r"\(unclosed", "valid.*"], (
+            "expected ugrep given the same literal fallback"
+        )
+
+    def test_flags_ugrep_only_terms(self) -> None:
+        query = Query([r"\<rebound\>", "crust"], excluded=["[[:digit:]]+ km"])
+        assert query.unsupported() == [r"\<rebound\>", "[[:digit:]]+ km"], (
+            "expected word boundaries and POSIX classes flagged"
+        )
+
+
+class TestBooleanSearchMessages:
+    """Tests for BooleanSearch tool messages that need no ugrep."""
+
+    def test_asks_for_portable_terms(self) -> None:
+        result = asyncio.run(BooleanSearch().execute(Query([r"\<rebound\>", "crust"]), None))
+        assert result.startswith("Terms not supported") and r"\<rebound\>" in result, (
+            "expected tool message naming the unsupported term"
+        )
+
+
+@pytest.mark.integration
+class TestBooleanSearch:
+    """Integration tests for BooleanSearch requiring ugrep."""
+
+    def test_finds_terms_near_each_other(self, sample_txt_path: str) -> None:
+        query = Query(["technology", "trends"], within=1)
+        result = asyncio.run(BooleanSearch().execute(query, sample_txt_path))
+        assert "sample.txt" in result, "expected file with both terms"
@@ -0,0 +1,57 @@
+import io
+import json
+import secrets
+import tempfile
+from pathlib import Path
+
+from benchmark.checkpoint import Checkpoint, dump, select
+
+
+class TestCheckpoint:
+    """Tests for Checkpoint that keeps finished query records on disk."""
+
+    def test_keeps_latest_record_per_query(self) -> None:
+        with tempfile.TemporaryDirectory() as folder:
+            checkpoint = Checkpoint(Path(folder) / "run.jsonl")
+            identifier = secrets.token_hex(4)
+            checkpoint.append({"split": "a", "query_id": identifier, "error": "timeout"})
+            checkpoint.append({"split": "b", "query_id": identifier, "error": None})
+            assert checkpoint.completed() == {("b", identifier)}, "expected failed query pending"
+            checkpoint.append({"split": "a", "query_id": identifier, "error": None})
+            records = list(checkpoint.records())
+            assert len(records) == 2, "expected one record per split and query"
+            assert [r["split"] for r in select(records, "a")] == ["a"], "expected split filter"
+            assert all(r["error"] is None for r in records), "expected retried record kept"
+
+    def test_skips_torn_last_line(self) -> None:
+        with tempfile.TemporaryDirectory() as folder:
+            path = Path(folder) / "run.jsonl"
+            checkpoint = Checkpoint(path)
+            checkpoint.append({"split": "a", "query_id": "1", "error": None})
+            with open(path, "a") as file:
+                file.write('{"split": "a", "query_')
+            assert checkpoint.completed() == {("a", "1")}, "expected whole records only"
+            resumed = Checkpoint(path)
+            resumed.append({"split": "a", "query_id": "2", "error": None})
+            assert resumed.completed() == {("a", "1"), ("a", "2")}, (
+                "expected record after torn line readable"
+            )
+
+    def test_reset_empties_file(self) -> None:
+        with tempfile.TemporaryDirectory() as folder:
+            checkpoint = Checkpoint(Path(folder) / "nested" / "run.jsonl")
+            checkpoint.append({"split": "a", "query_id": "1", "error": None})
+            checkpoint.reset()
+            assert list(checkpoint.records()) == [], "expected no records after reset"
+
+
+class TestDump:
+    """Tests for dump that streams JSON with lazy parts."""
+
+    def test_writes_valid_json(self) -> None:
+        value = secrets.token_hex(4)
+        data = {"a": iter([{"b": [1, value]}, {}]), "c": [], "d": "ü"}
+        out = io.StringIO()
+        dump(data, out)
+        expected = {"a": [{"b": [1, value]}, {}], "c": [], "d": "ü"}
+        assert json.loads(out.getvalue()) == expected, "expected same data back"
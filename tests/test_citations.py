@@ -0,0 +1,100 @@
+import secrets
+
+from search_agent.citations import CitationStore, Span
+from search_agent.parser import UgrepParser
+
+
+class TestCitationStore:
+    """Tests for CitationStore that merges citation spans per file."""
+
+    def test_merges_overlapping_spans_of_same_file(self) -> None:
+        store = CitationStore()
+        store.add([Span("a.txt", 10, 12, ["x", "y", "z"])])
+        store.add([Span("a.txt", 12, 13, ["z", "w"])])
+        citations = store.top(10)
+        assert len(citations) == 1, "expected overlapping spans merged"
+        assert citations[0].text == "x y z w", "expected merged text without repeats"
+
+    def test_merges_adjacent_spans(self) -> None:
+        store = CitationStore()
+        store.add([Span("a.txt", 1, 2, ["one", "two"])])
+        store.add([Span("a.txt", 3, 3, ["three"])])
+        assert len(store) == 1, "expected adjacent spans merged"
+
+    def test_keeps_separate_spans_with_gap(self) -> None:
+        store = CitationStore()
+        store.add([Span("a.txt", 1, 2, ["one", "two"])])
+        store.add([Span("a.txt", 10, 11, ["ten", "eleven"])])
+        assert len(store) == 2, "expected distant spans kept apart"
+
+    def test_keeps_spans_of_different_files_apart(self) -> None:
+        store = CitationStore()
+        store.add([Span("a.txt", 1, 2, ["one", "two"])])
+        store.add([Span("b.txt", 1, 2, ["one", "two"])])
+        assert len(store) == 2, "expected spans of different files kept apart"
+
+    def test_keeps_same_named_files_in_different_folders_apart(self) -> None:
+        output = "docs/a/intro.txt:1:Alpha\n--\ndocs/b/intro.txt:2:Beta\n"
+        store = CitationStore()
+        store.add(UgrepParser().spans(output))
+        citations = store.top(10)
+        assert [c.text for c in citations] == ["Alpha", "Beta"], (
+            "expected overlapping spans of same-named files kept apart"
+        )
+        assert {c.location for c in citations} == {"intro.txt"}, (
+            "expected citations named by file name only"
+        )
+
+    def test_ranks_spans_by_hit_count(self) -> None:
+        store = CitationStore()
+        store.add([Span("first.txt", 1, 1, ["rare"])])
+        store.add([Span("second.txt", 5, 5, ["popular"])])
+        store.add([Span("second.txt", 5, 5, ["popular"])])
+        assert store.top(1)[0].location == "second.txt", "expected most hit span first"
+
+    def test_orders_equal_hits_by_arrival(self) -> None:
+        store = CitationStore()
+        names = [f"{secrets.token_hex(4)}.txt" for _ in range(5)]
+        store.add([Span(name, 1, 1, ["text"]) for name in names])
+        assert [c.location for c in store.top(5)] == names, "expected arrival order"
+
+    def test_evicts_low_value_spans_over_capacity(self) -> None:
+        store = CitationStore(capacity=2)
+        store.add([Span("kept.txt", 1, 1, ["a"])])
+        store.add([Span("kept.txt", 1, 1, ["a"])])
+        store.add([Span("old.txt", 1, 1, ["b"])])
+        store.add([Span("new.txt", 1, 1, ["c"])])
+        locations = [c.location for c in store.top(10)]
+        assert len(store) == 2, "expected store bounded by capacity"
+        assert locations == ["kept.txt", "new.txt"], "expected oldest single hit evicted"
+
+    def test_admits_late_spans_when_full(self) -> None:
+        store = CitationStore(capacity=3)
+        names = [f"{secrets.token_hex(4)}.txt" for _ in range(10)]
+        for name in names:
+            store.add([Span(name, 1, 1, ["text"])])
+        locations = [c.location for c in store.top(10)]
+        assert locations == names[-3:], "expected latest single hits kept"
+
+    def test_keeps_hit_spans_through_many_evictions(self) -> None:
+        store = CitationStore(capacity=5)
+        store.add([Span("kept.txt", 1, 1, ["a"])])
+        for idx in range(200):
+            store.add([Span("kept.txt", 1, 1, ["a"])])
+            store.add([Span(f"{idx}.txt", 1, 1, ["b"])])
+        assert len(store) == 5, "expected store bounded by capacity"
+        assert store.top(1)[0].location == "kept.txt", "expected repeated span kept"
+
+    def test_counts_repeated_unnumbered_spans(self) -> None:
+        store = CitationStore()
+        store.add([Span("a.txt", None, None, ["same"])])
+        store.add([Span("a.txt", None, None, ["same"])])
+        assert len(store) == 1, "expected identical unnumbered spans deduplicated"
+
+    def test_accepts_spans_from_parser(self) -> None:
+        output = "docs/a.txt:4:Alpha\ndocs/a.txt-5-Beta\n--\ndocs/a.txt:5:Beta\n"
+        store = CitationStore()
+        store.add(UgrepParser().spans(output))
+        citations = store.top(10)
+        assert len(citations) == 1, "expected parser spans merged"
+        assert citations[0].text == "Alpha Beta", "expected merged parser text"
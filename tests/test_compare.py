@@ -0,0 +1,98 @@
+"""Tests for benchmark result comparison."""
+
+import json
+import secrets
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+try:
+    import numpy as np
+
+    from benchmark.compare import bootstrap, compare, load
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+pytestmark = pytest.mark.skipif(
+    not NUMPY_AVAILABLE,
+    reason="Benchmark dependencies not installed",
+)
+
+
+def result(folder: str, name: str, recalls: list[float], latency: float) -> str:
+    """Write a single split result file and return its path."""
+    path = Path(folder) / name
+    queries = [
+        {"query_id": str(idx), "recall_at_k": recall, "latency_seconds": latency, "cost": 0.01}
+        for idx, recall in enumerate(recalls)
+    ]
+    path.write_text(json.dumps({"split": "biology", "queries": queries}))
+    return str(path)
+
+
+class TestCompare:
+    """Tests for compare that gates candidate runs against a baseline."""
+
+    def test_pairs_queries_by_key(self) -> None:
+        with tempfile.TemporaryDirectory() as folder:
+            path = Path(folder) / "all.json"
+            path.write_text(
+                json.dumps(
+                    {
+                        "splits": {
+                            "a": {"queries": [{"query_id": "1", "recall_at_k": 1.0}]},
+                            "b": {"queries": [{"query_id": "1", "recall_at_k": 0.0}]},
+                        }
+                    }
+                )
+            )
+            combined = load(str(path))
+            single = load(result(folder, "one.json", [0.5], 1.0))
+            assert combined.keys == [("a", "1"), ("b", "1")], "expected split and query keys"
+            assert compare(single, combined).paired == 0, "expected no shared split"
+
+    def test_flags_significant_recall_drop(self) -> None:
+        with tempfile.TemporaryDirectory() as folder:
+            size = 200 + secrets.randbelow(50)
+            before = load(result(folder, "before.json", [1.0] * size, 1.0))
+            after = load(result(folder, "after.json", [0.5] * size, 1.5))
+            comparison = compare(before, after, max_recall_drop=0.1, max_latency_increase=0.2)
+            assert len(comparison.breaches) == 2, "expected recall and latency breaches"
+            assert len(comparison.regressions) == size, "expected every query regressed"
+            assert comparison.latency.change == pytest.approx(0.5), "expected relative latency"
+
+    def test_tolerates_noise(self) -> None:
+        with tempfile.TemporaryDirectory() as folder:
+            rng = np.random.default_rng(secrets.randbelow(1000))
+            recalls = rng.random(300).tolist()
+            before = load(result(folder, "before.json", recalls, 1.0))
+            after = load(result(folder, "after.json", rng.permutation(recalls).tolist(), 1.0))
+            comparison = compare(before, after, max_recall_drop=0.05)
+            assert comparison.recall.low < comparison.recall.change < comparison.recall.high, (
+                "expected estimate inside its interval"
+            )
+            assert not comparison.breaches, "expected no breach for equal distributions"
+
+    def test_bootstrap_is_deterministic(self) -> None:
+        values = np.arange(1000, dtype=np.float64)
+        first = bootstrap(lambda idx: values[idx].mean(axis=1), len(values), seed=3)
+        second = bootstrap(lambda idx: values[idx].mean(axis=1), len(values), seed=3)
+        assert first == second, "expected same interval for same seed"
+
+    def test_exits_non_zero_on_breach(self) -> None:
+        with tempfile.TemporaryDirectory() as folder:
+            before = result(folder, "before.json", [1.0] * 50, 1.0)
+            after = result(folder, "after.json", [0.0] * 50, 1.0)
+            proc = subprocess.run(
+                [sys.executable, "-m", "benchmark.compare", before, after],
+                capture_output=True,
+                text=True,
+                check=False,
+            )
+            assert proc.returncode == 1, "expected failing exit code"
+            assert "BREACH" in proc.stdout, "expected breach reported"
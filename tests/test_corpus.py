@@ -0,0 +1,92 @@
+import asyncio
+import os
+import secrets
+import tempfile
+from pathlib import Path
+
+from search_agent.cache import location
+from search_agent.corpus import Corpus
+from search_agent.pack import Pack, PackedSearch
+from search_agent.shards import ShardedSearch, ShardServer
+from search_agent.ugrep import UgrepSearch
+
+
+class CountingServer(ShardServer):
+    """Shard server that counts accepted connections."""
+
+    connections = 0
+
+    async def _connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.connections += 1
+        await super()._connection(reader, writer)
+
+
+class TestCorpus:
+    """Tests for Corpus that holds per-collection state."""
+
+    def test_keeps_collections_apart(self) -> None:
+        with tempfile.TemporaryDirectory() as first, tempfile.TemporaryDirectory() as second:
+            prefix = f"topic_{secrets.token_hex(4)}"
+            (Path(first) / f"{prefix}_a.txt").write_text("a")
+            (Path(second) / f"{prefix}_b.txt").write_text("b")
+            one, two = Corpus(first), Corpus(second)
+            listed = asyncio.run(one.list_folder(prefix))
+            assert f"{prefix}_a.txt" in listed, "expected own file listed"
+            assert f"{prefix}_b.txt" not in listed, "expected other corpus hidden"
+            (Path(second) / "new.txt").write_text("new")
+            assert asyncio.run(one.refresh()) == 0, "expected other corpus unchanged"
+            assert asyncio.run(two.refresh()) == 1, "expected own change seen"
+            one.close()
+            two.close()
+
+    def test_reads_spans_within_own_root(self) -> None:
+        with tempfile.TemporaryDirectory() as first, tempfile.TemporaryDirectory() as second:
+            (Path(second) / "doc.txt").write_text("private\n")
+            corpus = Corpus(first)
+            result = corpus.reader.read(str(Path(second) / "doc.txt"), 1, 1)
+            assert "private" not in result, "expected other corpus files unreachable"
+            corpus.close()
+
+    def test_chooses_search_backend(self, cache_dir: Path) -> None:
+        with tempfile.TemporaryDirectory() as root:
+            local = Corpus(root)
+            sharded = Corpus(root, shards=["127.0.0.1:7700"])
+            try:
+                assert isinstance(local.search(), UgrepSearch), "expected folder scan"
+                assert isinstance(sharded.search(), ShardedSearch), (
+                    "expected shard coordinator"
+                )
+            finally:
+                local.close()
+                sharded.close()
+
+    def test_uses_fresh_pack_only(self, cache_dir: Path) -> None:
+        with tempfile.TemporaryDirectory() as root:
+            (Path(root) / "doc.txt").write_text("content")
+            corpus = Corpus(root, packed=True)
+            try:
+                assert isinstance(corpus.search(), UgrepSearch), "expected missing pack ignored"
+                Pack(location("pack", root)).write(root)
+                assert isinstance(corpus.search(), PackedSearch), "expected pack used"
+            finally:
+                corpus.close()
+
+    def test_reuses_shard_connections(self, cache_dir: Path) -> None:
+        async def scenario(root: str, address: str) -> int:
+            shard = CountingServer(root)
+            server = await shard.serve(address)
+            async with server:
+                corpus = Corpus(root, shards=[address])
+                try:
+                    for _ in range(3):
+                        await corpus.search().list_folder("")
+                finally:
+                    corpus.close()
+            return shard.connections
+
+        with tempfile.TemporaryDirectory() as root:
+            (Path(root) / "doc.txt").write_text("content")
+            address = f"unix:{os.path.join(root, 'shard.sock')}"
+            assert asyncio.run(scenario(root, address)) == 1, "expected one connection per shard"
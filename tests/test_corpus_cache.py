@@ -0,0 +1,51 @@
+import secrets
+import tempfile
+from pathlib import Path
+
+from benchmark.corpus import CorpusCache
+
+
+class TestCorpusCache:
+    """Tests for CorpusCache that materializes benchmark documents once."""
+
+    def test_rewrites_only_changed_documents(self) -> None:
+        with tempfile.TemporaryDirectory() as folder:
+            cache = CorpusCache("biology", Path(folder))
+            text = f"text_{secrets.token_hex(4)}"
+            documents = {"a/one": text, "two.txt": "two", "three": "three"}
+            assert cache.materialize(documents) == 3, "expected all documents written"
+            assert cache.materialize(documents) == 0, "expected repeat run skipped"
+            documents["two.txt"] = "changed"
+            del documents["three"]
+            assert cache.materialize(documents) == 1, "expected one document rewritten"
+            assert not (cache.root / "three.txt").exists(), "expected stale document removed"
+            assert (cache.root / "two.txt").read_text() == "changed", "expected new content"
+
+    def test_stores_filename_mapping(self) -> None:
+        with tempfile.TemporaryDirectory() as folder:
+            identifier = f"dir/doc_{secrets.token_hex(4)}"
+            CorpusCache("biology", Path(folder)).materialize({identifier: "text"})
+            cache = CorpusCache("biology", Path(folder))
+            name = identifier.replace("/", "_") + ".txt"
+            assert cache.files() == {name: identifier}, "expected mapping from manifest"
+            assert list(cache.documents()) == [(identifier, "text")], "expected text read back"
+
+    def test_restores_deleted_files(self) -> None:
+        with tempfile.TemporaryDirectory() as folder:
+            cache = CorpusCache("biology", Path(folder))
+            cache.materialize({"doc": "text"})
+            (cache.root / "doc.txt").unlink()
+            assert cache.materialize({"doc": "text"}) == 1, "expected missing file rewritten"
+
+    def test_skips_unchanged_source(self) -> None:
+        with tempfile.TemporaryDirectory() as folder:
+            cache = CorpusCache("biology", Path(folder))
+            source = secrets.token_hex(4)
+            cache.materialize({"doc": "text"}, fingerprint=source)
+            assert cache.materialize({"doc": "other"}, fingerprint=source) == 0, (
+                "expected documents not read for unchanged source"
+            )
+            assert cache.materialize({"doc": "other"}, fingerprint="new") == 1, (
+                "expected changed source compared"
+            )
+            assert (cache.root / "doc.txt").read_text() == "other", "expected new content"
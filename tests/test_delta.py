@@ -0,0 +1,56 @@
+from search_agent.delta import SeenBlocks
+from search_agent.parser import UgrepParser
+
+
+class TestSeenBlocks:
+    """Tests for SeenBlocks that drops previously returned output blocks."""
+
+    def test_returns_first_output_unchanged(self) -> None:
+        output = "docs/a.txt:3:alpha\ndocs/a.txt-4-beta\n"
+        assert SeenBlocks().fresh(output) == output, "expected unchanged output"
+
+    def test_omits_block_returned_earlier(self) -> None:
+        seen = SeenBlocks()
+        seen.fresh("docs/a.txt:3:alpha\n")
+        result = seen.fresh("docs/a.txt:3:alpha\n--\ndocs/b.txt:9:gamma\n")
+        assert "alpha" not in result, "expected repeated block omitted"
+        assert "gamma" in result, "expected new block kept"
+        assert "1 previously returned blocks omitted" in result, "expected omission note"
+
+    def test_keeps_block_with_new_lines(self) -> None:
+        seen = SeenBlocks()
+        seen.fresh("docs/a.txt:3:alpha\n")
+        result = seen.fresh("docs/a.txt-2-before\ndocs/a.txt:3:alpha\n")
+        assert "before" in result, "expected partially new block kept whole"
+        assert "alpha" in result, "expected known line kept with new context"
+
+    def test_distinguishes_same_lines_in_different_files(self) -> None:
+        seen = SeenBlocks()
+        seen.fresh("docs/a.txt:3:alpha\n")
+        result = seen.fresh("docs/b.txt:3:alpha\n")
+        assert "docs/b.txt" in result, "expected block from other file kept"
+
+    def test_reports_when_every_block_was_seen(self) -> None:
+        seen = SeenBlocks()
+        seen.fresh("docs/a.txt:3:alpha\n")
+        result = seen.fresh("docs/a.txt:3:alpha\n")
+        assert result.startswith("No new matches"), "expected no new matches message"
+
+    def test_keeps_notes_when_every_block_was_seen(self) -> None:
+        seen = SeenBlocks()
+        seen.fresh("docs/a.txt:3:alpha\n")
+        result = seen.fresh('docs/a.txt:3:alpha\n[Output truncated, cursor "ab"]')
+        assert 'cursor "ab"' in result, "expected truncation note preserved"
+
+    def test_keeps_blocks_without_line_numbers(self) -> None:
+        seen = SeenBlocks()
+        seen.fresh("docs/a.txt:alpha\n")
+        result = seen.fresh("docs/a.txt:alpha\n")
+        assert result == "docs/a.txt:alpha\n", "expected unnumbered block kept"
+
+    def test_filtered_output_parses_into_new_citations_only(self) -> None:
+        seen = SeenBlocks()
+        seen.fresh("docs/a.txt:3:alpha\n")
+        result = seen.fresh("docs/a.txt:3:alpha\n--\ndocs/b.txt:9:gamma\n")
+        citations = UgrepParser().parse(result)
+        assert [c.location for c in citations] == ["b.txt"], "expected one new citation"
@@ -0,0 +1,63 @@
+import json
+import secrets
+import tempfile
+from pathlib import Path
+
+from benchmark.base import STORE_FORMAT, DataLoader, DocumentStore
+
+
+class TestDocumentStore:
+    """Tests for DocumentStore that reads split documents from a memory map."""
+
+    def test_reads_documents_lazily(self) -> None:
+        with tempfile.TemporaryDirectory() as folder:
+            text = f"текст {secrets.token_hex(4)}"
+            pairs = [("a", "one"), ("b", text), ("c", "")]
+            assert DocumentStore.write(Path(folder), iter(pairs)) == 3, "expected count"
+            store = DocumentStore(Path(folder))
+            assert store["b"] == text, "expected unicode text read back"
+            assert store["c"] == "", "expected empty document"
+            assert list(store) == ["a", "b", "c"], "expected stored order"
+            assert list(store.stream()) == pairs, "expected streamed pairs"
+            assert "d" not in store, "expected missing key"
+            store.close()
+
+    def test_records_content_fingerprint(self) -> None:
+        with tempfile.TemporaryDirectory() as first, tempfile.TemporaryDirectory() as second:
+            text = secrets.token_hex(4)
+            DocumentStore.write(Path(first), [("a", text)])
+            DocumentStore.write(Path(second), [("a", text)])
+            one, two = DocumentStore(Path(first)), DocumentStore(Path(second))
+            assert one.fingerprint and one.fingerprint == two.fingerprint, (
+                "expected equal content to share a fingerprint"
+            )
+            one.close()
+            DocumentStore.write(Path(first), [("a", text + "!")])
+            changed = DocumentStore(Path(first))
+            assert changed.fingerprint != two.fingerprint, "expected new fingerprint"
+            changed.close()
+            two.close()
+
+    def test_keeps_last_duplicate(self) -> None:
+        with tempfile.TemporaryDirectory() as folder:
+            DocumentStore.write(Path(folder), [("a", "old"), ("a", "new")])
+            store = DocumentStore(Path(folder))
+            assert len(store) == 1, "expected duplicate counted once"
+            assert dict(store.items()) == {"a": "new"}, "expected later document kept"
+            store.close()
+
+
+class TestDataLoader:
+    """Tests for DataLoader that reads a converted split offline."""
+
+    def test_loads_converted_split(self) -> None:
+        with tempfile.TemporaryDirectory() as folder:
+            identifier = f"q_{secrets.token_hex(4)}"
+            queries = [{"id": identifier, "query": "why", "gold_ids": ["a"]}]
+            DocumentStore.write(Path(folder), [("a", "answer")])
+            (Path(folder) / "queries.json").write_text(json.dumps(queries))
+            (Path(folder) / "meta.json").write_text(json.dumps({"format": STORE_FORMAT}))
+            loaded, documents = DataLoader("biology", Path(folder)).load()
+            assert loaded == queries, "expected stored queries"
+            assert documents["a"] == "answer", "expected stored document"
+            documents.close()
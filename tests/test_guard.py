@@ -0,0 +1,144 @@
+import asyncio
+import time
+
+import pytest
+
+from search_agent.boolean import Query
+from search_agent.guard import GuardedBoolean, GuardedSearch, literal, review
+from search_agent.ugrep import Search, run
+
+
+class Recorder(Search):
+    """Search recording patterns it receives."""
+
+    def __init__(self) -> None:
+        self.patterns: list[str] = []
+
+    async def execute(self, pattern: str, path: str | None) -> str:
+        self.patterns.append(pattern)
+        return f"docs/a.txt:1:{pattern}"
+
+
+class TestReview:
+    """Tests for review that estimates regex cost."""
+
+    def test_accepts_plain_words(self) -> None:
+        assert review("geomagnetic reversal").pattern == "geomagnetic reversal", (
+            "expected plain words accepted unchanged"
+        )
+
+    def test_accepts_short_acronyms(self) -> None:
+        assert review("AI").pattern == "AI", "expected two-letter acronym accepted"
+
+    def test_rejects_pattern_without_literal_text(self) -> None:
+        assert review(r"\w+").pattern is None, "expected bare class rejected"
+
+    def test_rewrites_and_rejects_scattered_wildcards(self) -> None:
+        assert review(".*a.*b.*").pattern is None, "expected scattered single chars rejected"
+
+    def test_strips_redundant_edge_wildcards(self) -> None:
+        verdict = review(".*isostatic rebound.*")
+        assert verdict.pattern == "isostatic rebound", "expected edge wildcards removed"
+        assert "rewritten" in verdict.note, "expected rewrite explained"
+
+    def test_keeps_escaped_dot_before_star(self) -> None:
+        verdict = review(r"version\.*")
+        assert verdict == (r"version\.*", ""), "expected escaped dot left in place"
+
+    def test_keeps_leading_dot_plus(self) -> None:
+        assert review(".+foo") == (".+foo", ""), "expected .+ kept as it needs a character"
+
+    def test_rejects_nested_quantifiers(self) -> None:
+        assert review("(a+)+b").pattern is None, "expected nested repetition rejected"
+
+    def test_rejects_alternation_blowup(self) -> None:
+        pattern = "|".join(f"word{idx}" for idx in range(100))
+        assert review(pattern).pattern is None, "expected huge alternation rejected"
+
+    def test_rejects_huge_repetition_counts(self) -> None:
+        assert review("ab{1,100000}").pattern is None, "expected huge repeat rejected"
+
+    def test_rejects_alternative_with_single_char(self) -> None:
+        assert review("teacher|a").pattern is None, "expected weakest alternative to decide"
+
+    def test_counts_only_mandatory_literals(self) -> None:
+        assert literal("geo(magnetic)? reversal") == 9, "expected optional group skipped"
+        assert literal("teach(er|ers)") == 5, "expected group alternatives considered"
+        assert literal(r"post\-glacial") == 12, "expected escaped punctuation literal"
+
+
+class TestGuardedSearch:
+    """Tests for GuardedSearch that reviews patterns before searching."""
+
+    def test_returns_message_without_searching_rejected_pattern(self) -> None:
+        origin = Recorder()
+        result = asyncio.run(GuardedSearch(origin).execute(r"\w+", None))
+        assert "rejected" in result, "expected rejection message"
+        assert origin.patterns == [], "expected no search for rejected pattern"
+
+    def test_searches_rewritten_pattern(self) -> None:
+        origin = Recorder()
+        result = asyncio.run(GuardedSearch(origin).execute(".*mantle.*", None))
+        assert origin.patterns == ["mantle"], "expected rewritten pattern searched"
+        assert "rewritten" in result, "expected rewrite note in output"
+
+    def test_batch_keeps_order_with_rejections(self) -> None:
+        origin = Recorder()
+        results = asyncio.run(GuardedSearch(origin).batch(["crust", ".*", "mantle"], None))
+        assert "crust" in results[0], "expected first result for first pattern"
+        assert "rejected" in results[1], "expected rejection in place"
+        assert "mantle" in results[2], "expected third result for third pattern"
+
+
+class BooleanRecorder:
+    """Boolean search stub that records the terms it was asked for."""
+
+    def __init__(self) -> None:
+        self.terms: list[list[str]] = []
+
+    async def execute(self, query: Query, path: str | None) -> str:
+        self.terms.append(query.terms())
+        return "docs/a.txt:1:" + " ".join(query.terms())
+
+
+class TestGuardedBoolean:
+    """Tests for GuardedBoolean that reviews boolean query terms."""
+
+    def test_rejects_query_with_expensive_term(self) -> None:
+        origin = BooleanRecorder()
+        result = asyncio.run(GuardedBoolean(origin).execute(Query(["crust", r"\w+"]), None))
+        assert "rejected" in result, "expected rejection message"
+        assert origin.terms == [], "expected no search for rejected query"
+
+    def test_searches_rewritten_terms(self) -> None:
+        origin = BooleanRecorder()
+        query = Query([".*mantle.*"], excluded=["crust"])
+        result = asyncio.run(GuardedBoolean(origin).execute(query, None))
+        assert origin.terms == [["mantle", "crust"]], "expected rewritten term searched"
+        assert "rewritten" in result, "expected rewrite note in output"
+
+
+class TestRun:
+    """Tests for run that executes searches under limits."""
+
+    def test_returns_output_of_finished_command(self) -> None:
+        output, stopped = asyncio.run(run(["echo", "hello"], 100))
+        assert output == "hello\n", "expected command output"
+        assert not stopped, "expected finished command not stopped"
+
+    def test_kills_command_at_wall_clock_limit(self) -> None:
+        start = time.perf_counter()
+        _, stopped = asyncio.run(run(["sleep", "10"], 100, timeout=0.2))
+        assert stopped, "expected command stopped"
+        assert time.perf_counter() - start < 5, "expected command killed quickly"
+
+    def test_stops_reading_at_output_limit(self) -> None:
+        output, _ = asyncio.run(run(["yes"], 1000, timeout=5))
+        assert len(output) == 1000, "expected output cut at limit"
+
+    @pytest.mark.skipif(not hasattr(__import__("signal"), "SIGXCPU"), reason="no SIGXCPU")
+    def test_kills_command_at_cpu_limit(self) -> None:
+        _, stopped = asyncio.run(
+            run(["sh", "-c", "while :; do :; done"], 100, timeout=10, cpu=1)
+        )
+        assert stopped, "expected busy command stopped by cpu limit"
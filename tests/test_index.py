@@ -0,0 +1,229 @@
+import asyncio
+import os
+import secrets
+import tempfile
+from pathlib import Path
+
+from search_agent import index as module
+from search_agent.index import InvertedIndex, stem, tokens
+from search_agent import stats as stats_module
+from search_agent.ranked import RankedSearch
+from search_agent.stats import TermStats
+from search_agent.watcher import CorpusState
+
+
+def names(ranked: list[tuple[str, float]]) -> list[str]:
+    """File names of ranked results."""
+    return [Path(path).name for path, _ in ranked]
+
+
+class TestInvertedIndex:
+    """Tests for InvertedIndex that ranks files with BM25."""
+
+    def test_ranks_file_with_more_occurrences_first(self) -> None:
+        with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as cache:
+            (Path(root) / "few.txt").write_text("rebound once among many other words here")
+            (Path(root) / "many.txt").write_text("rebound rebound rebound")
+            (Path(root) / "none.txt").write_text("unrelated content")
+            index = InvertedIndex(root, Path(cache))
+            index.refresh()
+            assert names(index.ranked("rebound", 5)) == ["many.txt", "few.txt"], (
+                "expected BM25 order without unrelated file"
+            )
+
+    def test_prefers_rare_terms(self) -> None:
+        with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as cache:
+            (Path(root) / "common.txt").write_text("earth earth")
+            (Path(root) / "rare.txt").write_text("isostatic earth")
+            for idx in range(5):
+                (Path(root) / f"filler_{idx}.txt").write_text("earth")
+            index = InvertedIndex(root, Path(cache))
+            index.refresh()
+            assert names(index.ranked("isostatic earth", 1)) == ["rare.txt"], (
+                "expected rare term to dominate score"
+            )
+
+    def test_indexes_only_changed_files_on_refresh(self) -> None:
+        with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as cache:
+            for idx in range(3):
+                (Path(root) / f"doc_{idx}.txt").write_text(secrets.token_hex(8))
+            index = InvertedIndex(root, Path(cache))
+            assert index.refresh() == 3, "expected all files indexed initially"
+            assert index.refresh() == 0, "expected no work without changes"
+            (Path(root) / "new.txt").write_text("fresh")
+            assert index.refresh() == 1, "expected only new file indexed"
+
+    def test_reflects_modified_file_contents(self) -> None:
+        with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as cache:
+            path = Path(root) / "doc.txt"
+            path.write_text("glacier")
+            index = InvertedIndex(root, Path(cache))
+            index.refresh()
+            path.write_text("volcano eruption")
+            os.utime(path, ns=(1, 1))
+            index.refresh()
+            assert index.ranked("glacier", 5) == [], "expected old content forgotten"
+            assert names(index.ranked("volcano", 5)) == ["doc.txt"], "expected new content"
+
+    def test_forgets_deleted_files(self) -> None:
+        with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as cache:
+            path = Path(root) / "gone.txt"
+            path.write_text("ephemeral")
+            index = InvertedIndex(root, Path(cache))
+            index.refresh()
+            path.unlink()
+            index.refresh()
+            assert index.frequency("ephemeral") == 0, "expected deleted file dropped"
+            assert len(index) == 0, "expected no live documents"
+
+    def test_reopens_index_from_disk(self) -> None:
+        with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as cache:
+            (Path(root) / "doc.txt").write_text("persistent words")
+            InvertedIndex(root, Path(cache)).refresh()
+            reopened = InvertedIndex(root, Path(cache))
+            assert reopened.refresh() == 0, "expected nothing to reindex after reopen"
+            assert names(reopened.ranked("persistent", 5)) == ["doc.txt"], (
+                "expected postings loaded from disk"
+            )
+
+    def test_scores_match_fresh_index_after_changes(self) -> None:
+        with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as cache:
+            index = InvertedIndex(root, Path(cache))
+            for idx in range(module.MAX_SEGMENTS + 2):
+                (Path(root) / f"doc_{idx}.txt").write_text("delta " * (idx + 1))
+                index.refresh()
+            (Path(root) / "doc_0.txt").unlink()
+            changed = Path(root) / "doc_1.txt"
+            changed.write_text("delta plus several extra words")
+            os.utime(changed, ns=(1, 1))
+            index.refresh()
+            reopened = InvertedIndex(root, Path(cache))
+            with tempfile.TemporaryDirectory() as other:
+                fresh = InvertedIndex(root, Path(other))
+                fresh.refresh()
+                expected = fresh.ranked("delta", 20)
+            assert index.ranked("delta", 20) == expected, (
+                "expected running document length to match a fresh build"
+            )
+            assert reopened.ranked("delta", 20) == expected, (
+                "expected document length restored on reopen"
+            )
+
+    def test_compacts_segments_beyond_limit(self) -> None:
+        with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as cache:
+            index = InvertedIndex(root, Path(cache))
+            for idx in range(module.MAX_SEGMENTS + 2):
+                (Path(root) / f"doc_{idx}.txt").write_text(f"shared word{idx}")
+                index.refresh()
+            segments = list(Path(cache).glob("*.post"))
+            assert len(segments) <= module.MAX_SEGMENTS, "expected segments compacted"
+            assert index.frequency("shared") == module.MAX_SEGMENTS + 2, (
+                "expected postings preserved by compaction"
+            )
+
+    def test_restricts_results_to_path_prefix(self) -> None:
+        with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as cache:
+            (Path(root) / "inside").mkdir()
+            (Path(root) / "inside" / "a.txt").write_text("magma")
+            (Path(root) / "b.txt").write_text("magma")
+            index = InvertedIndex(root, Path(cache))
+            index.refresh()
+            ranked = index.ranked("magma", 5, str(Path(root) / "inside"))
+            assert names(ranked) == ["a.txt"], "expected results limited to folder"
+
+    def test_updates_given_paths_only(self) -> None:
+        with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as cache:
+            path = Path(root) / "doc.txt"
+            index = InvertedIndex(root, Path(cache))
+            path.write_text("tectonic")
+            index.update([str(path)])
+            assert index.frequency("tectonic") == 1, "expected updated file indexed"
+
+    def test_follows_corpus_state_changes(self) -> None:
+        with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as cache:
+            (Path(root) / "old.txt").write_text("basalt")
+            state = CorpusState(root)
+            index = InvertedIndex(root, Path(cache))
+            assert index.follow(state) == 1, "expected first follow to index everything"
+            (Path(root) / "new.txt").write_text("granite")
+            state.poll()
+            assert index.follow(state) == 1, "expected only reported change indexed"
+            assert index.frequency("granite") == 1, "expected new file searchable"
+
+    def test_counts_files_by_stem(self) -> None:
+        with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as cache:
+            (Path(root) / "a.txt").write_text("motivation matters")
+            (Path(root) / "b.txt").write_text("motivated people")
+            (Path(root) / "c.txt").write_text(secrets.token_hex(8))
+            index = InvertedIndex(root, Path(cache))
+            index.refresh()
+            assert index.frequency("motivated") == 1, "expected exact word count"
+            assert index.family("motivate") == 2, "expected all forms counted"
+
+    def test_counts_files_with_all_words(self) -> None:
+        with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as cache:
+            (Path(root) / "a.txt").write_text("isostatic rebound")
+            (Path(root) / "b.txt").write_text("rebound only")
+            index = InvertedIndex(root, Path(cache))
+            index.refresh()
+            assert index.together(["isostatic", "rebound"]) == 1, "expected intersection"
+
+    def test_rebuilds_index_of_older_format(self) -> None:
+        with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as cache:
+            (Path(root) / "doc.txt").write_text("glacier")
+            InvertedIndex(root, Path(cache)).refresh()
+            manifest = Path(cache) / "manifest.json"
+            manifest.write_text(manifest.read_text().replace('"format": 2', '"format": 1'))
+            reopened = InvertedIndex(root, Path(cache))
+            assert reopened.refresh() == 1, "expected outdated index rebuilt"
+
+    def test_stems_plural_and_verb_forms(self) -> None:
+        assert stem("rebounds") == stem("rebounding") == "rebound", "expected shared stem"
+
+    def test_tokenizes_unicode_words(self) -> None:
+        assert tokens("Привет, Мир") == ["привет", "мир"], "expected lowercase words"
+
+
+class TestRankedSearch:
+    """Tests for RankedSearch that formats ranked files with snippets."""
+
+    def test_returns_snippet_rows_for_top_files(self) -> None:
+        with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as cache:
+            path = Path(root) / "doc.txt"
+            path.write_text("intro\nthe mantle convects slowly\noutro\nend\n")
+            search = RankedSearch(InvertedIndex(root, Path(cache)))
+            result = asyncio.run(search.execute("mantle", None))
+            assert f"{path}:2:the mantle convects slowly" in result, "expected best line"
+            assert f"{path}-1-intro" in result, "expected context line"
+
+    def test_reports_no_matches(self) -> None:
+        with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as cache:
+            (Path(root) / "doc.txt").write_text("content")
+            search = RankedSearch(InvertedIndex(root, Path(cache)))
+            result = asyncio.run(search.execute(secrets.token_hex(8), None))
+            assert result == "No matches found", "expected no matches message"
+
+
+class TestTermStats:
+    """Tests for TermStats that reports document frequencies of terms."""
+
+    def test_answers_batch_of_terms(self) -> None:
+        with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as cache:
+            (Path(root) / "a.txt").write_text("mantle plume")
+            (Path(root) / "b.txt").write_text("mantle convection")
+            stats = TermStats(InvertedIndex(root, Path(cache)))
+            result = asyncio.run(stats.execute(["mantle", "mantle plume", "crust"]))
+            assert result.splitlines()[1:] == [
+                "mantle: 2 files, 2 files with any form of 'mantle*'",
+                "mantle plume: 1 files with all words",
+                "crust: 0 files, 0 files with any form of 'crust*'",
+            ], "expected one line per term in order"
+
+    def test_caps_number_of_terms(self) -> None:
+        with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as cache:
+            stats = TermStats(InvertedIndex(root, Path(cache)))
+            terms = [secrets.token_hex(4) for _ in range(stats_module.MAX_TERMS + 5)]
+            result = asyncio.run(stats.execute(terms))
+            assert len(result.splitlines()) == stats_module.MAX_TERMS + 2, (
+                "expected header, capped terms and a note"
+            )
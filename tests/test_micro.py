@@ -0,0 +1,38 @@
+import asyncio
+import secrets
+import tempfile
+from pathlib import Path
+
+from benchmark.micro import generate, output, suite, workload
+from search_agent.parser import UgrepParser
+
+
+class TestMicro:
+    """Tests for the synthetic corpus micro-benchmark suite."""
+
+    def test_generates_same_corpus_for_seed(self) -> None:
+        seed = secrets.randbelow(1000)
+        with tempfile.TemporaryDirectory() as first, tempfile.TemporaryDirectory() as second:
+            generate(Path(first), files=20, pdf_ratio=0.5, seed=seed)
+            generate(Path(second), files=20, pdf_ratio=0.5, seed=seed)
+            one = {p.relative_to(first): p.read_bytes() for p in Path(first).rglob("*.*")}
+            two = {p.relative_to(second): p.read_bytes() for p in Path(second).rglob("*.*")}
+            assert one == two, "expected identical corpora for one seed"
+            assert any(p.suffix == ".pdf" for p in one), "expected some PDF files"
+            assert all(p.read_bytes().startswith(b"%PDF") for p in Path(first).rglob("*.pdf")), (
+                "expected PDF header"
+            )
+
+    def test_builds_parsable_output(self) -> None:
+        with tempfile.TemporaryDirectory() as root:
+            generate(Path(root), files=10, pdf_ratio=0.0)
+            spans = UgrepParser().spans(output(Path(root), blocks=5))
+            assert len(spans) == 5, "expected one span per block"
+
+    def test_runs_offline_components(self) -> None:
+        with tempfile.TemporaryDirectory() as root:
+            words = generate(Path(root), files=10, fanout=2)
+            assert len(workload(words, 10)) == 10, "expected requested pattern count"
+            results = {r.component: r for r in asyncio.run(suite(Path(root), words, 5))}
+            assert results["ugrep_parser"].operations > 0, "expected parser timed"
+            assert results["list_folder"].operations > 0, "expected listing timed"
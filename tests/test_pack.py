@@ -0,0 +1,173 @@
+import asyncio
+import os
+import secrets
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from search_agent import pack as pack_module
+from search_agent.pack import Pack, PackedSearch
+from search_agent.text import scan
+from search_agent.ugrep import Search
+
+
+class Recorder(Search):
+    """Search that records calls and echoes the pattern."""
+
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, str | None]] = []
+
+    async def execute(self, pattern: str, path: str | None) -> str:
+        self.calls.append((pattern, path))
+        return f"{path}:1:{pattern}"
+
+
+class TestPack:
+    """Tests for Pack that concatenates documents into one file."""
+
+    def test_locates_lines_of_each_document(self) -> None:
+        with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as cache:
+            (Path(root) / "a.txt").write_text("one\ntwo\nthree")
+            (Path(root) / "b.txt").write_text("four\nfive\n")
+            pack = Pack(Path(cache))
+            assert pack.write(root) == 2, "expected both files packed"
+            assert pack.locate(4) == (os.path.join(root, "b.txt"), 1), (
+                "expected fourth pack line to be first line of second file"
+            )
+            assert pack.locate(3) == (os.path.join(root, "a.txt"), 3), (
+                "expected last line of unterminated file to stay in that file"
+            )
+
+    def test_pack_contains_every_document(self) -> None:
+        with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as cache:
+            words = [secrets.token_hex(6) for _ in range(3)]
+            for idx, word in enumerate(words):
+                (Path(root) / f"doc_{idx}.md").write_text(word)
+            pack = Pack(Path(cache))
+            pack.write(root)
+            assert pack.corpus.read_text().split() == words, (
+                "expected documents in name order, one per line"
+            )
+
+    def test_is_fresh_until_a_file_changes(self) -> None:
+        with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as cache:
+            path = Path(root) / "doc.txt"
+            path.write_text("glacier")
+            pack = Pack(Path(cache))
+            assert not pack.fresh(scan(root)), "expected missing pack to be stale"
+            pack.write(root)
+            assert Pack(Path(cache)).fresh(scan(root)), "expected reloaded pack to be fresh"
+            os.utime(path, ns=(1, 1))
+            assert not pack.fresh(scan(root)), "expected modified file to make pack stale"
+
+    def test_remaps_output_to_original_files(self) -> None:
+        with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as cache:
+            (Path(root) / "a.txt").write_text("alpha\nbeta\n")
+            (Path(root) / "b.txt").write_text("gamma\ndelta\n")
+            pack = Pack(Path(cache))
+            pack.write(root)
+            corpus = str(pack.corpus)
+            output = f"{corpus}-2-beta\n{corpus}:3:gamma\n{corpus}-4-delta\n"
+            target = os.path.join(root, "b.txt")
+            assert pack.remap(output) == f"{target}:1:gamma\n{target}-2-delta\n", (
+                "expected context from neighbouring file dropped and lines remapped"
+            )
+
+    def test_keeps_blocks_of_two_documents_apart(self) -> None:
+        with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as cache:
+            (Path(root) / "a.txt").write_text("alpha\n")
+            (Path(root) / "b.txt").write_text("alpha\n")
+            pack = Pack(Path(cache))
+            pack.write(root)
+            corpus = str(pack.corpus)
+            remapped = pack.remap(f"{corpus}:1:alpha\n{corpus}:2:alpha\n")
+            assert remapped.count("\n--\n") == 1, (
+                "expected one block per original file"
+            )
+
+
+class TestPackedSearch:
+    """Tests for PackedSearch routing."""
+
+    def test_delegates_searches_outside_the_pack(self) -> None:
+        with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as cache:
+            (Path(root) / "sub").mkdir()
+            (Path(root) / "sub" / "a.txt").write_text("alpha")
+            pack = Pack(Path(cache))
+            pack.write(root)
+            origin = Recorder()
+            scoped = os.path.join(root, "sub")
+            asyncio.run(PackedSearch(pack, origin).execute("alpha", scoped))
+            assert origin.calls == [("alpha", scoped)], (
+                "expected scoped search to go to origin"
+            )
+
+    def test_searches_non_portable_pattern_separately(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as cache:
+            (Path(root) / "a.txt").write_text("word\nother\nthird\n")
+            pack = Pack(Path(cache))
+            pack.write(root)
+            corpus = str(pack.corpus)
+            commands: list[list[str]] = []
+
+            async def fake(cmd: list[str], limit: int) -> tuple[str, bool]:
+                commands.append(cmd)
+                if "-e" in cmd:
+                    return f"{corpus}:2:other\n--\n{corpus}:3:third\n", False
+                return f"{corpus}:1:word\n", False
+
+            monkeypatch.setattr(pack_module, "run", fake)
+            search = PackedSearch(pack, Recorder())
+            word, other, third = asyncio.run(
+                search.batch([r"\<word\>", "other", "third"], None)
+            )
+            assert [cmd.count("-e") for cmd in commands] == [2, 0], (
+                "expected portable patterns shared and the other searched alone"
+            )
+            assert "word" in word and "other" in other and "third" in third, (
+                "expected each pattern to get its own output"
+            )
+
+    def test_falls_back_when_split_is_unattributable(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as cache:
+            (Path(root) / "a.txt").write_text("alpha\nbeta\n")
+            pack = Pack(Path(cache))
+            pack.write(root)
+            corpus = str(pack.corpus)
+            commands: list[list[str]] = []
+
+            async def fake(cmd: list[str], limit: int) -> tuple[str, bool]:
+                commands.append(cmd)
+                text = "unrelated" if "-e" in cmd else cmd[-2]
+                return f"{corpus}:1:{text}\n", False
+
+            monkeypatch.setattr(pack_module, "run", fake)
+            results = asyncio.run(PackedSearch(pack, Recorder()).batch(["alp", "bet"], None))
+            assert len(commands) == 3 and all("-e" not in cmd for cmd in commands[1:]), (
+                "expected separate searches after an unattributable pass"
+            )
+            assert [len(results), "alp" in results[0]] == [2, True], (
+                "expected one result per pattern"
+            )
+
+
+@pytest.mark.integration
+class TestPackedSearchIntegration:
+    """Integration tests for PackedSearch with ugrep."""
+
+    def test_finds_match_under_original_name(self) -> None:
+        with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as cache:
+            word = secrets.token_hex(6)
+            (Path(root) / "a.txt").write_text("intro\n")
+            (Path(root) / "b.txt").write_text(f"first\n{word}\n")
+            pack = Pack(Path(cache))
+            pack.write(root)
+            result = asyncio.run(PackedSearch(pack, Recorder()).execute(word, None))
+            assert f"{os.path.join(root, 'b.txt')}:2:{word}" in result, (
+                "expected match reported in original file and line"
+            )
@@ -0,0 +1,99 @@
+import asyncio
+import re
+import secrets
+
+from search_agent.pages import PagedSearch, ResultStore
+from search_agent.ugrep import Search
+
+
+class Canned(Search):
+    """Search returning fixed output and counting invocations."""
+
+    def __init__(self, output: str) -> None:
+        self.output = output
+        self.calls = 0
+
+    async def execute(self, pattern: str, path: str | None) -> str:
+        self.calls += 1
+        return self.output
+
+
+def cursor(page: str) -> str:
+    """Extract continuation cursor from truncation note."""
+    found = re.search(r'cursor "([0-9a-f]+)"', page)
+    assert found, "expected cursor in truncation note"
+    return found.group(1)
+
+
+class TestResultStore:
+    """Tests for ResultStore that keeps truncated output remainders."""
+
+    def test_returns_stored_text_once(self) -> None:
+        store = ResultStore()
+        text = secrets.token_hex(16)
+        key = store.put(text)
+        assert store.take(key) == text, "expected stored text returned"
+        assert store.take(key) is None, "expected cursor consumed after take"
+
+    def test_expires_entries_after_ttl(self) -> None:
+        store = ResultStore(ttl=0)
+        key = store.put(secrets.token_hex(8))
+        assert store.take(key) is None, "expected expired entry dropped"
+
+    def test_evicts_oldest_entries_over_capacity(self) -> None:
+        store = ResultStore(capacity=30)
+        first = store.put("a" * 20)
+        second = store.put("b" * 20)
+        assert store.take(first) is None, "expected oldest entry evicted"
+        assert store.take(second) == "b" * 20, "expected newest entry kept"
+
+    def test_tracks_total_stored_size(self) -> None:
+        store = ResultStore()
+        store.put("x" * 10)
+        key = store.put("y" * 5)
+        store.take(key)
+        assert store.size() == 10, "expected size reduced after take"
+
+
+class TestPagedSearch:
+    """Tests for PagedSearch that paginates search output."""
+
+    def test_returns_short_output_unchanged(self) -> None:
+        output = "docs/a.txt:short\n"
+        search = PagedSearch(Canned(output), ResultStore(), size=100)
+        assert asyncio.run(search.execute("x", None)) == output, "expected no paging"
+
+    def test_appends_cursor_when_output_truncated(self) -> None:
+        output = "".join(f"docs/a.txt:line {i}\n" for i in range(50))
+        search = PagedSearch(Canned(output), ResultStore(), size=100)
+        page = asyncio.run(search.execute("x", None))
+        assert "next_page" in page, "expected continuation note"
+        assert cursor(page), "expected cursor in note"
+
+    def test_cuts_pages_at_line_boundaries(self) -> None:
+        output = "".join(f"docs/a.txt:line {i}\n" for i in range(50))
+        search = PagedSearch(Canned(output), ResultStore(), size=100)
+        page = asyncio.run(search.execute("x", None))
+        lines = page.split("\n")[:-1]
+        assert all(line.startswith("docs/a.txt:line ") for line in lines), (
+            "expected only whole lines before note"
+        )
+
+    def test_pages_cover_whole_output_without_rescan(self) -> None:
+        output = "".join(f"docs/a.txt:line {i}\n" for i in range(50))
+        origin = Canned(output)
+        search = PagedSearch(origin, ResultStore(), size=100)
+        page = asyncio.run(search.execute("x", None))
+        seen = []
+        while True:
+            seen.extend(line for line in page.split("\n") if line.startswith("docs/"))
+            if "next_page" not in page:
+                break
+            page = search.more(cursor(page))
+        assert seen == output.strip().split("\n"), "expected all lines across pages"
+        assert origin.calls == 1, "expected single underlying search"
+
+    def test_reports_unknown_cursor(self) -> None:
+        search = PagedSearch(Canned(""), ResultStore())
+        result = search.more(secrets.token_hex(8))
+        assert "expired or unknown" in result, "expected unknown cursor message"
@@ -118,3 +118,20 @@ docs/ACTIVATE - Technology & Media Outlook 2026.pdf-Second line
         )
         assert "First line" in citations[0].text, "expected content parsed correctly"
         assert "Second line" in citations[0].text, "expected context line parsed correctly"
+
+    def test_strips_line_numbers_from_content(self) -> None:
+        output = """docs/numbered.txt:12:Match line
+docs/numbered.txt-13-Context line
+"""
+        parser = UgrepParser()
+        citations = parser.parse(output)
+        assert citations[0].text == "Match line Context line", (
+            "expected line numbers removed from text"
+        )
+
+    def test_keeps_digits_after_line_number(self) -> None:
+        output = """docs/years.txt:7:2026-2030 outlook
+"""
+        parser = UgrepParser()
+        citations = parser.parse(output)
+        assert citations[0].text == "2026-2030 outlook", "expected content digits kept"
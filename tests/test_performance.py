@@ -0,0 +1,26 @@
+import secrets
+
+from benchmark.base import percentile, performance
+
+
+class TestPerformance:
+    """Tests for latency and cost summaries of benchmark runs."""
+
+    def test_interpolates_percentiles(self) -> None:
+        values = [float(value) for value in range(1, 101)]
+        assert percentile(values, 50) == 50.5, "expected median between ranks"
+        assert abs(percentile(values, 99) - 99.01) < 1e-9, "expected interpolated p99"
+        assert percentile([], 90) == 0.0, "expected zero for empty sample"
+
+    def test_summarizes_run(self) -> None:
+        latency = float(secrets.randbelow(10) + 1)
+        summary = performance([latency] * 4, [0.5] * 4, 120.0, [0.25] * 4, (100, 20))
+        assert summary.p90_latency_seconds == latency, "expected constant percentile"
+        assert summary.queries_per_minute == 2.0, "expected queries per minute"
+        assert summary.total_cost == 1.0, "expected summed cost"
+        assert summary.recall_per_dollar == 2.0, "expected summed recall per dollar"
+        assert summary.prompt_tokens == 100, "expected prompt tokens kept"
+
+    def test_skips_ratio_for_free_runs(self) -> None:
+        summary = performance([1.0], [1.0], 1.0)
+        assert summary.recall_per_dollar is None, "expected no ratio without cost"
@@ -0,0 +1,66 @@
+import secrets
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from search_agent.profiler import Profiler
+
+
+def spin(seconds: float) -> int:
+    """Burn CPU in Python for the given time."""
+    end = time.perf_counter() + seconds
+    count = 0
+    while time.perf_counter() < end:
+        count += 1
+    return count
+
+
+def allocate(count: int) -> list[str]:
+    """Allocate count distinct strings."""
+    return [secrets.token_hex(16) for _ in range(count)]
+
+
+class TestProfiler:
+    """Tests for Profiler stack sampling and memory attribution."""
+
+    def test_samples_worker_threads(self) -> None:
+        with Profiler(interval=0.001) as profiler:
+            worker = threading.Thread(target=spin, args=(0.2,))
+            worker.start()
+            worker.join()
+        assert profiler.samples > 0, "expected samples"
+        assert any("spin" in name for name in profiler.own), "expected worker function sampled"
+
+    def test_writes_collapsed_stacks(self) -> None:
+        with tempfile.TemporaryDirectory() as folder:
+            with Profiler(interval=0.001) as profiler:
+                spin(0.1)
+            profiler.write(Path(folder))
+            lines = (Path(folder) / "stacks.txt").read_text().splitlines()
+            summary = (Path(folder) / "summary.txt").read_text()
+        assert lines, "expected collapsed stacks"
+        stack, count = lines[0].rsplit(" ", 1)
+        assert int(count) > 0 and ";" in stack, "expected frames and sample count"
+        assert "spin" in summary, "expected hot function in summary"
+
+    def test_attributes_peak_memory(self) -> None:
+        with Profiler(interval=0.001, memory=True) as profiler:
+            kept = allocate(50_000)
+            del kept
+        assert profiler.peak_bytes > 1_000_000, "expected allocations traced"
+        assert "test_profiler.py" in profiler.allocations(), "expected allocating line at peak"
+
+    def test_leaves_memory_untraced_by_default(self) -> None:
+        with Profiler(interval=0.001) as profiler:
+            allocate(1000)
+        assert profiler.peak_bytes == 0, "expected no memory tracing"
+        assert profiler.allocations() == "Memory not traced", "expected note in summary"
+
+    def test_cprofile_mode(self) -> None:
+        with tempfile.TemporaryDirectory() as folder:
+            with Profiler(mode="cprofile") as profiler:
+                spin(0.05)
+            profiler.write(Path(folder))
+            assert (Path(folder) / "profile.prof").exists(), "expected call statistics"
+        assert "spin" in profiler.hot(), "expected profiled function in summary"
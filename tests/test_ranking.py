@@ -0,0 +1,83 @@
+"""Tests for vectorized ranking metrics."""
+
+import math
+import secrets
+
+import pytest
+
+from benchmark.metrics import recall_at_k
+
+try:
+    from benchmark.ranking import evaluate, means, relevance
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+pytestmark = pytest.mark.skipif(
+    not NUMPY_AVAILABLE,
+    reason="Benchmark dependencies not installed",
+)
+
+
+def ids(count: int) -> list[str]:
+    """Random distinct document IDs."""
+    return [secrets.token_hex(4) for _ in range(count)]
+
+
+class TestRelevance:
+    """Tests for packing runs into a relevance matrix."""
+
+    def test_marks_first_occurrence_only(self) -> None:
+        gold = ids(2)
+        other = ids(1)
+        hits, sizes, distinct = relevance([[gold[0], other[0], gold[0], gold[1]]], [gold], 4)
+        assert hits.tolist() == [[True, False, False, True]], "expected duplicate ignored"
+        assert sizes.tolist() == [2.0] and distinct.tolist() == [2.0], "expected gold counts"
+
+    def test_truncates_to_depth(self) -> None:
+        gold = ids(1)
+        hits, _, _ = relevance([[*ids(3), gold[0]]], [gold], 2)
+        assert hits.shape == (1, 2) and not hits.any(), "expected ranks beyond depth dropped"
+
+
+class TestEvaluate:
+    """Tests for per-query ranking metrics."""
+
+    def test_recall_matches_scalar_metric(self) -> None:
+        pool = ids(30)
+        retrieved = [[pool[(i * 7 + j) % 30] for j in range(25)] for i in range(12)]
+        gold = [[pool[(i * 5 + j * 3) % 30] for j in range(1 + i % 4)] for i in range(12)]
+        scores = evaluate(retrieved, gold)
+        for k in (1, 5, 10, 20):
+            expected = [recall_at_k(r, g, k=k) for r, g in zip(retrieved, gold)]
+            assert scores[f"recall@{k}"].tolist() == pytest.approx(expected), (
+                f"expected recall@{k} to match recall_at_k"
+            )
+
+    def test_rank_metrics(self) -> None:
+        gold = ids(2)
+        noise = ids(3)
+        retrieved = [[noise[0], gold[0], noise[1], gold[1], noise[2]]]
+        scores = evaluate(retrieved, [gold], cutoffs=(2, 5))
+        assert scores["precision@2"][0] == pytest.approx(0.5), "expected one hit in top 2"
+        assert scores["mrr"][0] == pytest.approx(0.5), "expected first hit at rank 2"
+        assert scores["map"][0] == pytest.approx((1 / 2 + 2 / 4) / 2), "expected average precision"
+        dcg = 1 / math.log2(3) + 1 / math.log2(5)
+        ideal = 1 + 1 / math.log2(3)
+        assert scores["ndcg@5"][0] == pytest.approx(dcg / ideal), "expected nDCG at 5"
+
+    def test_empty_gold_and_misses_score_zero(self) -> None:
+        scores = evaluate([ids(3), []], [[], ids(2)], cutoffs=(1, 3))
+        for name, values in scores.items():
+            assert values.tolist() == [0.0, 0.0], f"expected zero {name}"
+
+
+class TestMeans:
+    """Tests for averaged ranking metrics."""
+
+    def test_averages_queries(self) -> None:
+        gold = ids(1)
+        result = means([[gold[0]], ids(1)], [gold, gold], cutoffs=(1,))
+        assert result["recall@1"] == pytest.approx(0.5), "expected mean over queries"
+        assert means([], []) == {}, "expected no metrics without queries"
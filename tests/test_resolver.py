@@ -0,0 +1,40 @@
+import random
+import secrets
+
+from benchmark.resolver import Resolver, naive, synthetic
+
+
+class TestResolver:
+    """Tests for Resolver that maps citation locations to document IDs."""
+
+    def test_matches_linear_scan(self) -> None:
+        files = synthetic(500, seed=secrets.randbelow(1000))
+        names = list(files)
+        resolver = Resolver(files)
+        rng = random.Random(secrets.randbelow(1000))
+        for _ in range(300):
+            name = rng.choice(names)
+            start = rng.randrange(len(name))
+            location = rng.choice(
+                [
+                    f"docs/{name}",
+                    name[start : start + rng.randint(1, 12)],
+                    f"docs/pre_{name}_post",
+                    f"docs/{secrets.token_hex(4)}.md",
+                    "docs/",
+                ]
+            )
+            assert resolver.resolve(location) == naive(files, location), (
+                f"expected linear scan result for {location}"
+            )
+
+    def test_prefers_first_name_in_mapping_order(self) -> None:
+        files = {"long_name_b.txt": "first", "b.txt": "second", "name_b.txt": "third"}
+        resolver = Resolver(files)
+        assert resolver.resolve("x/name_b.txt_copy") == "second", "expected first overlapping name"
+        assert resolver.resolve("a/long_name_b.txt.bak") == "first", "expected contained name"
+        assert resolver.resolve("a/zname_b.txt") == "second", "expected earliest of contained"
+
+    def test_returns_none_without_overlap(self) -> None:
+        resolver = Resolver({"a.txt": "a"})
+        assert resolver.resolve(f"docs/{secrets.token_hex(4)}.md") is None, "expected no match"
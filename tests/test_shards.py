@@ -0,0 +1,176 @@
+import asyncio
+import os
+import secrets
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from search_agent.shards import (
+    LocalShard,
+    RemoteShard,
+    Shard,
+    ShardedSearch,
+    ShardServer,
+    merge,
+)
+
+
+class Canned(Shard):
+    """Shard answering every call with a fixed output."""
+
+    def __init__(self, output: str) -> None:
+        self._output = output
+
+    async def call(self, method: str, **params) -> str | list[str]:
+        if method == "batch":
+            return [self._output for _ in params["patterns"]]
+        return self._output
+
+
+class Broken(Shard):
+    """Shard that is always unreachable."""
+
+    async def call(self, method: str, **params) -> str | list[str]:
+        raise ConnectionError("refused")
+
+
+class SlowServer(ShardServer):
+    """Shard server that takes a while per request and tracks concurrency."""
+
+    busy = 0
+    busiest = 0
+    connections = 0
+
+    async def handle(self, request: dict) -> dict:
+        self.busy += 1
+        self.busiest = max(self.busiest, self.busy)
+        try:
+            await asyncio.sleep(0.05)
+            return await super().handle(request)
+        finally:
+            self.busy -= 1
+
+    async def _connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.connections += 1
+        await super()._connection(reader, writer)
+
+
+class TestMerge:
+    """Tests for merge that combines shard outputs."""
+
+    def test_orders_blocks_by_path_across_shards(self) -> None:
+        first = "s1/b.txt:1:cat\n--\ns1/d.txt:1:cat\n"
+        second = "s1/a.txt:1:cat\n--\ns1/c.txt:1:cat\n"
+        paths = [line.split(":")[0] for line in merge([first, second], 1000).split("\n--\n")]
+        assert paths == ["s1/a.txt", "s1/b.txt", "s1/c.txt", "s1/d.txt"], (
+            "expected global path order"
+        )
+
+    def test_applies_budget_globally(self) -> None:
+        outputs = [f"s{idx}/a.txt:1:{'x' * 40}\n" for idx in range(5)]
+        result = merge(outputs, 120)
+        assert result.count("a.txt:1:") == 2, "expected only blocks within budget"
+        assert "[3 blocks over the output budget omitted]" in result, "expected note"
+
+    def test_reports_no_matches_when_all_shards_empty(self) -> None:
+        result = merge(["No matches found", "No matches found"], 100)
+        assert result == "No matches found", "expected single no matches message"
+
+
+class TestShardedSearch:
+    """Tests for ShardedSearch that fans out to shards."""
+
+    def test_keeps_results_of_healthy_shards(self) -> None:
+        search = ShardedSearch([Canned("s0/a.txt:1:cat\n"), Broken()])
+        result = asyncio.run(search.execute("cat", None))
+        assert "s0/a.txt:1:cat" in result, "expected healthy shard result"
+        assert "Shard unavailable" in result, "expected failure note"
+
+    def test_merges_batch_per_pattern(self) -> None:
+        search = ShardedSearch([Canned("s0/a.txt:1:cat\n"), Canned("s1/a.txt:1:cat\n")])
+        results = asyncio.run(search.batch(["cat", "dog"], None))
+        assert len(results) == 2, "expected one result per pattern"
+        assert all(result.count(":1:cat") == 2 for result in results), (
+            "expected both shards in each result"
+        )
+
+    def test_lists_folder_across_shards(self) -> None:
+        with tempfile.TemporaryDirectory() as first, tempfile.TemporaryDirectory() as second:
+            prefix = f"topic_{secrets.token_hex(4)}"
+            (Path(first) / f"{prefix}_a.txt").write_text("a")
+            (Path(second) / f"{prefix}_b.txt").write_text("b")
+            shards = [LocalShard(ShardServer(first)), LocalShard(ShardServer(second))]
+            result = asyncio.run(ShardedSearch(shards).list_folder(prefix))
+            assert f"{prefix}_a.txt" in result and f"{prefix}_b.txt" in result, (
+                "expected files of both shards"
+            )
+
+
+class TestRemoteShard:
+    """Tests for RemoteShard that talks to ShardServer over a socket."""
+
+    def test_round_trips_over_unix_socket(self) -> None:
+        async def scenario(root: str, address: str) -> str:
+            server = await ShardServer(root).serve(address)
+            async with server:
+                shard = RemoteShard(address)
+                try:
+                    await shard.call("ping")
+                    return await shard.call("list_folder", folder="sub")
+                finally:
+                    await shard.close()
+
+        with tempfile.TemporaryDirectory() as root:
+            (Path(root) / "sub").mkdir()
+            (Path(root) / "sub" / "doc.txt").write_text("content")
+            address = f"unix:{os.path.join(root, 'shard.sock')}"
+            result = asyncio.run(scenario(root, address))
+            assert result.endswith(os.path.join(root, "sub", "doc.txt")), (
+                "expected listing from remote shard"
+            )
+
+    def test_answers_concurrent_calls_in_parallel(self) -> None:
+        async def scenario(root: str, address: str) -> tuple[int, int]:
+            shard = SlowServer(root)
+            server = await shard.serve(address)
+            async with server:
+                remote = RemoteShard(address, connections=3)
+                try:
+                    await asyncio.gather(*[remote.call("ping") for _ in range(5)])
+                finally:
+                    await remote.close()
+            return shard.busiest, shard.connections
+
+        with tempfile.TemporaryDirectory() as root:
+            address = f"unix:{os.path.join(root, 'shard.sock')}"
+            busiest, connections = asyncio.run(scenario(root, address))
+            assert busiest == 3, "expected calls answered concurrently up to the pool size"
+            assert connections == 3, "expected pooled connections reused"
+
+    def test_reports_unreachable_shard(self) -> None:
+        with tempfile.TemporaryDirectory() as root:
+            shard = RemoteShard(f"unix:{os.path.join(root, 'missing.sock')}")
+            with pytest.raises(ConnectionError):
+                asyncio.run(shard.call("ping"))
+
+    def test_reports_unknown_method(self) -> None:
+        with tempfile.TemporaryDirectory() as root:
+            with pytest.raises(ConnectionError):
+                asyncio.run(LocalShard(ShardServer(root)).call("delete"))
+
+
+@pytest.mark.integration
+class TestShardedSearchIntegration:
+    """Integration tests for ShardedSearch with ugrep shards."""
+
+    def test_finds_matches_in_every_shard(self) -> None:
+        with tempfile.TemporaryDirectory() as first, tempfile.TemporaryDirectory() as second:
+            word = secrets.token_hex(6)
+            (Path(first) / "a.txt").write_text(word)
+            (Path(second) / "b.txt").write_text(word)
+            shards = [LocalShard(ShardServer(first)), LocalShard(ShardServer(second))]
+            result = asyncio.run(ShardedSearch(shards).execute(word, None))
+            assert "a.txt" in result and "b.txt" in result, "expected both shards"
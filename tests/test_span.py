@@ -0,0 +1,119 @@
+import os
+import secrets
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from search_agent import span as module
+from search_agent.span import LineIndex, SpanReader
+
+
+class TestLineIndex:
+    """Tests for LineIndex that reads lines through a memory map."""
+
+    def test_reads_requested_lines_only(self) -> None:
+        with tempfile.TemporaryDirectory() as root:
+            path = Path(root) / "doc.txt"
+            lines = [secrets.token_hex(4) for _ in range(10)]
+            path.write_text("\n".join(lines) + "\n")
+            index = LineIndex(path)
+            assert index.read(4, 6) == lines[3:6], "expected exact span"
+            index.close()
+
+    def test_keeps_empty_lines(self) -> None:
+        with tempfile.TemporaryDirectory() as root:
+            path = Path(root) / "doc.txt"
+            path.write_text("a\n\n\nb\n")
+            index = LineIndex(path)
+            assert index.read(1, 3) == ["a", "", ""], "expected empty lines preserved"
+            index.close()
+
+    def test_handles_empty_file(self) -> None:
+        with tempfile.TemporaryDirectory() as root:
+            path = Path(root) / "empty.txt"
+            path.write_text("")
+            index = LineIndex(path)
+            assert len(index) == 0, "expected no lines"
+            index.close()
+
+
+class TestSpanReader:
+    """Tests for SpanReader that serves line ranges of documents."""
+
+    def test_returns_rows_with_line_numbers(self) -> None:
+        with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as cache:
+            (Path(root) / "doc.txt").write_text("one\r\ntwo\r\nthree\r\n")
+            reader = SpanReader(root, Path(cache))
+            result = reader.read("doc.txt", 2, 3)
+            target = os.path.join(root, "doc.txt")
+            assert result == f"{target}:2:two\n{target}:3:three", (
+                "expected rows under docs folder path without carriage returns"
+            )
+
+    def test_rejects_paths_outside_folder(self) -> None:
+        with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as cache:
+            outside = Path(cache) / "secret.txt"
+            outside.write_text("private")
+            reader = SpanReader(root, Path(cache))
+            result = reader.read(str(outside), 1, 1)
+            assert result.startswith("File not found"), "expected outside path rejected"
+            result = reader.read(f"../{Path(cache).name}/secret.txt", 1, 1)
+            assert "private" not in result, "expected traversal rejected"
+
+    def test_limits_span_length(self) -> None:
+        with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as cache:
+            total = module.MAX_SPAN_LINES + 50
+            (Path(root) / "long.txt").write_text("line\n" * total)
+            result = SpanReader(root, Path(cache)).read("long.txt", 1, total)
+            assert result.count("\n") == module.MAX_SPAN_LINES, (
+                "expected span capped with a continuation note"
+            )
+            assert f"line {module.MAX_SPAN_LINES + 1}" in result, "expected next line"
+
+    def test_rereads_modified_file(self) -> None:
+        with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as cache:
+            path = Path(root) / "doc.txt"
+            path.write_text("before\n")
+            reader = SpanReader(root, Path(cache))
+            reader.read("doc.txt", 1, 1)
+            path.write_text("after change\n")
+            os.utime(path, ns=(1, 1))
+            assert reader.read("doc.txt", 1, 1).endswith(":1:after change"), (
+                "expected changed file reindexed"
+            )
+
+    def test_evicts_least_recently_used_files(self) -> None:
+        with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as cache:
+            reader = SpanReader(root, Path(cache), capacity=2)
+            for idx in range(3):
+                (Path(root) / f"doc_{idx}.txt").write_text(f"text {idx}\n")
+                reader.read(f"doc_{idx}.txt", 1, 1)
+            assert reader.read("doc_0.txt", 1, 1).endswith(":1:text 0"), (
+                "expected evicted file reopened"
+            )
+            reader.close()
+
+    def test_reports_range_past_end(self) -> None:
+        with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as cache:
+            (Path(root) / "doc.txt").write_text("only\n")
+            result = SpanReader(root, Path(cache)).read("doc.txt", 5, 9)
+            assert result.endswith("has only 1 lines"), "expected line count reported"
+
+    def test_concurrent_reads_with_eviction(self) -> None:
+        with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as cache:
+            names = [f"doc_{idx}.txt" for idx in range(8)]
+            texts = {name: secrets.token_hex(4) for name in names}
+            for name, text in texts.items():
+                (Path(root) / name).write_text(f"{text}\n" * 50)
+            reader = SpanReader(root, Path(cache), capacity=2)
+
+            def work(offset: int) -> list[bool]:
+                return [
+                    reader.read(name, 1, 50).endswith(f":50:{texts[name]}")
+                    for name in (names[(offset + idx) % 8] for idx in range(200))
+                ]
+
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                results = [ok for batch in pool.map(work, range(8)) for ok in batch]
+            reader.close()
+            assert all(results), "expected every read intact while indexes are evicted"
@@ -0,0 +1,67 @@
+import asyncio
+import secrets
+import tempfile
+from pathlib import Path
+
+from openai import AsyncOpenAI
+
+from benchmark.stub import StubServer
+from search_agent.agent import run_agent
+from search_agent.corpus import Corpus
+from search_agent.models import AgentResponse
+
+
+class TestStubServer:
+    """Tests for StubServer that imitates an OpenAI-compatible endpoint."""
+
+    def test_follows_script_per_turn(self) -> None:
+        name = f"tool_{secrets.token_hex(4)}"
+        server = StubServer([[{"name": name, "arguments": {"a": 1}}]], latency=0.0)
+        first = server.reply({"messages": [{"role": "user", "content": "q"}]})
+        call = first["choices"][0]["message"]["tool_calls"][0]["function"]
+        assert call["name"] == name, "expected scripted tool call"
+        second = server.reply(
+            {"messages": [{"role": "user", "content": "q"}, {"role": "assistant", "content": ""}]}
+        )
+        assert "tool_calls" not in second["choices"][0]["message"], "expected script to end"
+
+    def test_answers_openai_client(self) -> None:
+        async def scenario() -> tuple[str, AgentResponse]:
+            server = await StubServer(latency=0.0).serve()
+            port = server.sockets[0].getsockname()[1]
+            client = AsyncOpenAI(base_url=f"http://127.0.0.1:{port}/v1", api_key="stub")
+            try:
+                created = await client.chat.completions.create(
+                    model="stub", messages=[{"role": "user", "content": "q"}]
+                )
+                parsed = await client.beta.chat.completions.parse(
+                    model="stub",
+                    messages=[{"role": "user", "content": "q"}],
+                    response_format=AgentResponse,
+                )
+            finally:
+                await client.close()
+                server.close()
+            name = created.choices[0].message.tool_calls[0].function.name
+            return name, parsed.choices[0].message.parsed
+
+        name, answer = asyncio.run(scenario())
+        assert name == "list_folder", "expected first scripted tool"
+        assert answer.answer == "stub answer", "expected structured final answer"
+
+    def test_drives_run_agent_through_given_client(self, cache_dir: Path) -> None:
+        async def scenario(root: str) -> str:
+            server = await StubServer(script=[], latency=0.0).serve()
+            port = server.sockets[0].getsockname()[1]
+            client = AsyncOpenAI(base_url=f"http://127.0.0.1:{port}/v1", api_key="stub")
+            corpus = Corpus(root)
+            try:
+                result = await run_agent("q", corpus=corpus, client=client)
+            finally:
+                await client.close()
+                corpus.close()
+                server.close()
+            return result.response.answer
+
+        with tempfile.TemporaryDirectory() as root:
+            assert asyncio.run(scenario(root)) == "stub answer", "expected stub endpoint used"
@@ -1,8 +1,9 @@
 import asyncio
+import re
 
 import pytest
 
-from search_agent.ugrep import UgrepSearch
+from search_agent.ugrep import Demux, Tally, UgrepCount, UgrepSearch
 
 
 @pytest.mark.integration
@@ -74,3 +75,115 @@ class TestUgrepSearch:
     ) -> None:
         result = asyncio.run(search.execute("AI", sample_txt_path))
         assert "sample.txt" in result, "expected filename in output"
+
+    def test_batch_returns_output_per_pattern(
+        self,
+        search: UgrepSearch,
+        sample_txt_path: str,
+    ) -> None:
+        results = asyncio.run(
+            search.batch(["technology", "xyznonexistent"], sample_txt_path)
+        )
+        assert "technology" in results[0].lower(), "expected match for first pattern"
+        assert results[1] == "No matches found", "expected no matches for second"
+
+
+class TestDemux:
+    """Tests for Demux that splits multi-pattern output per pattern."""
+
+    def test_assigns_blocks_to_matching_pattern(self) -> None:
+        output = "docs/a.txt:1:teacher here\n--\ndocs/b.txt:5:tutor there\n"
+        demux = Demux([re.compile("teacher"), re.compile("tutor")])
+        teacher, tutor = demux.split(output)
+        assert "a.txt" in teacher and "b.txt" not in teacher, "expected teacher block"
+        assert "b.txt" in tutor and "a.txt" not in tutor, "expected tutor block"
+
+    def test_assigns_block_to_every_matching_pattern(self) -> None:
+        output = "docs/a.txt:1:teacher and tutor\n"
+        demux = Demux([re.compile("teacher"), re.compile("tutor")])
+        assert all("a.txt" in part for part in demux.split(output)), (
+            "expected shared block in both outputs"
+        )
+
+    def test_ignores_context_lines_when_assigning(self) -> None:
+        output = "docs/a.txt-1-tutor context\ndocs/a.txt:2:teacher match\n"
+        demux = Demux([re.compile("teacher"), re.compile("tutor")])
+        teacher, tutor = demux.split(output)
+        assert "tutor context" in teacher, "expected context kept with its block"
+        assert tutor == "", "expected no block for context-only pattern"
+
+    def test_matches_case_insensitively_when_compiled_so(self) -> None:
+        output = "docs/a.txt:1:Educator\n"
+        demux = Demux([re.compile("educator", re.IGNORECASE)])
+        assert "Educator" in demux.split(output)[0], "expected case-insensitive split"
+
+    def test_refuses_block_with_unassignable_match(self) -> None:
+        output = "docs/a.txt:1:teacher\n--\ndocs/b.txt:1:something else\n"
+        demux = Demux([re.compile("teacher"), re.compile("tutor")])
+        assert demux.split(output) is None, "expected no split for unassignable match"
+
+    def test_demotes_other_pattern_matches_to_context(self) -> None:
+        output = "docs/a.txt:1:teacher\ndocs/a.txt-2-between\ndocs/a.txt:3:tutor\n"
+        demux = Demux([re.compile("teacher"), re.compile("tutor")])
+        teacher, tutor = demux.split(output)
+        assert teacher == "docs/a.txt:1:teacher\ndocs/a.txt-2-between\ndocs/a.txt-3-tutor\n", (
+            "expected tutor match shown as context of teacher"
+        )
+        assert tutor == "docs/a.txt-1-teacher\ndocs/a.txt-2-between\ndocs/a.txt:3:tutor\n", (
+            "expected teacher match shown as context of tutor"
+        )
+
+    def test_trims_context_beyond_own_matches(self) -> None:
+        lines = ["docs/a.txt:1:teacher"]
+        lines += [f"docs/a.txt-{number}-filler" for number in range(2, 8)]
+        lines += ["docs/a.txt:8:tutor"]
+        demux = Demux([re.compile("teacher"), re.compile("tutor")], context=3)
+        teacher, tutor = demux.split("\n".join(lines) + "\n")
+        assert "a.txt-5-" not in teacher and "tutor" not in teacher, (
+            "expected teacher block cut after its context"
+        )
+        assert tutor.startswith("docs/a.txt-5-filler\n") and "teacher" not in tutor, (
+            "expected tutor block to start at its context"
+        )
+
+    def test_keeps_separators_between_blocks(self) -> None:
+        output = "docs/a.txt:1:cat\n--\ndocs/a.txt:9:cat again\n"
+        demux = Demux([re.compile("cat")])
+        assert demux.split(output)[0] == output, "expected blocks rejoined by separator"
+
+
+class TestTally:
+    """Tests for Tally that ranks per-file match counts."""
+
+    def test_ranks_files_by_count_descending(self) -> None:
+        tally = Tally("docs/low.txt:1\ndocs/high.txt:9\ndocs/mid.txt:4\n")
+        lines = tally.summary(10).split("\n")[1:]
+        assert lines == ["9 docs/high.txt", "4 docs/mid.txt", "1 docs/low.txt"], (
+            "expected files ranked by match count"
+        )
+
+    def test_skips_files_with_zero_matches(self) -> None:
+        tally = Tally("docs/none.txt:0\ndocs/some.txt:3\n")
+        assert "none.txt" not in tally.summary(10), "expected zero-count file skipped"
+
+    def test_limits_number_of_listed_files(self) -> None:
+        output = "".join(f"docs/file_{i}.txt:{i + 1}\n" for i in range(20))
+        summary = Tally(output).summary(5)
+        assert len(summary.split("\n")) == 6, "expected header plus five files"
+        assert "top 5 shown" in summary, "expected truncation note in header"
+
+    def test_handles_colons_in_path(self) -> None:
+        summary = Tally("docs/a:b.txt:2\n").summary(10)
+        assert "2 docs/a:b.txt" in summary, "expected path with colon preserved"
+
+    def test_returns_no_matches_for_empty_output(self) -> None:
+        assert Tally("").summary(10) == "No matches found", "expected no matches message"
+
+
+@pytest.mark.integration
+class TestUgrepCount:
+    """Integration tests for UgrepCount requiring ugrep."""
+
+    def test_counts_matches_in_text_file(self, sample_txt_path: str) -> None:
+        result = asyncio.run(UgrepCount().execute("technology", sample_txt_path))
+        assert "sample.txt" in result, "expected counted file in summary"
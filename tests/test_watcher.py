@@ -0,0 +1,91 @@
+import os
+import secrets
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from search_agent import watcher as module
+from search_agent.watcher import CorpusState
+
+
+def kinds(state: CorpusState, since: int) -> list[tuple[str, str]]:
+    """File names and kinds of changes after version since."""
+    return [(Path(change.path).name, change.kind) for change in state.changes(since)]
+
+
+class TestCorpusState:
+    """Tests for CorpusState that publishes corpus versions and changes."""
+
+    def test_reports_added_modified_and_deleted_files(self) -> None:
+        with tempfile.TemporaryDirectory() as root:
+            path = Path(root) / "doc.txt"
+            state = CorpusState(root)
+            path.write_text(secrets.token_hex(8))
+            state.poll()
+            path.write_text(secrets.token_hex(16))
+            os.utime(path, ns=(1, 1))
+            state.poll()
+            path.unlink()
+            state.poll()
+            assert kinds(state, 0) == [
+                ("doc.txt", "added"),
+                ("doc.txt", "modified"),
+                ("doc.txt", "deleted"),
+            ], "expected every change in order"
+            assert state.version == 3, "expected one version per change"
+
+    def test_keeps_version_without_changes(self) -> None:
+        with tempfile.TemporaryDirectory() as root:
+            (Path(root) / "doc.txt").write_text("stable")
+            state = CorpusState(root)
+            assert state.poll() == state.poll() == 0, "expected unchanged version"
+
+    def test_ignores_files_of_other_types(self) -> None:
+        with tempfile.TemporaryDirectory() as root:
+            state = CorpusState(root)
+            (Path(root) / "image.png").write_bytes(b"png")
+            assert state.poll() == 0, "expected non-document file ignored"
+
+    def test_tracks_files_in_new_folders(self) -> None:
+        with tempfile.TemporaryDirectory() as root:
+            state = CorpusState(root)
+            folder = Path(root) / "sub"
+            folder.mkdir()
+            (folder / "a.md").write_text("nested")
+            state.poll()
+            (folder / "b.md").write_text("later")
+            state.poll()
+            assert sorted(kinds(state, 0)) == [("a.md", "added"), ("b.md", "added")], (
+                "expected files of new folder tracked"
+            )
+
+    def test_reports_files_of_removed_folder(self) -> None:
+        with tempfile.TemporaryDirectory() as root:
+            folder = Path(root) / "sub"
+            folder.mkdir()
+            (folder / "a.txt").write_text("nested")
+            state = CorpusState(root)
+            (folder / "a.txt").unlink()
+            folder.rmdir()
+            state.poll()
+            assert kinds(state, 0) == [("a.txt", "deleted")], "expected nested file deleted"
+
+    def test_forgets_changes_beyond_history(self) -> None:
+        with tempfile.TemporaryDirectory() as root:
+            state = CorpusState(root, history=2)
+            for idx in range(3):
+                (Path(root) / f"doc_{idx}.txt").write_text("text")
+            state.poll()
+            assert state.changes(0) is None, "expected truncated history reported"
+            assert len(state.changes(1)) == 2, "expected recent changes kept"
+
+    def test_falls_back_to_scanning(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        def unavailable() -> None:
+            raise OSError("inotify unavailable")
+
+        monkeypatch.setattr(module, "Inotify", unavailable)
+        with tempfile.TemporaryDirectory() as root:
+            state = CorpusState(root)
+            (Path(root) / "doc.txt").write_text("scanned")
+            assert state.poll() == 1, "expected change found by scan"